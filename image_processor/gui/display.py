@@ -0,0 +1,191 @@
+"""
+Module contenant l'affichage d'images numpy dans un canvas Tk.
+
+Le canvas est couvert d'une grille de tuiles PhotoImage persistantes, créées
+une fois pour une taille de canvas donnée. Chaque tuile est adossée à un
+tampon numpy RGBA qu'une image PIL partage sans copie (Image.frombuffer) :
+afficher une image revient à copier ses pixels dans les tampons des tuiles
+concernées, puis à transférer ces seules tuiles vers Tk (copie en C, sans
+conversion en chaîne Tcl). Une mise à jour partielle ne transfère que les
+tuiles de la zone modifiée. Les temps de préparation et de transfert sont
+mesurés pour chaque image.
+"""
+
+import time
+
+import cv2
+import numpy as np
+from PIL import Image, ImageTk
+
+class DisplayStats:
+    """Mesures cumulées de l'affichage (temps en secondes)."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Remet les compteurs à zéro."""
+        self.frames = 0
+        self.tiles = 0
+        self.pixels = 0
+        self.prepare_time = 0.0
+        self.push_time = 0.0
+        self.last_frame_time = 0.0
+        self.allocations = 0
+
+    @property
+    def mean_frame_time(self):
+        """Durée moyenne d'une mise à jour."""
+        return (self.prepare_time + self.push_time) / self.frames if self.frames else 0.0
+
+    @property
+    def frame_rate(self):
+        """Nombre de mises à jour par seconde soutenable (hors rendu Tk)."""
+        mean = self.mean_frame_time
+        return 1.0 / mean if mean > 0 else 0.0
+
+    def __str__(self):
+        return (f"{self.frames} images, {self.mean_frame_time * 1000:.1f} ms/image "
+                f"(préparation {self.prepare_time * 1000:.0f} ms, transfert {self.push_time * 1000:.0f} ms), "
+                f"{self.tiles} tuiles transférées, {self.allocations} allocations")
+
+class _Tile:
+    """Tuile du canvas : tampon numpy, vue PIL sans copie et PhotoImage."""
+
+    __slots__ = ('x', 'y', 'buffer', 'image', 'photo', 'item', 'blank')
+
+    def __init__(self, canvas, x, y, width, height, background, tag):
+        self.x, self.y = x, y
+        self.buffer = np.empty((height, width, 4), np.uint8)
+        self.buffer[:] = background
+        self.image = Image.frombuffer('RGBA', (width, height), self.buffer, 'raw', 'RGBA', 0, 1)
+        # Même mode que le tampon : le transfert n'a pas de conversion à faire
+        self.photo = ImageTk.PhotoImage('RGBA', (width, height))
+        self.photo.paste(self.image)
+        self.item = canvas.create_image(x, y, anchor='nw', image=self.photo, tags=(tag,))
+        self.blank = True
+
+class CanvasDisplay:
+    """
+    Affichage d'images numpy dans un canvas Tk, par tuiles persistantes.
+
+    Les images sont placées en coordonnées du canvas ; la zone non couverte
+    est remplie avec la couleur de fond.
+    """
+
+    def __init__(self, canvas, tile_size=256, background=(255, 255, 255), tag='display'):
+        """
+        Args:
+            canvas (tk.Canvas): Canvas d'affichage
+            tile_size (int): Côté des tuiles (pixels)
+            background (tuple): Couleur de fond RGB
+            tag (str): Étiquette des éléments du canvas créés
+        """
+        self.canvas = canvas
+        self.tile_size = int(tile_size)
+        # Fond en RGBA opaque, écrit d'un bloc dans les tampons
+        self.background = np.array(tuple(background) + (255,), np.uint8)
+        self.tag = tag
+        self.width = self.height = 0
+        self._tiles = []
+        self.stats = DisplayStats()
+
+    @property
+    def size(self):
+        """Taille (largeur, hauteur) de la zone d'affichage."""
+        return self.width, self.height
+
+    def resize(self, width, height):
+        """
+        Adapte la grille de tuiles à la taille du canvas.
+
+        Les tuiles ne sont recréées que si la taille change.
+
+        Returns:
+            bool: True si les tuiles ont été recréées (contenu à redessiner)
+        """
+        width, height = max(int(width), 1), max(int(height), 1)
+        if (width, height) == self.size:
+            return False
+        self.canvas.delete(self.tag)
+        self._tiles = []
+        for y in range(0, height, self.tile_size):
+            for x in range(0, width, self.tile_size):
+                self._tiles.append(_Tile(self.canvas, x, y, min(self.tile_size, width - x),
+                                         min(self.tile_size, height - y), self.background, self.tag))
+        self.canvas.tag_lower(self.tag)
+        self.width, self.height = width, height
+        self.stats.allocations += 1
+        return True
+
+    def show(self, array, x=0, y=0, region=None):
+        """
+        Affiche une image à une position du canvas.
+
+        Args:
+            array (numpy.ndarray): Image 8 bits (niveaux de gris, RGB ou RGBA,
+                composée sur le fond) ; une vue non contiguë convient
+            x (int): Abscisse du coin haut gauche de l'image dans le canvas
+            y (int): Ordonnée du coin haut gauche
+            region (tuple, optional): Zone modifiée (x0, y0, x1, y1) en
+                coordonnées du canvas ; seules les tuiles qui la touchent
+                sont mises à jour (par défaut, tout le canvas)
+        """
+        start = time.perf_counter()
+        x, y = int(x), int(y)
+        h, w = array.shape[:2]
+        x0, y0, x1, y1 = region if region is not None else (0, 0, self.width, self.height)
+        x0, y0 = max(int(x0), 0), max(int(y0), 0)
+        x1, y1 = min(int(x1), self.width), min(int(y1), self.height)
+
+        dirty = []
+        for tile in self._tiles:
+            th, tw = tile.buffer.shape[:2]
+            # Partie de la tuile dans la zone modifiée, puis partie couverte par l'image
+            left, top = max(x0, tile.x), max(y0, tile.y)
+            right, bottom = min(x1, tile.x + tw), min(y1, tile.y + th)
+            if left >= right or top >= bottom:
+                continue
+            il, it = max(left, x), max(top, y)
+            ir, ib = min(right, x + w), min(bottom, y + h)
+            covered = il < ir and it < ib
+            full = covered and (il, it, ir, ib) == (left, top, right, bottom)
+            if not covered and tile.blank:
+                continue
+            if not full:
+                tile.buffer[top - tile.y:bottom - tile.y, left - tile.x:right - tile.x] = self.background
+            if covered:
+                self._copy(tile.buffer[it - tile.y:ib - tile.y, il - tile.x:ir - tile.x],
+                           array[it - y:ib - y, il - x:ir - x])
+            tile.blank = not covered and (left, top, right, bottom) == (tile.x, tile.y, tile.x + tw, tile.y + th)
+            dirty.append(tile)
+        prepared = time.perf_counter()
+
+        for tile in dirty:
+            tile.photo.paste(tile.image)
+        end = time.perf_counter()
+
+        stats = self.stats
+        stats.frames += 1
+        stats.tiles += len(dirty)
+        stats.pixels += sum(tile.buffer.shape[0] * tile.buffer.shape[1] for tile in dirty)
+        stats.prepare_time += prepared - start
+        stats.push_time += end - prepared
+        stats.last_frame_time = end - start
+
+    def _copy(self, target, source):
+        """Copie des pixels 8 bits dans un tampon RGBA (alpha composé sur le fond)."""
+        # cv2 écrit directement dans la vue du tampon (une vingtaine de fois
+        # plus rapide qu'une affectation numpy vers trois canaux sur quatre)
+        if source.ndim == 2:
+            cv2.cvtColor(source, cv2.COLOR_GRAY2RGBA, dst=target)
+        elif source.shape[2] == 4:
+            alpha = source[:, :, 3:4].astype(np.uint16)
+            target[:, :, :3] = (source[:, :, :3] * alpha + self.background[:3] * (255 - alpha) + 127) // 255
+            target[:, :, 3] = 255
+        else:
+            cv2.cvtColor(source, cv2.COLOR_RGB2RGBA, dst=target)
+
+    def clear(self):
+        """Remplit tout le canvas avec la couleur de fond."""
+        self.show(np.zeros((0, 0, 3), np.uint8))
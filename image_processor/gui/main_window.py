@@ -4,7 +4,7 @@ Module principal de l'interface graphique de l'application Image Processor.
 
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
-from PIL import Image, ImageTk, ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont
 import cv2
 import numpy as np
 import os
@@ -12,17 +12,56 @@ import sys
 import logging
 import traceback
 
+from ..utils.image_saver import SaveService
+from ..utils.helpers import format_size
+from ..utils.image_data import ImageData
+from .display import CanvasDisplay
+from .viewport import Viewport
+from ..operations.filters import apply_median_blur
+from ..operations.gradients import CANNY_THRESHOLD_METHODS, GradientCache
+from ..operations.morphology import SHAPES, apply_opening, apply_closing, apply_gradient
+from ..operations.colors import BASIC_COLORS, ColorClassifier
+from ..operations.contrast import clahe, equalize
+from ..operations.contours import ContourOverlay, ContourSet
+from ..operations.lines import LINE_METHODS, detect_lines, draw_lines
+from ..operations.thresholding import (
+    THRESHOLD_METHODS, apply_thresholds, auto_threshold, multi_otsu_thresholds
+)
+from ..operations.segmentation import (
+    ADAPTIVE_METHODS, adaptive_threshold, connected_components, grabcut_mask,
+    region_growing, split_and_merge
+)
+
 class MainWindow:
     """Classe principale de l'interface utilisateur."""
     
+    @property
+    def current_image(self):
+        """Image en cours (PIL) ; chaque affectation crée une nouvelle version."""
+        return self._current_image
+    
+    @current_image.setter
+    def current_image(self, image):
+        self._current_image = image
+        # Compteur toujours croissant : une version n'est jamais réattribuée,
+        # même après un retour à la version d'origine (_reset_image)
+        self._last_version = getattr(self, '_last_version', 0) + 1
+        self._image_version = self._last_version
+    
     def __init__(self, master):
         """Initialise la fenêtre principale."""
         self.master = master
+        # Dérivées partagées par les filtres de contours, par version d'image
+        self._gradient_cache = GradientCache()
+        # Conversions de couleur (gris, HSV, Lab...) de la version courante
+        self._image_data_cache = None
         self.current_image = None
         self.original_image = None
         self.image_path = None
         # Variable de taille de noyau utilisée par plusieurs opérations
         self.kernel_size = tk.IntVar(value=5)
+        # Service d'enregistrement asynchrone (encodage hors du thread Tk)
+        self.save_service = SaveService(max_workers=2)
         
         # Configuration du logging
         self.logger = logging.getLogger('ImageProcessor')
@@ -239,9 +278,12 @@ class MainWindow:
         )
         
         # Barres de défilement avec style bleu
-        x_scroll = ttk.Scrollbar(canvas_frame, orient='horizontal', command=self.canvas.xview)
-        y_scroll = ttk.Scrollbar(canvas_frame, orient='vertical', command=self.canvas.yview)
-        self.canvas.configure(xscrollcommand=x_scroll.set, yscrollcommand=y_scroll.set)
+        # (elles pilotent la vue zoomable, qui ne rend que la partie visible)
+        x_scroll = ttk.Scrollbar(canvas_frame, orient='horizontal',
+                                 command=lambda *args: self._on_scrollbar('x', *args))
+        y_scroll = ttk.Scrollbar(canvas_frame, orient='vertical',
+                                 command=lambda *args: self._on_scrollbar('y', *args))
+        self.x_scroll, self.y_scroll = x_scroll, y_scroll
         
         # Positionnement des widgets
         self.canvas.grid(row=0, column=0, sticky="nsew", padx=1, pady=1)
@@ -261,14 +303,31 @@ class MainWindow:
             tags=("message",)
         )
         
+        # Tuiles d'affichage persistantes, alimentées depuis les tableaux numpy
+        self.display = CanvasDisplay(self.canvas, background=(255, 255, 255))
+        # Zoom et déplacement : pyramide et tuiles rendues en cache
+        self.viewport = Viewport(background=(255, 255, 255))
+        self._view_frame = None
+        self._render_id = None
+        self._prefetch_id = None
+        self._pan_anchor = None
+        
         # Initialisation des variables d'état
-        self.photo_img = None
         self.image_path = None
         self.original_image = None
         self.current_image = None
         
         # Lier les événements
         self.canvas.bind('<Configure>', self.on_resize)
+        # Molette : zoom sous le curseur (Button-4/5 sous X11) ; bouton du
+        # milieu ou droit : déplacement (le bouton gauche sert à GrabCut)
+        self.canvas.bind('<MouseWheel>', self._on_mouse_wheel)
+        self.canvas.bind('<Button-4>', self._on_mouse_wheel)
+        self.canvas.bind('<Button-5>', self._on_mouse_wheel)
+        for button in (2, 3):
+            self.canvas.bind(f'<ButtonPress-{button}>', self._on_pan_start)
+            self.canvas.bind(f'<B{button}-Motion>', self._on_pan_drag)
+            self.canvas.bind(f'<ButtonRelease-{button}>', self._on_pan_end)
         
         # Création des onglets d'opérations
         self._create_operation_tabs(control_frame)
@@ -543,7 +602,10 @@ class MainWindow:
                     self.original_image = self.original_image.convert('RGB')
                 
                 self.current_image = self.original_image.copy()
+                self._original_version = self._image_version
                 self.image_path = filepath
+                # Nouvelle image : ajustée à la fenêtre
+                self.viewport.fitted = True
                 
                 # Mettre à jour le titre de la fenêtre avec le nom du fichier
                 filename = os.path.basename(filepath)
@@ -605,7 +667,9 @@ class MainWindow:
                     # Mettre à jour les images
                     self.original_image = image_pil
                     self.current_image = self.original_image.copy()
+                    self._original_version = self._image_version
                     self.image_path = filepath
+                    self.viewport.fitted = True
                     
                     # Mettre à jour le titre de la fenêtre
                     filename = os.path.basename(filepath)
@@ -652,6 +716,8 @@ class MainWindow:
 
         try:
             self.current_image = self.original_image.copy()
+            # Même contenu que l'image chargée : les calculs en cache restent valables
+            self._image_version = self._original_version
             self._update_image_display()
             if hasattr(self, 'status_var'):
                 self.status_var.set("Image réinitialisée")
@@ -710,72 +776,22 @@ class MainWindow:
             ext = ext.lower()
             
             # Préparer les options d'enregistrement
-            save_kwargs = {}
+            params = []
             
             # Pour le format JPEG, ajouter une option de qualité
             if ext in ['.jpg', '.jpeg']:
-                save_kwargs['quality'] = 95  # Qualité de 95%
+                params = [int(cv2.IMWRITE_JPEG_QUALITY), 95]  # Qualité de 95%
             
             # Pour le format PNG, ajouter une option de compression
             elif ext == '.png':
-                save_kwargs['compress_level'] = 6  # Niveau de compression moyen
-            
-            # Si c'est une image PIL, utiliser directement la méthode save
-            if isinstance(self.current_image, Image.Image):
-                # Si l'image est en mode RGBA et qu'on enregistre en JPEG, convertir en RGB
-                if self.current_image.mode == 'RGBA' and ext in ['.jpg', '.jpeg']:
-                    # Créer une image blanche pour le fond
-                    background = Image.new('RGB', self.current_image.size, (255, 255, 255))
-                    # Coller l'image avec transparence sur le fond blanc
-                    background.paste(self.current_image, mask=self.current_image.split()[3])
-                    # Enregistrer l'image résultante
-                    background.save(filepath, **save_kwargs)
-                else:
-                    # Sinon, enregistrer normalement
-                    self.current_image.save(filepath, **save_kwargs)
-            else:
-                # Pour les tableaux numpy (OpenCV)
-                img_array = self.current_image
-                # Si c'est une image couleur (3 ou 4 canaux)
-                if len(img_array.shape) == 3:
-                    # Si c'est en RGB, convertir en BGR pour OpenCV
-                    if img_array.shape[2] == 3:  # RGB
-                        img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-                    elif img_array.shape[2] == 4:  # RGBA
-                        # Pour les images avec transparence, créer un fond blanc
-                        if ext in ['.jpg', '.jpeg']:
-                            # Convertir en RGB avec fond blanc
-                            alpha = img_array[:, :, 3] / 255.0
-                            rgb = img_array[:, :, :3]
-                            background = np.ones_like(rgb, dtype=np.uint8) * 255
-                            for c in range(3):
-                                background[:, :, c] = (1.0 - alpha) * 255 + alpha * rgb[:, :, c]
-                            img_array = background.astype(np.uint8)
-                            img_array = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-                        else:
-                            # Pour les formats supportant la transparence, convertir en RGBA
-                            img_array = cv2.cvtColor(img_array, cv2.COLOR_RGBA2BGRA)
-                
-                # Enregistrer avec OpenCV
-                if ext in ['.jpg', '.jpeg']:
-                    # Pour JPEG, ajouter le paramètre de qualité
-                    cv2.imwrite(filepath, img_array, [int(cv2.IMWRITE_JPEG_QUALITY), 95])
-                elif ext == '.png':
-                    # Pour PNG, ajouter le paramètre de compression
-                    cv2.imwrite(filepath, img_array, [int(cv2.IMWRITE_PNG_COMPRESSION), 6])
-                else:
-                    # Pour les autres formats, enregistrer normalement
-                    cv2.imwrite(filepath, img_array)
+                params = [int(cv2.IMWRITE_PNG_COMPRESSION), 6]  # Niveau de compression moyen
             
-            # Mettre à jour le chemin de l'image et le titre de la fenêtre
-            self.image_path = filepath
-            filename = os.path.basename(filepath)
-            self.master.title(f"Image Processor - {filename}")
+            # Tableau numpy indépendant de l'image PIL : le service l'encode sans le recopier
+            img_array = np.asarray(self._to_savable_image(self.current_image))
             
-            # Afficher un message de confirmation
-            self.logger.info(f"Image enregistrée avec succès: {filepath}")
-            self.status_var.set(f"Image enregistrée: {os.path.basename(filepath)}")
-            messagebox.showinfo("Succès", f"L'image a été enregistrée sous :\n{filepath}")
+            # Encodage et écriture atomique en arrière-plan, sans bloquer l'interface
+            future = self.save_service.submit(img_array, filepath, params=params)
+            self._poll_save(future)
             
         except Exception as e:
             error_details = traceback.format_exc()
@@ -786,14 +802,53 @@ class MainWindow:
             )
             self.logger.error(f"Erreur lors de l'enregistrement:\n{error_details}")
             self.status_var.set("Erreur lors de l'enregistrement")
-            messagebox.showerror("Erreur", error_msg)
-            
-        finally:
-            # Restaurer le curseur
             self._set_cursor_normal()
+            messagebox.showerror("Erreur", error_msg)
+    
+    def _to_savable_image(self, image):
+        """Convertit une image PIL dans un mode encodable directement (L, RGB ou RGBA)."""
+        if image.mode in ['L', 'RGB', 'RGBA']:
+            return image
+        if image.mode == '1':
+            return image.convert('L')
+        if image.mode in ['LA', 'PA'] or 'transparency' in image.info:
+            return image.convert('RGBA')
+        return image.convert('RGB')
+    
+    def _poll_save(self, future):
+        """Surveille un enregistrement en arrière-plan et publie son résultat."""
+        if not future.done():
+            self.master.after(50, self._poll_save, future)
+            return
+        
+        # Restaurer le curseur
+        self._set_cursor_normal()
+        
+        result = future.result()
+        if result.error:
+            error_msg = (
+                f"Impossible d'enregistrer l'image.\n\n"
+                f"Erreur: {result.error}\n\n"
+                f"Assurez-vous d'avoir les permissions nécessaires et que le chemin est valide."
+            )
+            self.logger.error(f"Erreur lors de l'enregistrement: {result.error}")
+            self.status_var.set("Erreur lors de l'enregistrement")
+            messagebox.showerror("Erreur", error_msg)
+            return
+        
+        # Mettre à jour le chemin de l'image et le titre de la fenêtre
+        self.image_path = result.filepath
+        filename = os.path.basename(result.filepath)
+        self.master.title(f"Image Processor - {filename}")
+        
+        # Afficher un message de confirmation
+        details = f"{format_size(result.size)}, encodage {result.encode_time * 1000:.0f} ms"
+        self.logger.info(f"Image enregistrée avec succès: {result.filepath} ({details})")
+        self.status_var.set(f"Image enregistrée: {filename} ({details})")
+        messagebox.showinfo("Succès", f"L'image a été enregistrée sous :\n{result.filepath}")
     
     def _update_image_display(self):
-        """Met à jour l'affichage de l'image dans le canvas."""
+        """Met à jour l'affichage de l'image dans le canvas (partie visible seulement)."""
         if self.current_image is None:
             return
         
@@ -809,51 +864,14 @@ class MainWindow:
                 if canvas_width <= 1 or canvas_height <= 1:
                     return  # Taille de canvas toujours invalide
             
-            # Obtenir les dimensions de l'image
-            img_width, img_height = self.current_image.size
-            
-            # Calculer les nouvelles dimensions en conservant le ratio
-            ratio = min(
-                (canvas_width - 20) / img_width,
-                (canvas_height - 20) / img_height
-            )
-            
-            # S'assurer que le ratio n'est pas trop petit
-            ratio = max(ratio, 0.1)  # Ne pas réduire en dessous de 10%
+            # Effacer le message d'accueil ; les tuiles d'affichage sont réutilisées
+            self.canvas.delete("message")
             
-            new_width = int(img_width * ratio)
-            new_height = int(img_height * ratio)
-            
-            # Redimensionner l'image
-            resized_img = self.current_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Convertir en format PhotoImage pour Tkinter
-            self.photo_img = ImageTk.PhotoImage(resized_img)
-            
-            # Mettre à jour le canvas
-            self.canvas.config(
-                width=new_width,
-                height=new_height,
-                scrollregion=(0, 0, new_width, new_height)
-            )
-            
-            # Effacer le contenu actuel du canvas
-            self.canvas.delete("all")
-            
-            # Afficher l'image au centre du canvas
-            x = (canvas_width - new_width) // 2 if canvas_width > new_width else 0
-            y = (canvas_height - new_height) // 2 if canvas_height > new_height else 0
-            
-            # Créer l'image dans le canvas
-            self.image_on_canvas = self.canvas.create_image(
-                x, y,
-                anchor=tk.NW,
-                image=self.photo_img
-            )
-            
-            # Mettre à jour la barre de défilement si nécessaire
-            self.canvas.xview_moveto(0)
-            self.canvas.yview_moveto(0)
+            self.viewport.resize(canvas_width, canvas_height)
+            if self.viewport.version != self._image_version:
+                # Image de même taille (filtre, seuillage...) : zoom et position conservés
+                self.viewport.set_image(self._display_source(), self._image_version, keep_view=True)
+            self._render_view()
             
         except Exception as e:
             error_details = traceback.format_exc()
@@ -862,6 +880,104 @@ class MainWindow:
             self.status_var.set("Erreur d'affichage")
             messagebox.showerror("Erreur", error_msg)
     
+    def _display_source(self):
+        """Tableau numpy de l'image courante pour l'affichage (RGB, RGBA ou niveaux de gris)."""
+        if self.current_image.mode not in ('RGB', 'RGBA', 'L'):
+            return np.array(self.current_image.convert('RGBA'))
+        return self._image_data().array
+    
+    def _render_view(self):
+        """Affiche la partie visible de l'image et met à jour les barres de défilement."""
+        self._render_id = None
+        viewport = self.viewport
+        if viewport.pyramid is None:
+            return
+        self._view_frame = viewport.render(self._view_frame)
+        self.display.resize(viewport.width, viewport.height)
+        self.display.show(self._view_frame)
+        self.logger.debug(f"Affichage : rendu {viewport.render_time * 1000:.1f} ms, "
+                          f"transfert {self.display.stats.last_frame_time * 1000:.1f} ms")
+        
+        # Échelle et position de l'affichage, pour ramener les
+        # coordonnées du canvas à celles de l'image
+        self._display_ratio = viewport.zoom
+        self._display_offset = (-viewport.origin[0], -viewport.origin[1])
+        
+        (x_first, x_last), (y_first, y_last) = viewport.scroll_fractions()
+        self.x_scroll.set(x_first, x_last)
+        self.y_scroll.set(y_first, y_last)
+        
+        # Préparer au repos les tuiles voisines de la vue
+        if self._prefetch_id is not None:
+            self.master.after_cancel(self._prefetch_id)
+        self._prefetch_id = self.master.after(50, self._prefetch_tiles)
+    
+    def _prefetch_tiles(self):
+        """Calcule quelques tuiles autour de la vue, puis recommence tant qu'il en manque."""
+        self._prefetch_id = None
+        if self.viewport.prefetch(limit=2):
+            self._prefetch_id = self.master.after(1, self._prefetch_tiles)
+    
+    def _request_render(self):
+        """Regroupe les demandes de rendu (déplacement, molette) en un seul rendu au repos."""
+        if self._render_id is None:
+            self._render_id = self.master.after_idle(self._render_view)
+    
+    def _set_view(self, action):
+        """Ajuste, met à l'échelle 1:1 ou zoome la vue ('fit', 'actual', 'in', 'out')."""
+        if self.current_image is None or self.viewport.pyramid is None:
+            return
+        if action == 'fit':
+            self.viewport.fit()
+        elif action == 'actual':
+            self.viewport.set_zoom(1.0)
+        else:
+            self.viewport.zoom_by(1.25 if action == 'in' else 0.8)
+        self._request_render()
+        self.status_var.set(f"Zoom {self.viewport.zoom * 100:.0f} %")
+    
+    def _on_mouse_wheel(self, event):
+        """Zoome autour du point sous le curseur."""
+        if self.current_image is None or self.viewport.pyramid is None:
+            return
+        zoom_in = event.num == 4 or getattr(event, 'delta', 0) > 0
+        self.viewport.zoom_by(1.25 if zoom_in else 0.8, event.x, event.y)
+        self._request_render()
+        self.status_var.set(f"Zoom {self.viewport.zoom * 100:.0f} %")
+    
+    def _on_pan_start(self, event):
+        """Début d'un déplacement de la vue à la souris."""
+        self._pan_anchor = (event.x, event.y)
+        self.canvas.config(cursor='fleur')
+    
+    def _on_pan_drag(self, event):
+        """Déplace la vue avec la souris."""
+        if self._pan_anchor is None or self.viewport.pyramid is None:
+            return
+        x0, y0 = self._pan_anchor
+        self._pan_anchor = (event.x, event.y)
+        self.viewport.pan(event.x - x0, event.y - y0)
+        self._request_render()
+    
+    def _on_pan_end(self, event):
+        """Fin du déplacement de la vue."""
+        self._pan_anchor = None
+        self.canvas.config(cursor='')
+    
+    def _on_scrollbar(self, axis, action, *args):
+        """Commande des barres de défilement ('moveto' ou 'scroll')."""
+        if self.current_image is None or self.viewport.pyramid is None:
+            return
+        viewport = self.viewport
+        if action == 'moveto':
+            viewport.scroll_to(axis, float(args[0]))
+        elif action == 'scroll':
+            count, unit = int(args[0]), args[1]
+            length = viewport.width if axis == 'x' else viewport.height
+            step = count * length * (0.9 if unit == 'pages' else 0.1)
+            viewport.pan(-step if axis == 'x' else 0, -step if axis == 'y' else 0)
+        self._request_render()
+    
     def _set_ui_state(self, has_image):
         """Active ou désactive les contrôles en fonction de l'état de l'application."""
         # Activer/désactiver les éléments du menu s'ils existent
@@ -894,6 +1010,15 @@ class MainWindow:
         self.file_menu.add_command(label="Quitter", command=self.master.quit)
         menubar.add_cascade(label="Fichier", menu=self.file_menu)
         
+        # Menu Affichage
+        view_menu = tk.Menu(menubar, tearoff=0)
+        view_menu.add_command(label="Ajuster à la fenêtre", command=lambda: self._set_view('fit'))
+        view_menu.add_command(label="Taille réelle (100 %)", command=lambda: self._set_view('actual'))
+        view_menu.add_separator()
+        view_menu.add_command(label="Zoom avant", command=lambda: self._set_view('in'))
+        view_menu.add_command(label="Zoom arrière", command=lambda: self._set_view('out'))
+        menubar.add_cascade(label="Affichage", menu=view_menu)
+        
         # Menu Aide
         help_menu = tk.Menu(menubar, tearoff=0)
         help_menu.add_command(label="À propos...", command=self._show_about)
@@ -1184,6 +1309,17 @@ class MainWindow:
         
         self.kernel_label = ttk.Label(param_frame, text="5x5")
         self.kernel_label.pack(side='left', padx=5)
+        
+        # Forme de l'élément structurant
+        ttk.Label(param_frame, text="Forme:").pack(side='left', padx=5)
+        self.kernel_shape = tk.StringVar(value='rect')
+        ttk.Combobox(
+            param_frame,
+            textvariable=self.kernel_shape,
+            values=SHAPES,
+            state='readonly',
+            width=8
+        ).pack(side='left', padx=5)
 
         
     def _update_kernel_size(self):
@@ -1300,21 +1436,28 @@ class MainWindow:
             style='TButton'
         ).pack(fill='x', pady=2)
 
-        # Boutons conceptuels (Division-fusion, Croissance de régions)
-        info_frame = ttk.LabelFrame(tab, text="Algorithmes conceptuels", padding=5)
-        info_frame.pack(fill='x', pady=5)
+        # Segmentation par régions (Division-fusion, Croissance de régions)
+        region_frame = ttk.LabelFrame(tab, text="Segmentation par régions", padding=5)
+        region_frame.pack(fill='x', pady=5)
 
         ttk.Button(
-            info_frame,
-            text="Division-fusion (infos)",
-            command=self._show_split_merge_info,
+            region_frame,
+            text="Division-fusion",
+            command=self._apply_split_merge,
             style='TButton'
         ).pack(fill='x', pady=2)
 
         ttk.Button(
-            info_frame,
-            text="Croissance de régions (infos)",
-            command=self._show_region_growing_info,
+            region_frame,
+            text="Croissance de régions",
+            command=self._apply_region_growing,
+            style='TButton'
+        ).pack(fill='x', pady=2)
+
+        ttk.Button(
+            region_frame,
+            text="GrabCut (tracer un rectangle)",
+            command=self._start_grabcut_selection,
             style='TButton'
         ).pack(fill='x', pady=2)
 
@@ -1580,17 +1723,8 @@ class MainWindow:
         import numpy as np
 
         try:
-            img_array = np.array(self.current_image)
-
-            # Conversion en niveaux de gris
-            if img_array.ndim == 3:
-                gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-            else:
-                gray = img_array
-
-            # FFT 2D et centrage
-            f = np.fft.fft2(gray)
-            fshift = np.fft.fftshift(f)
+            # FFT 2D centrée, partagée par les opérations FFT
+            fshift = self._centered_spectrum()
 
             magnitude_spectrum = 20 * np.log(np.abs(fshift) + 1)
             magnitude_spectrum = cv2.normalize(
@@ -1614,20 +1748,11 @@ class MainWindow:
         import numpy as np
 
         try:
-            img_array = np.array(self.current_image)
-
-            if img_array.ndim == 3:
-                gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-            else:
-                gray = img_array
-
-            rows, cols = gray.shape
+            # FFT + centrage (en cache pour la version courante)
+            fshift = self._centered_spectrum()
+            rows, cols = fshift.shape
             crow, ccol = rows // 2, cols // 2
 
-            # FFT + centrage
-            f = np.fft.fft2(gray)
-            fshift = np.fft.fftshift(f)
-
             # Masque passe-bas circulaire
             mask = np.zeros((rows, cols), np.uint8)
             radius = min(rows, cols) // 4
@@ -1659,19 +1784,10 @@ class MainWindow:
         import numpy as np
 
         try:
-            img_array = np.array(self.current_image)
-
-            if img_array.ndim == 3:
-                gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-            else:
-                gray = img_array
-
-            rows, cols = gray.shape
+            fshift = self._centered_spectrum()
+            rows, cols = fshift.shape
             crow, ccol = rows // 2, cols // 2
 
-            f = np.fft.fft2(gray)
-            fshift = np.fft.fftshift(f)
-
             # Masque passe-haut = 1 - passe-bas
             mask = np.ones((rows, cols), np.uint8)
             radius = min(rows, cols) // 4
@@ -1702,19 +1818,10 @@ class MainWindow:
         import numpy as np
 
         try:
-            img_array = np.array(self.current_image)
-
-            if img_array.ndim == 3:
-                gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-            else:
-                gray = img_array
-
-            rows, cols = gray.shape
+            fshift = self._centered_spectrum()
+            rows, cols = fshift.shape
             crow, ccol = rows // 2, cols // 2
 
-            f = np.fft.fft2(gray)
-            fshift = np.fft.fftshift(f)
-
             # Masque passe-haut
             mask = np.ones((rows, cols), np.uint8)
             radius = min(rows, cols) // 6
@@ -1730,7 +1837,7 @@ class MainWindow:
 
             # Rehaussement : image originale + alpha * passe-haut
             alpha = 1.0
-            enhanced = gray.astype(np.float32) + alpha * hp_norm.astype(np.float32)
+            enhanced = self._current_gray().astype(np.float32) + alpha * hp_norm.astype(np.float32)
             enhanced = np.clip(enhanced, 0, 255).astype(np.uint8)
 
             self.current_image = Image.fromarray(enhanced)
@@ -1793,26 +1900,35 @@ class MainWindow:
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur lors de l'application du filtre moyenneur: {str(e)}")
 
+    def _image_data(self):
+        """Image courante (RGB) et ses conversions, calculées une fois par version."""
+        data = self._image_data_cache
+        if data is None or data.version != self._image_version:
+            data = self._image_data_cache = ImageData.from_pil(self.current_image, self._image_version)
+        return data
+
+    def _current_gray(self):
+        """Image courante en niveaux de gris (tableau numpy en lecture seule)."""
+        return self._image_data().gray
+
+    def _centered_spectrum(self):
+        """Transformée de Fourier centrée de l'image courante en niveaux de gris."""
+        data = self._image_data()
+        return data.cached('fft', lambda: np.fft.fftshift(np.fft.fft2(data.gray)))
+
+    def _gradients(self, blur_size=0, sigma=0):
+        """Dérivées de l'image courante, calculées une fois par version et par lissage."""
+        return self._gradient_cache.get(self._image_version, self._current_gray,
+                                        blur_size=blur_size, sigma=sigma)
+
     def _apply_laplacian_filter(self):
         """Applique un filtre Laplacien (passe-haut) pour renforcer les contours."""
         if self.current_image is None:
             messagebox.showwarning("Avertissement", "Aucune image à filtrer.")
             return
 
-        import cv2
-        import numpy as np
-
         try:
-            img_array = np.array(self.current_image)
-
-            # Conversion en niveaux de gris pour le Laplacien
-            if img_array.ndim == 3:
-                gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-            else:
-                gray = img_array
-
-            lap = cv2.Laplacian(gray, ddepth=cv2.CV_64F, ksize=3)
-            lap_abs = cv2.convertScaleAbs(lap)
+            lap_abs = cv2.convertScaleAbs(self._gradients().laplacian)
 
             self.current_image = Image.fromarray(lap_abs)
             self._update_image_display()
@@ -1827,23 +1943,9 @@ class MainWindow:
             messagebox.showwarning("Avertissement", "Aucune image à filtrer.")
             return
 
-        import cv2
-        import numpy as np
-
         try:
-            img_array = np.array(self.current_image)
-
-            # Conversion en niveaux de gris
-            if img_array.ndim == 3:
-                gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-            else:
-                gray = img_array
-
-            sobelx = cv2.Sobel(gray, cv2.CV_64F, 1, 0, ksize=3)
-            sobely = cv2.Sobel(gray, cv2.CV_64F, 0, 1, ksize=3)
-
-            mag = np.sqrt(sobelx ** 2 + sobely ** 2)
-            mag = np.clip(mag, 0, 255).astype(np.uint8)
+            # Norme saturée à 255
+            mag = cv2.convertScaleAbs(self._gradients().magnitude)
 
             self.current_image = Image.fromarray(mag)
             self._update_image_display()
@@ -1855,20 +1957,8 @@ class MainWindow:
     def _detect_edges(self):
         """Détecte les contours dans l'image."""
         if self.current_image:
-            import cv2
-            import numpy as np
-            
-            # Convertir l'image PIL en tableau numpy pour OpenCV
-            img_array = np.array(self.current_image)
-            
-            # Si l'image est en couleur, la convertir en niveaux de gris
-            if len(img_array.shape) == 3:
-                gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-            else:
-                gray = img_array
-            
-            # Détecter les contours avec Canny
-            edges = cv2.Canny(gray, 100, 200)
+            # Détecter les contours avec Canny (dérivées partagées)
+            edges = self._gradients().canny(100, 200)
             
             # Convertir de nouveau en image PIL
             self.current_image = Image.fromarray(edges)
@@ -1927,41 +2017,71 @@ class MainWindow:
             else:
                 gray = img_array
             
-            # Appliquer un seuillage d'Otsu
-            _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+            method = simpledialog.askstring(
+                "Seuillage automatique",
+                f"Méthode ({', '.join(THRESHOLD_METHODS)}) :",
+                initialvalue='otsu'
+            )
+            if method is None:
+                return
+            method = method.strip().lower()
+            if method not in THRESHOLD_METHODS:
+                messagebox.showwarning("Avertissement", f"Méthode inconnue : {method}")
+                return
+            
+            # Seuil calculé sur l'histogramme, appliqué en une passe
+            threshold = auto_threshold(gray, method)
+            thresh = apply_thresholds(gray, [threshold], (0, 255))
             
             # Convertir de nouveau en image PIL
             self.current_image = Image.fromarray(thresh)
             self._update_image_display()
+            if hasattr(self, 'status_var'):
+                self.status_var.set(f"Seuillage automatique ({method}, seuil {threshold:g})")
     
     def _color_segmentation(self):
-        """Effectue une segmentation par couleur sur l'image (zones bleues)."""
+        """Effectue une segmentation par couleur sur l'image (couleur de la palette)."""
         if self.current_image is not None:
             import cv2
             import numpy as np
 
-            # Convertir l'image PIL en tableau numpy (RGB)
-            img_array = np.array(self.current_image)
+            # Image courante (RGB) et sa conversion HSV partagée
+            data = self._image_data()
+            img_array = data.array
 
-            if img_array.ndim != 3:
+            if not data.is_color:
                 messagebox.showinfo(
                     "Information",
                     "L'image doit être en couleur pour la segmentation par couleur."
                 )
                 return
 
-            # Convertir en HSV
-            hsv = cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV)
-
-            # Plage de bleu (exemple)
-            lower_blue = np.array([90, 50, 50])
-            upper_blue = np.array([130, 255, 255])
+            names = [name for name, _, _ in BASIC_COLORS]
+            color_name = simpledialog.askstring(
+                "Segmentation par couleur",
+                f"Couleur ({', '.join(names)}):",
+                initialvalue='Bleu'
+            )
+            if color_name is None:
+                return
+            if color_name not in names:
+                messagebox.showerror("Erreur", f"Couleur inconnue: {color_name}")
+                return
 
-            mask = cv2.inRange(hsv, lower_blue, upper_blue)
+            # Le bleu garde la plage historique de la segmentation (teinte
+            # 90-130, saturation et valeur dès 50), plus large que celle de
+            # la détection des couleurs
+            palette = [('Bleu', (90, 50, 50), (130, 255, 255)) if name == 'Bleu' else (name, lower, upper)
+                       for name, lower, upper in BASIC_COLORS]
+            classifier = ColorClassifier(palette)
+            _, masks, counts = classifier.segment_converted(data.hsv)
+            mask = masks[color_name]
             result = cv2.bitwise_and(img_array, img_array, mask=mask)
 
             self.current_image = Image.fromarray(result)
             self._update_image_display()
+            share = 100.0 * counts[color_name] / mask.size
+            self.status_var.set(f"Segmentation {color_name}: {share:.1f} % des pixels")
     
     # (Anciennes définitions dupliquées supprimées pour éviter les conflits.)
     
@@ -1982,7 +2102,7 @@ class MainWindow:
                 kernel_size = self.kernel_size.get()
                 if kernel_size % 2 == 0:  # S'assurer que la taille est impaire
                     kernel_size += 1
-                blurred = cv2.medianBlur(gray, kernel_size)
+                blurred = apply_median_blur(gray, kernel_size)
                 
                 # Mettre à jour l'image (revenir en PIL RGB)
                 self.current_image = Image.fromarray(blurred)
@@ -2020,22 +2140,12 @@ class MainWindow:
         """Améliore le contraste de l'image."""
         if self.current_image is not None:
             try:
-                # Convertir l'image PIL en tableau numpy (RGB)
-                img_array = np.array(self.current_image)
+                data = self._image_data()
+
+                # CLAHE sur la luminosité uniquement (canal L du Lab en cache)
+                result = clahe(data.array, clip_limit=3.0, tile_grid_size=(8, 8), order='rgb',
+                               converted=data.lab if data.is_color else None)
 
-                # Convertir en LAB pour améliorer le contraste sur la luminosité uniquement
-                lab = cv2.cvtColor(img_array, cv2.COLOR_RGB2LAB)
-                l, a, b = cv2.split(lab)
-                
-                # Appliquer l'égalisation d'histogramme CLAHE
-                clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-                cl = clahe.apply(l)
-                
-                # Fusionner les canaux
-                limg = cv2.merge((cl,a,b))
-                
-                # Reconvertir en RGB puis en PIL
-                result = cv2.cvtColor(limg, cv2.COLOR_LAB2RGB)
                 self.current_image = Image.fromarray(result)
                 self._update_image_display()
                 self.status_var.set("Contraste amélioré")
@@ -2049,13 +2159,8 @@ class MainWindow:
             try:
                 img_array = np.array(self.current_image)
 
-                # Convertir en niveaux de gris
-                if img_array.ndim == 3:
-                    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-                else:
-                    gray = img_array
-
-                equalized = cv2.equalizeHist(gray)
+                # Égaliser la luminance (canal Y de YCrCb) en gardant les couleurs
+                equalized = equalize(img_array, space='ycrcb', order='rgb')
                 self.current_image = Image.fromarray(equalized)
                 
                 self._update_image_display()
@@ -2073,8 +2178,7 @@ class MainWindow:
                     kernel_size += 1
                 
                 img_array = np.array(self.current_image)
-                kernel = np.ones((kernel_size, kernel_size), np.uint8)
-                opening = cv2.morphologyEx(img_array, cv2.MORPH_OPEN, kernel)
+                opening = apply_opening(img_array, kernel_size, shape=self.kernel_shape.get())
 
                 self.current_image = Image.fromarray(opening)
                 self._update_image_display()
@@ -2092,8 +2196,7 @@ class MainWindow:
                     kernel_size += 1
                 
                 img_array = np.array(self.current_image)
-                kernel = np.ones((kernel_size, kernel_size), np.uint8)
-                closing = cv2.morphologyEx(img_array, cv2.MORPH_CLOSE, kernel)
+                closing = apply_closing(img_array, kernel_size, shape=self.kernel_shape.get())
 
                 self.current_image = Image.fromarray(closing)
                 self._update_image_display()
@@ -2125,12 +2228,7 @@ class MainWindow:
             else:
                 gray = img_array
 
-            kernel = np.ones((k, k), np.uint8)
-
-            dilated = cv2.dilate(gray, kernel, iterations=1)
-            eroded = cv2.erode(gray, kernel, iterations=1)
-
-            gradient = cv2.subtract(dilated, eroded)
+            gradient = apply_gradient(gray, k, shape=self.kernel_shape.get())
 
             self.current_image = Image.fromarray(gradient)
             self._update_image_display()
@@ -2151,18 +2249,36 @@ class MainWindow:
                 else:
                     gray = img_array
                 
-                # Appliquer le seuillage adaptatif
-                thresh = cv2.adaptiveThreshold(
-                    gray, 255, 
-                    cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                    cv2.THRESH_BINARY, 
-                    11, 2
+                method = simpledialog.askstring(
+                    "Seuillage adaptatif",
+                    f"Méthode ({', '.join(ADAPTIVE_METHODS)}) :",
+                    initialvalue='sauvola'
+                )
+                if method is None:
+                    return
+                method = method.strip().lower()
+                if method not in ADAPTIVE_METHODS:
+                    messagebox.showwarning("Avertissement", f"Méthode inconnue : {method}")
+                    return
+
+                block_size = simpledialog.askinteger(
+                    "Seuillage adaptatif",
+                    "Taille de bloc (impaire) :",
+                    initialvalue=31,
+                    minvalue=3,
+                    maxvalue=1001
                 )
+                if block_size is None:
+                    return
+                block_size |= 1
+
+                # Appliquer le seuillage adaptatif (bandes de 1024 lignes pour les grandes images)
+                thresh = adaptive_threshold(gray, block_size, 2, method=method, tile_rows=1024)
                 
                 # Revenir en image PIL
                 self.current_image = Image.fromarray(thresh)
                 self._update_image_display()
-                self.status_var.set("Seuillage adaptatif appliqué")
+                self.status_var.set(f"Seuillage adaptatif appliqué ({method}, bloc {block_size})")
                 
             except Exception as e:
                 messagebox.showerror("Erreur", f"Erreur lors du seuillage adaptatif: {str(e)}")
@@ -2171,39 +2287,29 @@ class MainWindow:
         """Détecte les couleurs dominantes dans l'image."""
         if self.current_image is not None:
             try:
-                img_array = np.array(self.current_image)
+                data = self._image_data()
+                img_array = data.array
 
-                # Convertir en espace de couleur HSV
-                hsv = cv2.cvtColor(img_array, cv2.COLOR_RGB2HSV)
-                
-                # Définir les plages de couleurs à détecter
-                color_ranges = [
-                    ('Rouge', (0, 100, 100), (10, 255, 255)),
-                    ('Vert', (40, 100, 100), (80, 255, 255)),
-                    ('Bleu', (100, 100, 100), (140, 255, 255)),
-                    ('Jaune', (20, 100, 100), (40, 255, 255))
-                ]
+                # Toutes les couleurs sont classées en une passe, sur le HSV en cache
+                classifier = ColorClassifier(BASIC_COLORS)
+                _, masks, counts = classifier.segment_converted(data.hsv)
                 
-                # Créer une image de sortie
-                output = img_array.copy()
+                # Tous les tracés vont sur un calque, composé une seule fois
+                overlay = ContourOverlay(img_array.shape)
                 
-                # Détecter chaque couleur
-                for color_name, lower, upper in color_ranges:
-                    # Créer un masque pour la couleur
-                    mask = cv2.inRange(hsv, np.array(lower), np.array(upper))
+                for color_name, mask in masks.items():
+                    if not counts[color_name]:
+                        continue
                     
-                    # Trouver les contours
-                    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+                    # Contours et mesures en lot
+                    contours = ContourSet.from_mask(mask)
+                    overlay.draw(contours, (0, 255, 0), 2)
                     
-                    # Dessiner les contours
-                    cv2.drawContours(output, contours, -1, (0, 255, 0), 2)
-                    
-                    # Ajouter un label pour chaque zone de couleur
-                    for contour in contours:
-                        if cv2.contourArea(contour) > 1000:  # Ignorer les petits contours
-                            x, y, w, h = cv2.boundingRect(contour)
-                            cv2.putText(output, color_name, (x, y-10), 
-                                      cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 0, 255), 2)
+                    # Ajouter un label pour chaque zone de couleur (petits contours ignorés)
+                    large = contours.filter(min_area=1000)
+                    overlay.label(color_name, large.bbox[:, :2] - (0, 10), (0, 0, 255))
+                
+                output = overlay.compose(img_array)
                 
                 self.current_image = Image.fromarray(output)
                 self._update_image_display()
@@ -2213,37 +2319,53 @@ class MainWindow:
                 messagebox.showerror("Erreur", f"Erreur lors de la détection des couleurs: {str(e)}")
 
     def _canny_edge_detection(self):
-        """Détecte les contours avec l'algorithme de Canny."""
+        """Détecte les contours avec l'algorithme de Canny (seuils automatiques ou fixes)."""
         if self.current_image is not None:
+            method = simpledialog.askstring(
+                "Canny",
+                f"Seuils ({', '.join(CANNY_THRESHOLD_METHODS)}, fixe):",
+                initialvalue='median'
+            )
+            if method is None:
+                return
+            method = method.strip().lower()
+            if method not in CANNY_THRESHOLD_METHODS + ('fixe',):
+                messagebox.showerror("Erreur", f"Méthode inconnue: {method}")
+                return
             try:
-                img_array = np.array(self.current_image)
-
-                # Convertir en niveaux de gris
-                if img_array.ndim == 3:
-                    gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+                # Flou 5x5 pour réduire le bruit, puis Canny sur les dérivées partagées
+                gradients = self._gradients(blur_size=5)
+                if method == 'fixe':
+                    edges, (low, high) = gradients.canny(50, 150), (50, 150)
                 else:
-                    gray = img_array
-                
-                # Appliquer un flou pour réduire le bruit
-                blurred = cv2.GaussianBlur(gray, (5, 5), 0)
-                
-                # Détection des contours avec Canny
-                edges = cv2.Canny(blurred, 50, 150)
+                    edges, (low, high) = gradients.auto_canny(method)
                 
                 # Revenir en PIL (image binaire)
                 self.current_image = Image.fromarray(edges)
                 self._update_image_display()
-                self.status_var.set("Détection de contours (Canny) effectuée")
+                self.status_var.set(f"Détection de contours (Canny) effectuée, seuils {low:.0f}/{high:.0f}")
                 
             except Exception as e:
                 messagebox.showerror("Erreur", f"Erreur lors de la détection des contours: {str(e)}")
 
     def _hough_line_detection(self):
-        """Détecte les lignes avec la transformée de Hough (probabiliste)."""
+        """Détecte les lignes (Hough probabiliste par pyramide, ou LSD)."""
         if self.current_image is None:
             messagebox.showwarning("Avertissement", "Aucune image pour la détection de lignes.")
             return
 
+        method = simpledialog.askstring(
+            "Détection de lignes",
+            f"Méthode ({', '.join(LINE_METHODS)}):",
+            initialvalue='hough'
+        )
+        if method is None:
+            return
+        method = method.strip().lower()
+        if method not in LINE_METHODS:
+            messagebox.showerror("Erreur", f"Méthode inconnue: {method}")
+            return
+
         import cv2
         import numpy as np
 
@@ -2258,32 +2380,17 @@ class MainWindow:
                 color_img = img_array.copy()
                 gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
 
-            # Réduction du bruit puis Canny
-            blurred = cv2.GaussianBlur(gray, (5, 5), 1.0)
-            edges = cv2.Canny(blurred, 50, 150)
-
-            # Transformée de Hough probabiliste
-            lines = cv2.HoughLinesP(
-                edges,
-                rho=1,
-                theta=np.pi / 180,
-                threshold=80,
-                minLineLength=30,
-                maxLineGap=10,
-            )
+            lines = detect_lines(gray, method=method)
 
-            # Dessiner les lignes détectées en rouge
-            if lines is not None:
-                for line in lines:
-                    x1, y1, x2, y2 = line[0]
-                    cv2.line(color_img, (x1, y1), (x2, y2), (255, 0, 0), 2)
+            # Dessiner les lignes détectées en rouge, sur place
+            draw_lines(color_img, lines, (255, 0, 0), 2, dst=color_img)
 
             self.current_image = Image.fromarray(color_img)
             self._update_image_display()
             if hasattr(self, 'status_var'):
-                self.status_var.set("Détection de lignes (Hough) effectuée")
+                self.status_var.set(f"Détection de lignes ({method}) : {len(lines)} segments")
         except Exception as e:
-            messagebox.showerror("Erreur", f"Erreur lors de la détection de lignes (Hough): {str(e)}")
+            messagebox.showerror("Erreur", f"Erreur lors de la détection de lignes: {str(e)}")
 
     def _apply_manual_threshold(self):
         """Applique un seuillage manuel avec la valeur du curseur."""
@@ -2314,34 +2421,20 @@ class MainWindow:
                 messagebox.showerror("Erreur", f"Erreur lors du seuillage manuel: {str(e)}")
 
     def _apply_multi_thresholds(self):
-        """Applique un seuillage multi-seuils (T1, T2) pour 3 classes de niveaux de gris."""
+        """Applique un seuillage multi-seuils (2 à 5 classes), pré-rempli par Otsu multiple."""
         if self.current_image is None:
             messagebox.showwarning("Avertissement", "Aucune image à segmenter.")
             return
 
-        import cv2
-        import numpy as np
-
         try:
-            # Demander T1 et T2
-            t1 = simpledialog.askinteger(
-                "Seuillage multi-seuils",
-                "Seuil T1 (0-254):",
-                initialvalue=85,
-                minvalue=0,
-                maxvalue=254,
-            )
-            if t1 is None:
-                return
-
-            t2 = simpledialog.askinteger(
+            classes = simpledialog.askinteger(
                 "Seuillage multi-seuils",
-                "Seuil T2 (T1+1 - 255):",
-                initialvalue=170,
-                minvalue=t1 + 1,
-                maxvalue=255,
+                "Nombre de classes (2-5):",
+                initialvalue=3,
+                minvalue=2,
+                maxvalue=5,
             )
-            if t2 is None:
+            if classes is None:
                 return
 
             img_array = np.array(self.current_image)
@@ -2352,16 +2445,32 @@ class MainWindow:
             else:
                 gray = img_array
 
-            # 3 classes : [0,T1[ -> 0, [T1,T2[ -> 127, [T2,255] -> 255
-            result = np.zeros_like(gray, dtype=np.uint8)
-            result[(gray >= 0) & (gray < t1)] = 0
-            result[(gray >= t1) & (gray < t2)] = 127
-            result[gray >= t2] = 255
+            # Seuils proposés par Otsu multiple, modifiables un à un
+            proposed = multi_otsu_thresholds(gray, classes)
+            upper = int(np.iinfo(gray.dtype).max) if np.issubdtype(gray.dtype, np.integer) else 255
+            thresholds = []
+            low = 0
+            for i, value in enumerate(proposed):
+                t = simpledialog.askinteger(
+                    "Seuillage multi-seuils",
+                    f"Seuil T{i + 1} ({low}-{upper - 1}):",
+                    initialvalue=max(int(value), low),
+                    minvalue=low,
+                    maxvalue=upper - 1,
+                )
+                if t is None:
+                    return
+                thresholds.append(t)
+                low = t + 1
+
+            # Une passe par table de correspondance, classes régulièrement espacées de 0 à 255
+            result = apply_thresholds(gray, thresholds)
 
             self.current_image = Image.fromarray(result)
             self._update_image_display()
             if hasattr(self, 'status_var'):
-                self.status_var.set(f"Seuillage multi-seuils appliqué (T1={t1}, T2={t2})")
+                text = ", ".join(f"T{i + 1}={t}" for i, t in enumerate(thresholds))
+                self.status_var.set(f"Seuillage multi-seuils appliqué ({text})")
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur lors du seuillage multi-seuils: {str(e)}")
 
@@ -2482,46 +2591,206 @@ class MainWindow:
             # S'assurer qu'on a une image binaire
             _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
 
-            num_labels, labels = cv2.connectedComponents(binary)
-
-            # Générer une LUT de couleurs aléatoires (0 = fond noir)
-            label_hue = np.uint8(179 * labels / np.maximum(num_labels - 1, 1))
-            blank_ch = 255 * np.ones_like(label_hue)
-            hsv = cv2.merge([label_hue, blank_ch, blank_ch])
-            colored = cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
-            colored[label_hue == 0] = 0  # fond en noir
+            labels, table = connected_components(binary, intensity=gray)
+            num_labels = table['label'].size
 
-            self.current_image = Image.fromarray(colored)
+            self.current_image = Image.fromarray(self._colorize_labels(labels, num_labels))
             self._update_image_display()
             if hasattr(self, 'status_var'):
-                self.status_var.set(f"Étiquetage des composantes (N={num_labels - 1} objets)")
+                if num_labels:
+                    self.status_var.set(
+                        f"Étiquetage des composantes (N={num_labels} objets, "
+                        f"surface moyenne {table['area'].mean():.1f} px, "
+                        f"périmètre moyen {table['perimeter'].mean():.1f} px)"
+                    )
+                else:
+                    self.status_var.set("Étiquetage des composantes (N=0 objets)")
         except Exception as e:
             messagebox.showerror("Erreur", f"Erreur lors de l'étiquetage des composantes: {str(e)}")
 
-    def _show_split_merge_info(self):
-        """Affiche une explication sur l'algorithme de division-fusion (split-and-merge)."""
-        text = (
-            "Division-fusion (split-and-merge) :\n\n"
-            "1. On commence par toute l'image comme une seule région.\n"
-            "2. Si une région n'est pas homogène (par exemple, variance trop grande),\n"
-            "   on la DIVISE en 4 sous-régions (division récursive en quadtree).\n"
-            "3. Une fois la division terminée, on FUSIONNE les régions voisines qui\n"
-            "   sont similaires (même moyenne / variance proche).\n"
-            "4. Le résultat est une partition de l'image en grandes régions homogènes."
+    def _colorize_labels(self, labels, num_labels=None):
+        """
+        Colore une image d'étiquettes (une teinte par étiquette, fond en noir).
+
+        Args:
+            labels (numpy.ndarray): Étiquettes (0 ou négatif = fond)
+            num_labels (int, optional): Nombre d'étiquettes (max des étiquettes par défaut)
+
+        Returns:
+            numpy.ndarray: Image RGB
+        """
+        if num_labels is None:
+            num_labels = int(labels.max()) if labels.size else 0
+        label_hue = np.uint8(179 * np.maximum(labels, 0) / max(num_labels, 1))
+        blank_ch = 255 * np.ones_like(label_hue)
+        hsv = cv2.merge([label_hue, blank_ch, blank_ch])
+        colored = cv2.cvtColor(hsv, cv2.COLOR_HSV2RGB)
+        colored[labels <= 0] = 0  # fond en noir
+        return colored
+
+    def _apply_split_merge(self):
+        """Segmente l'image par division-fusion (quadtree puis fusion des régions voisines)."""
+        if self.current_image is None:
+            messagebox.showwarning("Avertissement", "Aucune image à segmenter.")
+            return
+
+        try:
+            threshold = simpledialog.askfloat(
+                "Division-fusion",
+                "Écart-type maximal d'un bloc homogène :",
+                initialvalue=10.0,
+                minvalue=0.0,
+                maxvalue=128.0
+            )
+            if threshold is None:
+                return
+
+            img_array = np.array(self.current_image)
+            if img_array.ndim == 3:
+                gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
+            else:
+                gray = img_array
+
+            labels = split_and_merge(gray, threshold=threshold)
+            self.current_image = Image.fromarray(self._colorize_labels(labels))
+            self._update_image_display()
+            if hasattr(self, 'status_var'):
+                self.status_var.set(f"Division-fusion (N={int(labels.max())} régions)")
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Erreur lors de la division-fusion: {str(e)}")
+
+    def _apply_region_growing(self):
+        """Fait croître une région à partir d'un germe choisi par l'utilisateur."""
+        if self.current_image is None:
+            messagebox.showwarning("Avertissement", "Aucune image à segmenter.")
+            return
+
+        w, h = self.current_image.size
+
+        try:
+            x = simpledialog.askinteger(
+                "Croissance de régions",
+                f"Coordonnée X du germe (0 - {w-1}):",
+                initialvalue=w // 2,
+                minvalue=0,
+                maxvalue=w-1
+            )
+            if x is None:
+                return
+
+            y = simpledialog.askinteger(
+                "Croissance de régions",
+                f"Coordonnée Y du germe (0 - {h-1}):",
+                initialvalue=h // 2,
+                minvalue=0,
+                maxvalue=h-1
+            )
+            if y is None:
+                return
+
+            tolerance = simpledialog.askfloat(
+                "Croissance de régions",
+                "Écart maximal à la moyenne de la région :",
+                initialvalue=20.0,
+                minvalue=0.0,
+                maxvalue=442.0
+            )
+            if tolerance is None:
+                return
+
+            img_array = np.array(self.current_image)
+            if img_array.ndim == 3:
+                img_array = img_array[:, :, :3]
+            labels = region_growing(img_array, [(x, y)], tolerance=tolerance)
+
+            # Région en surbrillance sur l'image d'origine assombrie
+            rgb = img_array if img_array.ndim == 3 else cv2.cvtColor(img_array, cv2.COLOR_GRAY2RGB)
+            result = rgb // 3
+            region = labels > 0
+            result[region] = rgb[region]
+
+            self.current_image = Image.fromarray(result)
+            self._update_image_display()
+            if hasattr(self, 'status_var'):
+                self.status_var.set(f"Croissance de régions ({int(region.sum())} pixels)")
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Erreur lors de la croissance de régions: {str(e)}")
+
+    def _canvas_to_image(self, cx, cy):
+        """Convertit des coordonnées du canvas en coordonnées de l'image (bornées)."""
+        ratio = getattr(self, '_display_ratio', 1.0)
+        ox, oy = getattr(self, '_display_offset', (0, 0))
+        w, h = self.current_image.size
+        x = int((cx - ox) / ratio)
+        y = int((cy - oy) / ratio)
+        return min(max(x, 0), w - 1), min(max(y, 0), h - 1)
+
+    def _start_grabcut_selection(self):
+        """Active le tracé d'un rectangle sur le canvas pour GrabCut."""
+        if self.current_image is None:
+            messagebox.showwarning("Avertissement", "Aucune image à segmenter.")
+            return
+
+        self._grabcut_start = None
+        self.canvas.bind('<ButtonPress-1>', self._on_grabcut_press)
+        self.canvas.bind('<B1-Motion>', self._on_grabcut_drag)
+        self.canvas.bind('<ButtonRelease-1>', self._on_grabcut_release)
+        self.canvas.config(cursor='crosshair')
+        if hasattr(self, 'status_var'):
+            self.status_var.set("GrabCut : tracez un rectangle autour de l'objet")
+
+    def _on_grabcut_press(self, event):
+        """Début du rectangle de sélection."""
+        self._grabcut_start = (self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        self.canvas.delete("grabcut_rect")
+        self.canvas.create_rectangle(
+            *self._grabcut_start, *self._grabcut_start,
+            outline=self.colors['primary'], width=2, dash=(4, 2), tags=("grabcut_rect",)
         )
-        messagebox.showinfo("Division-fusion", text)
-
-    def _show_region_growing_info(self):
-        """Affiche une explication sur la croissance de régions (region growing)."""
-        text = (
-            "Croissance de régions (region growing) :\n\n"
-            "1. On choisit un ou plusieurs GERMES (pixels de départ).\n"
-            "2. On ajoute à la région les pixels voisins dont les caractéristiques\n"
-            "   (intensité, couleur) sont proches de celles du germe.\n"
-            "3. On répète tant que de nouveaux pixels peuvent être ajoutés.\n"
-            "4. Chaque germe donne naissance à une région connectée.\n"
+
+    def _on_grabcut_drag(self, event):
+        """Suit la souris pendant le tracé du rectangle."""
+        if self._grabcut_start is None:
+            return
+        self.canvas.coords(
+            "grabcut_rect", *self._grabcut_start,
+            self.canvas.canvasx(event.x), self.canvas.canvasy(event.y)
         )
-        messagebox.showinfo("Croissance de régions", text)
+
+    def _on_grabcut_release(self, event):
+        """Termine la sélection et lance GrabCut sur le rectangle tracé."""
+        start = self._grabcut_start
+        for sequence in ('<ButtonPress-1>', '<B1-Motion>', '<ButtonRelease-1>'):
+            self.canvas.unbind(sequence)
+        self.canvas.config(cursor='')
+        self.canvas.delete("grabcut_rect")
+        if start is None:
+            return
+
+        x0, y0 = self._canvas_to_image(*start)
+        x1, y1 = self._canvas_to_image(self.canvas.canvasx(event.x), self.canvas.canvasy(event.y))
+        rect = (min(x0, x1), min(y0, y1), abs(x1 - x0), abs(y1 - y0))
+        if rect[2] < 2 or rect[3] < 2:
+            messagebox.showwarning("Avertissement", "Rectangle trop petit pour GrabCut.")
+            return
+
+        try:
+            self.status_var.set("GrabCut en cours...")
+            self.master.update_idletasks()
+
+            img_array = np.array(self.current_image.convert('RGB'))
+            bgr = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
+            mask = grabcut_mask(bgr, rect)
+
+            # Fond mis à zéro, premier plan conservé
+            result = img_array.copy()
+            result[mask == 0] = 0
+            self.current_image = Image.fromarray(result)
+            self._update_image_display()
+            coverage = 100.0 * np.count_nonzero(mask) / mask.size
+            self.status_var.set(f"GrabCut appliqué ({coverage:.1f} % de premier plan)")
+        except Exception as e:
+            messagebox.showerror("Erreur", f"Erreur lors de GrabCut: {str(e)}")
 
     def on_resize(self, event=None):
         """Gère le redimensionnement de la fenêtre et de l'image."""
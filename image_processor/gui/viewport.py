@@ -0,0 +1,353 @@
+"""
+Module contenant la vue zoomable d'une image (zoom, déplacement, pyramide).
+
+Seule la partie visible de l'image est rééchantillonnée, à partir du
+niveau de pyramide le plus proche du zoom (réduction d'au plus 2 entre le
+niveau choisi et l'affichage). L'image zoomée est découpée en tuiles sur
+une grille fixe : un déplacement réutilise les tuiles déjà calculées, mises
+en cache par zoom, et ne calcule que celles qui entrent dans la vue.
+
+Repères : l'« espace zoomé » est l'image agrandie du facteur zoom ;
+origin est la position, dans cet espace, du coin haut gauche de la vue.
+Le pixel (x, y) de la vue montre le point (x + origin_x) / zoom de l'image.
+"""
+
+import math
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+def _fill(array, x0, y0, x1, y1, color):
+    """Remplit un rectangle [x0, x1) x [y0, y1) (bien plus rapide qu'une affectation numpy)."""
+    if x0 < x1 and y0 < y1:
+        cv2.rectangle(array, (int(x0), int(y0)), (int(x1) - 1, int(y1) - 1), color, cv2.FILLED)
+
+class ImagePyramid:
+    """
+    Pyramide d'une image, niveaux réduits par 2 calculés à la demande.
+
+    Le niveau 0 est l'image elle-même ; chaque niveau est la réduction
+    INTER_AREA du précédent, jusqu'à ce que le plus grand côté soit
+    inférieur à min_size.
+    """
+
+    def __init__(self, image, min_size=256):
+        """
+        Args:
+            image (numpy.ndarray): Image (niveaux de gris, 3 ou 4 canaux)
+            min_size (int): Plus grand côté en dessous duquel on ne réduit plus
+        """
+        self._levels = [image]
+        h, w = image.shape[:2]
+        self.count = 1
+        while max(w, h) >= 2 * min_size:
+            w, h = (w + 1) // 2, (h + 1) // 2
+            self.count += 1
+
+    @property
+    def shape(self):
+        return self._levels[0].shape
+
+    def level(self, index):
+        """Niveau index de la pyramide (calculé au premier accès)."""
+        index = min(max(int(index), 0), self.count - 1)
+        while len(self._levels) <= index:
+            previous = self._levels[-1]
+            h, w = previous.shape[:2]
+            self._levels.append(cv2.resize(previous, ((w + 1) // 2, (h + 1) // 2),
+                                           interpolation=cv2.INTER_AREA))
+        return self._levels[index]
+
+    def level_for(self, zoom):
+        """Niveau le plus réduit dont la résolution reste au moins celle de l'affichage."""
+        if zoom >= 1.0:
+            return 0
+        return min(int(math.floor(-math.log2(zoom) + 1e-9)), self.count - 1)
+
+class Viewport:
+    """
+    Vue d'une image à un zoom quelconque, rendue par tuiles en cache.
+
+    Attributs :
+        zoom : pixels affichés par pixel d'image
+        origin : coin haut gauche de la vue dans l'espace zoomé (x, y)
+        fitted : True tant que la vue suit l'ajustement à la fenêtre
+    """
+
+    def __init__(self, tile_size=256, max_tiles=256, background=(255, 255, 255),
+                 nearest_zoom=2.0, max_zoom=32.0):
+        """
+        Args:
+            tile_size (int): Côté des tuiles de rendu
+            max_tiles (int): Nombre de tuiles gardées en cache
+            background (tuple): Couleur de fond RGB hors de l'image
+            nearest_zoom (float): Zoom à partir duquel les pixels sont
+                affichés en blocs (plus proche voisin) pour l'inspection
+            max_zoom (float): Zoom maximal
+        """
+        self.tile_size = int(tile_size)
+        self.max_tiles = int(max_tiles)
+        self.background = tuple(background)
+        self.nearest_zoom = nearest_zoom
+        self.max_zoom = max_zoom
+        self.width = self.height = 1
+        self.zoom = 1.0
+        self.origin = (0, 0)
+        self.fitted = True
+        self.version = None
+        self.pyramid = None
+        self._tiles = OrderedDict()
+        self.rendered = self.reused = 0
+        self.render_time = 0.0
+
+    # ----- Image et taille de la vue -----
+
+    def set_image(self, image, version=None, keep_view=False):
+        """
+        Change l'image affichée.
+
+        Args:
+            image (numpy.ndarray): Image 8 bits (niveaux de gris, RGB ou RGBA)
+            version: Identifiant de l'image (les tuiles en cache lui sont propres)
+            keep_view (bool): Garder le zoom et la position si l'image a la
+                même taille que la précédente (sinon, ajustement à la fenêtre)
+        """
+        same_size = self.pyramid is not None and self.pyramid.shape[:2] == image.shape[:2]
+        self.pyramid = ImagePyramid(image, self.tile_size)
+        self.version = version
+        self._tiles.clear()
+        if not (keep_view and same_size) or self.fitted:
+            self.fit()
+
+    def resize(self, width, height):
+        """Change la taille de la vue (le centre de la vue est conservé)."""
+        width, height = max(int(width), 1), max(int(height), 1)
+        if (width, height) == (self.width, self.height):
+            return
+        if self.pyramid is None:
+            self.width, self.height = width, height
+            return
+        cx = self.origin[0] + self.width / 2.0
+        cy = self.origin[1] + self.height / 2.0
+        self.width, self.height = width, height
+        if self.fitted:
+            self.fit()
+        else:
+            self._set_origin(cx - width / 2.0, cy - height / 2.0)
+
+    @property
+    def image_size(self):
+        """Taille (largeur, hauteur) de l'image."""
+        h, w = self.pyramid.shape[:2]
+        return w, h
+
+    @property
+    def fit_zoom(self):
+        """Zoom qui fait tenir toute l'image dans la vue."""
+        w, h = self.image_size
+        return min(self.width / w, self.height / h)
+
+    @property
+    def min_zoom(self):
+        """Zoom minimal : image entière, ou taille réelle pour une petite image."""
+        return min(self.fit_zoom, 1.0)
+
+    # ----- Zoom et déplacement -----
+
+    def fit(self):
+        """Ajuste l'image entière à la vue, centrée."""
+        self._apply_zoom(self.fit_zoom)
+        w, h = self.image_size
+        self.origin = (int(round((w * self.zoom - self.width) / 2.0)),
+                       int(round((h * self.zoom - self.height) / 2.0)))
+        self.fitted = True
+
+    def set_zoom(self, zoom, x=None, y=None):
+        """
+        Change le zoom en gardant fixe le point de l'image sous (x, y).
+
+        Args:
+            zoom (float): Nouveau zoom (borné entre min_zoom et max_zoom)
+            x (float, optional): Abscisse du point fixe dans la vue (centre par défaut)
+            y (float, optional): Ordonnée du point fixe dans la vue
+        """
+        x = self.width / 2.0 if x is None else x
+        y = self.height / 2.0 if y is None else y
+        ix, iy = self.to_image(x, y)
+        self._apply_zoom(min(max(zoom, self.min_zoom), self.max_zoom))
+        self.fitted = False
+        self._set_origin(ix * self.zoom - x, iy * self.zoom - y)
+
+    def zoom_by(self, factor, x=None, y=None):
+        """Multiplie le zoom par factor autour du point (x, y) de la vue."""
+        self.set_zoom(self.zoom * factor, x, y)
+
+    def pan(self, dx, dy):
+        """Déplace le contenu de la vue de (dx, dy) pixels affichés."""
+        self._set_origin(self.origin[0] - dx, self.origin[1] - dy)
+        self.fitted = False
+
+    def scroll_to(self, axis, fraction):
+        """Place le début de la vue à une fraction de l'image ('x' ou 'y')."""
+        w, h = self.image_size
+        if axis == 'x':
+            self._set_origin(fraction * w * self.zoom, self.origin[1])
+        else:
+            self._set_origin(self.origin[0], fraction * h * self.zoom)
+        self.fitted = False
+
+    def scroll_fractions(self):
+        """
+        Partie visible de l'image, pour les barres de défilement.
+
+        Returns:
+            tuple: ((début, fin) en x, (début, fin) en y), fractions de 0 à 1
+        """
+        w, h = self.image_size
+        fractions = []
+        for start, size, extent in ((self.origin[0], self.width, w * self.zoom),
+                                    (self.origin[1], self.height, h * self.zoom)):
+            fractions.append((min(max(start / extent, 0.0), 1.0),
+                              min(max((start + size) / extent, 0.0), 1.0)))
+        return tuple(fractions)
+
+    def to_image(self, x, y):
+        """Coordonnées de l'image (flottantes) du point (x, y) de la vue."""
+        return (x + self.origin[0]) / self.zoom, (y + self.origin[1]) / self.zoom
+
+    def _apply_zoom(self, zoom):
+        if zoom != self.zoom:
+            self.zoom = zoom
+            # Les tuiles d'un autre zoom ne servent plus
+            self._tiles.clear()
+
+    def _set_origin(self, ox, oy):
+        """Position bornée : l'image reste dans la vue, centrée si elle est plus petite."""
+        w, h = self.image_size
+        bounded = []
+        for start, size, extent in ((ox, self.width, w * self.zoom), (oy, self.height, h * self.zoom)):
+            if extent <= size:
+                bounded.append(int(round((extent - size) / 2.0)))
+            else:
+                bounded.append(int(round(min(max(start, 0.0), extent - size))))
+        self.origin = tuple(bounded)
+
+    # ----- Rendu -----
+
+    def _render_tile(self, column, row):
+        """Tuile (column, row) de l'espace zoomé, rééchantillonnée depuis la pyramide."""
+        size = self.tile_size
+        w, h = self.image_size
+        index = self.pyramid.level_for(self.zoom)
+        level = self.pyramid.level(index)
+        lh, lw = level.shape[:2]
+        sx, sy = lw / w, lh / h
+        u0, v0 = column * size, row * size
+        # Centre du pixel u de la tuile -> coordonnée dans le niveau
+        matrix = np.array([[sx / self.zoom, 0.0, (u0 + 0.5) * sx / self.zoom - 0.5],
+                           [0.0, sy / self.zoom, (v0 + 0.5) * sy / self.zoom - 0.5]])
+        interpolation = cv2.INTER_NEAREST if self.zoom >= self.nearest_zoom else cv2.INTER_LINEAR
+        tile = cv2.warpAffine(level, matrix, (size, size), flags=interpolation | cv2.WARP_INVERSE_MAP,
+                              borderMode=cv2.BORDER_REPLICATE)
+        # Hors de l'image : fond (sans mélange avec le bord de l'image)
+        right = int(math.ceil(w * self.zoom)) - u0
+        bottom = int(math.ceil(h * self.zoom)) - v0
+        if right < size or bottom < size:
+            _fill(tile, 0, max(bottom, 0), size, size, self._fill_color(tile))
+            _fill(tile, max(right, 0), 0, size, size, self._fill_color(tile))
+        return tile
+
+    def _fill_color(self, image):
+        """Couleur de fond adaptée au nombre de canaux (fond transparent en RGBA)."""
+        if image.ndim == 2:
+            return self.background[0]
+        return self.background + (0,) if image.shape[2] == 4 else self.background
+
+    def _tile(self, column, row):
+        key = (column, row)
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            self.reused += 1
+            return tile
+        tile = self._render_tile(column, row)
+        self.rendered += 1
+        self._tiles[key] = tile
+        while len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+        return tile
+
+    def _visible_tiles(self, margin=0):
+        """Indices (colonne, ligne) des tuiles de l'image dans la vue élargie de margin tuiles."""
+        size = self.tile_size
+        w, h = self.image_size
+        extent_x, extent_y = int(math.ceil(w * self.zoom)), int(math.ceil(h * self.zoom))
+        ox, oy = self.origin
+        columns = range(max(max(ox, 0) // size - margin, 0),
+                        min((min(ox + self.width, extent_x) - 1) // size + margin, (extent_x - 1) // size) + 1)
+        rows = range(max(max(oy, 0) // size - margin, 0),
+                     min((min(oy + self.height, extent_y) - 1) // size + margin, (extent_y - 1) // size) + 1)
+        return [(column, row) for row in rows for column in columns]
+
+    def prefetch(self, margin=1, limit=4):
+        """
+        Calcule d'avance des tuiles autour de la vue (à appeler au repos).
+
+        Args:
+            margin (int): Largeur de l'anneau de tuiles autour de la vue
+            limit (int): Nombre maximal de tuiles calculées par appel
+
+        Returns:
+            int: Nombre de tuiles calculées (0 : anneau complet)
+        """
+        if self.pyramid is None:
+            return 0
+        ring = self._visible_tiles(margin)
+        if len(ring) > self.max_tiles:
+            # Cache trop petit : l'anneau évincerait les tuiles visibles
+            return 0
+        missing = [key for key in ring if key not in self._tiles][:limit]
+        for column, row in missing:
+            self._tile(column, row)
+        return len(missing)
+
+    def render(self, out=None):
+        """
+        Image de la vue au zoom et à la position courants.
+
+        Args:
+            out (numpy.ndarray, optional): Tableau de sortie réutilisable
+                (hauteur, largeur[, canaux] de la vue)
+
+        Returns:
+            numpy.ndarray: Contenu de la vue (même nombre de canaux que l'image)
+        """
+        start = time.perf_counter()
+        image = self.pyramid.level(0)
+        shape = (self.height, self.width) + image.shape[2:]
+        if out is None or out.shape != shape:
+            out = np.empty(shape, image.dtype)
+
+        size = self.tile_size
+        w, h = self.image_size
+        ox, oy = self.origin
+        extent_x, extent_y = int(math.ceil(w * self.zoom)), int(math.ceil(h * self.zoom))
+        # Fond sur les seules marges de la vue que l'image ne couvre pas
+        fill = self._fill_color(out)
+        left, top = max(-ox, 0), max(-oy, 0)
+        right, bottom = min(extent_x - ox, self.width), min(extent_y - oy, self.height)
+        _fill(out, 0, 0, self.width, top, fill)
+        _fill(out, 0, bottom, self.width, self.height, fill)
+        _fill(out, 0, top, left, bottom, fill)
+        _fill(out, right, top, self.width, bottom, fill)
+        # Tuiles de l'image qui recoupent la vue
+        for column, row in self._visible_tiles():
+            tile = self._tile(column, row)
+            u0, v0 = column * size, row * size
+            left, top = max(u0, ox), max(v0, oy)
+            right, bottom = min(u0 + size, ox + self.width), min(v0 + size, oy + self.height)
+            out[top - oy:bottom - oy, left - ox:right - ox] = tile[top - v0:bottom - v0, left - u0:right - u0]
+        self.render_time = time.perf_counter() - start
+        return out
@@ -8,9 +8,11 @@ from tkinter import ttk, messagebox
 import sys
 import os
 
-sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+# Le répertoire parent doit être dans le chemin : l'interface importe les
+# modules du paquet image_processor (utils, operations) de manière relative
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
 
-from gui.main_window import MainWindow
+from image_processor.gui.main_window import MainWindow
 
 def main():
     """Point d'entrée principal de l'application."""
@@ -5,18 +5,21 @@ Module contenant les opérations de base de traitement d'images.
 import cv2
 import numpy as np
 
-def convert_to_grayscale(image):
+def convert_to_grayscale(image, order='bgr'):
     """
     Convertit une image en niveaux de gris.
     
     Args:
-        image (numpy.ndarray): Image d'entrée au format BGR
+        image (numpy.ndarray): Image d'entrée
+        order (str): Ordre des canaux ('bgr', ou 'rgb' pour les images
+            chargées par load_image ou issues de PIL)
         
     Returns:
         numpy.ndarray: Image en niveaux de gris
     """
     if len(image.shape) == 3:
-        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        code = cv2.COLOR_RGB2GRAY if order == 'rgb' else cv2.COLOR_BGR2GRAY
+        return cv2.cvtColor(image, code)
     return image
 
 def resize_image(image, width=None, height=None, inter=cv2.INTER_LINEAR):
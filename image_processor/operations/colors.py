@@ -0,0 +1,223 @@
+"""
+Module contenant la classification des pixels par palette de couleurs.
+
+Chaque couleur est une boîte (une plage par canal, bornes incluses comme
+cv2.inRange) dans l'espace HSV ou Lab. Les bornes de toutes les plages
+découpent chaque canal en intervalles élémentaires sur lesquels
+l'appartenance aux couleurs est constante : la palette est compilée en une
+table 3D indexée par ces intervalles, exacte et compacte. Chaque cellule
+désigne la combinaison des couleurs qui la contiennent (les plages peuvent
+se chevaucher). Chaque pixel est ensuite classé en une passe (table par
+canal, somme des indices, table 3D), quel que soit le nombre de couleurs.
+"""
+
+import cv2
+import numpy as np
+
+COLOR_SPACES = {
+    'hsv': (cv2.COLOR_BGR2HSV, cv2.COLOR_RGB2HSV),
+    'lab': (cv2.COLOR_BGR2LAB, cv2.COLOR_RGB2LAB),
+}
+
+# Teinte OpenCV sur 8 bits : 0 à 179
+HUE_RANGE = 180
+
+# Palette HSV par défaut ; la plage du rouge fait le tour de la teinte
+BASIC_COLORS = (
+    ('Rouge', (170, 100, 100), (10, 255, 255)),
+    ('Jaune', (20, 100, 100), (40, 255, 255)),
+    ('Vert', (40, 100, 100), (80, 255, 255)),
+    ('Bleu', (100, 100, 100), (140, 255, 255)),
+)
+
+class ColorClassifier:
+    """
+    Palette de couleurs nommées compilée en table de correspondance 3D.
+
+    Un pixel reçoit l'étiquette k (1 à n) de la première couleur de la
+    palette qui le contient, 0 s'il n'en vérifie aucune ; les masques par
+    couleur gardent les chevauchements (un pixel à la limite de deux plages
+    appartient aux deux, comme avec cv2.inRange).
+    """
+
+    def __init__(self, palette, space='hsv'):
+        """
+        Args:
+            palette (sequence): Couleurs (nom, bornes basses, bornes hautes) ;
+                un même nom peut apparaître plusieurs fois (union des plages).
+                En HSV, une teinte basse supérieure à la teinte haute désigne
+                une plage qui passe par 0 (rouge)
+            space (str): 'hsv' ou 'lab' (valeurs OpenCV sur 8 bits)
+        """
+        if space not in COLOR_SPACES:
+            raise ValueError(f"Espace de couleur inconnu: {space}")
+        self.space = space
+        self.names = []
+        boxes = []
+        for name, lower, upper in palette:
+            if name not in self.names:
+                self.names.append(name)
+            label = self.names.index(name) + 1
+            lower = [min(max(int(v), 0), 255) for v in lower]
+            upper = [min(max(int(v), 0), 255) for v in upper]
+            if space == 'hsv' and lower[0] > upper[0]:
+                boxes.append((label, lower, [HUE_RANGE - 1] + upper[1:]))
+                boxes.append((label, [0] + lower[1:], upper))
+            else:
+                boxes.append((label, lower, upper))
+        if len(self.names) > 255:
+            raise ValueError(f"Trop de couleurs dans la palette: {len(self.names)}")
+        # Boîtes vides (bornes inversées) : aucun pixel, comme cv2.inRange
+        boxes = [box for box in boxes if all(lo <= hi for lo, hi in zip(box[1], box[2]))]
+
+        # Intervalles élémentaires [edges[i], edges[i+1]) de chaque canal
+        bins = []
+        for c in range(3):
+            edges = sorted({0, 256} | {box[1][c] for box in boxes} | {box[2][c] + 1 for box in boxes})
+            bins.append(np.searchsorted(edges, np.arange(256), side='right') - 1)
+        sizes = [int(b[-1]) + 1 for b in bins]
+
+        # Appartenance de chaque cellule à chaque couleur, puis numérotation
+        # des combinaisons de couleurs rencontrées
+        # (bits regroupés en octets : une clé courte par cellule)
+        n_bytes = (len(self.names) + 7) // 8
+        member = np.zeros(sizes + [n_bytes], np.uint8)
+        for label, lower, upper in boxes:
+            cells = tuple(slice(b[lo], b[hi] + 1) for b, lo, hi in zip(bins, lower, upper))
+            member[cells + ((label - 1) // 8,)] |= np.uint8(0x80 >> ((label - 1) % 8))
+        keys = np.ascontiguousarray(member.reshape(-1, n_bytes)).view(np.dtype((np.void, n_bytes)))
+        keys, table = np.unique(keys.ravel(), return_inverse=True)
+        combos = np.unpackbits(keys.view(np.uint8).reshape(-1, n_bytes), axis=1,
+                               count=len(self.names)).astype(bool)
+        # Combinaison -> première couleur listée, et -> masque de chaque couleur
+        # (tables de 256 entrées pour cv2.LUT quand les combinaisons y tiennent)
+        if combos.shape[0] <= 256:
+            combos = np.pad(combos, ((0, 256 - combos.shape[0]), (0, 0)))
+        self._first = np.where(combos.any(axis=1), combos.argmax(axis=1) + 1, 0).astype(np.uint8)
+        self._members = combos.T.astype(np.uint8) * 255
+
+        # Indice à plat d'un pixel = somme des indices pondérés de ses canaux
+        strides = (sizes[1] * sizes[2], sizes[2], 1)
+        self._table = table.ravel().astype(np.min_scalar_type(combos.shape[0] - 1))
+        if self._table.size <= 256:
+            dtype = np.uint8
+            self._table = np.pad(self._table, (0, 256 - self._table.size))
+        elif self._table.size <= 65536:
+            dtype = np.uint16
+        elif self._table.size <= 1 << 24:
+            dtype = np.float32
+        else:
+            raise ValueError("Palette trop fragmentée pour une table 3D")
+        self._channel_lut = np.stack([b * s for b, s in zip(bins, strides)], axis=1) \
+            .astype(dtype).reshape(1, 256, 3)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def table_size(self):
+        """Nombre de cellules de la table 3D compilée."""
+        return int(self._table.size)
+
+    def convert(self, image, order='bgr'):
+        """
+        Convertit une image couleur 8 bits dans l'espace de la palette.
+
+        Args:
+            image (numpy.ndarray): Image BGR ou RGB (un canal alpha est ignoré)
+            order (str): 'bgr' ou 'rgb'
+
+        Returns:
+            numpy.ndarray: Image HSV ou Lab
+        """
+        if image.ndim != 3 or image.shape[2] < 3:
+            raise ValueError("L'image doit être en couleur")
+        if image.dtype != np.uint8:
+            raise ValueError(f"Image 8 bits attendue: {image.dtype}")
+        if image.shape[2] > 3:
+            image = np.ascontiguousarray(image[:, :, :3])
+        return cv2.cvtColor(image, COLOR_SPACES[self.space][order == 'rgb'])
+
+    @staticmethod
+    def _lookup(index, table):
+        """table[index], par cv2.LUT quand l'index et la table le permettent."""
+        if index.dtype == np.uint8 and table.size == 256:
+            return cv2.LUT(index, table)
+        return np.take(table, index.astype(np.intp, copy=False))
+
+    def _combinations(self, values):
+        """Numéro de la combinaison de couleurs de chaque pixel."""
+        index = cv2.transform(cv2.LUT(values, self._channel_lut), np.ones((1, 3)))
+        return self._lookup(index, self._table)
+
+    def classify_converted(self, values):
+        """
+        Étiquette une image déjà convertie dans l'espace de la palette.
+
+        Returns:
+            numpy.ndarray: Étiquettes uint8 (0 : aucune couleur)
+        """
+        return self._lookup(self._combinations(values), self._first)
+
+    def classify(self, image, order='bgr'):
+        """
+        Étiquette chaque pixel avec sa couleur en une passe.
+
+        Args:
+            image (numpy.ndarray): Image couleur 8 bits
+            order (str): 'bgr' ou 'rgb'
+
+        Returns:
+            numpy.ndarray: Étiquettes uint8 (k : couleur names[k-1], 0 : aucune)
+        """
+        return self.classify_converted(self.convert(image, order))
+
+    def counts(self, labels):
+        """
+        Nombre de pixels de chaque couleur.
+
+        Returns:
+            dict: Nom de couleur -> nombre de pixels
+        """
+        hist = cv2.calcHist([labels], [0], None, [256], [0, 256]).ravel()
+        return {name: int(hist[k]) for k, name in enumerate(self.names, 1)}
+
+    def segment(self, image, order='bgr'):
+        """
+        Classe l'image et sépare les couleurs.
+
+        Args:
+            image (numpy.ndarray): Image couleur 8 bits
+            order (str): 'bgr' ou 'rgb'
+
+        Returns:
+            tuple: (étiquettes, masques 0/255 par nom, nombres de pixels par nom)
+        """
+        return self.segment_converted(self.convert(image, order))
+
+    def segment_converted(self, values):
+        """
+        Comme segment, pour une image déjà convertie dans l'espace de la palette.
+
+        Les masques et leurs nombres de pixels suivent chaque plage
+        indépendamment (chevauchements compris) ; les étiquettes attribuent
+        chaque pixel à la première couleur listée.
+
+        Returns:
+            tuple: (étiquettes, masques 0/255 par nom, nombres de pixels par nom)
+        """
+        combinations = self._combinations(values)
+        labels = self._lookup(combinations, self._first)
+        # Nombre de pixels par combinaison, d'où celui de chaque couleur
+        if combinations.dtype == np.uint8:
+            hist = cv2.calcHist([combinations], [0], None, [256], [0, 256]).ravel()
+        else:
+            hist = np.bincount(combinations.ravel(), minlength=self._members.shape[1])
+        masks, counts = {}, {}
+        for name, members in zip(self.names, self._members):
+            counts[name] = int(hist[:members.size] @ (members > 0))
+            if counts[name]:
+                masks[name] = self._lookup(combinations, members)
+            else:
+                masks[name] = np.zeros(labels.shape, np.uint8)
+        return labels, masks, counts
@@ -0,0 +1,264 @@
+"""
+Module contenant l'extraction, la mesure et le dessin de contours en lot.
+
+Les mesures (aire, rectangle englobant, moments, périmètre) de tous les
+contours sont calculées d'un bloc sur leurs sommets concaténés, et les
+filtres sont des prédicats vectorisés sur ces colonnes. Le dessin se fait
+sur un calque réutilisable, composé sur l'image de base à la demande.
+"""
+
+import cv2
+import numpy as np
+
+_RETRIEVAL_MODES = {
+    'external': cv2.RETR_EXTERNAL,
+    'list': cv2.RETR_LIST,
+    'ccomp': cv2.RETR_CCOMP,
+    'tree': cv2.RETR_TREE,
+}
+_APPROXIMATIONS = {
+    'none': cv2.CHAIN_APPROX_NONE,
+    'simple': cv2.CHAIN_APPROX_SIMPLE,
+}
+
+class ContourSet:
+    """
+    Ensemble de contours et de leurs mesures en colonnes.
+
+    Attributs (tableaux alignés sur les contours) :
+        area : aire du polygone (comme cv2.contourArea)
+        bbox : rectangle englobant (x, y, largeur, hauteur), comme cv2.boundingRect
+        moments : moments spatiaux (m00, m10, m01, m20, m11, m02), comme cv2.moments
+        centroid : centre de gravité (x, y) du polygone
+        perimeter : longueur du contour fermé (comme cv2.arcLength)
+    """
+
+    def __init__(self, contours, hierarchy=None):
+        """
+        Args:
+            contours (sequence): Contours au format OpenCV ((n, 1, 2) int32)
+            hierarchy (numpy.ndarray, optional): Hiérarchie (n, 4) de cv2.findContours
+        """
+        self.contours = list(contours)
+        self.hierarchy = None if hierarchy is None else np.asarray(hierarchy).reshape(-1, 4)
+        self._measure()
+
+    @classmethod
+    def from_mask(cls, mask, mode='external', approx='simple'):
+        """
+        Extrait les contours d'un masque binaire.
+
+        Args:
+            mask (numpy.ndarray): Masque (pixels non nuls = objets)
+            mode (str): 'external', 'list', 'ccomp' ou 'tree'
+            approx (str): 'simple' (segments compressés) ou 'none'
+
+        Returns:
+            ContourSet: Contours et mesures
+        """
+        contours, hierarchy = cv2.findContours(
+            mask, _RETRIEVAL_MODES[mode], _APPROXIMATIONS[approx]
+        )
+        return cls(contours, None if hierarchy is None else hierarchy[0])
+
+    def _measure(self):
+        """Calcule toutes les mesures en une passe sur les sommets concaténés."""
+        n = len(self.contours)
+        if n == 0:
+            self.area = np.zeros(0)
+            self.bbox = np.zeros((0, 4), np.int32)
+            self.moments = np.zeros((0, 6))
+            self.centroid = np.zeros((0, 2))
+            self.perimeter = np.zeros(0)
+            return
+
+        lengths = np.fromiter((len(c) for c in self.contours), np.intp, n)
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        points = np.concatenate([c.reshape(-1, 2) for c in self.contours])
+
+        x0 = np.minimum.reduceat(points[:, 0], starts)
+        y0 = np.minimum.reduceat(points[:, 1], starts)
+        x1 = np.maximum.reduceat(points[:, 0], starts)
+        y1 = np.maximum.reduceat(points[:, 1], starts)
+        self.bbox = np.stack([x0, y0, x1 - x0 + 1, y1 - y0 + 1], axis=1).astype(np.int32)
+
+        # Sommet suivant de chaque sommet, en refermant chaque contour
+        following = np.arange(1, points.shape[0] + 1)
+        following[starts + lengths - 1] = starts
+        xa, ya = points[:, 0].astype(np.float64), points[:, 1].astype(np.float64)
+        xb, yb = xa[following], ya[following]
+
+        self.perimeter = np.add.reduceat(np.hypot(xb - xa, yb - ya), starts)
+
+        # Moments d'un polygone par la formule de Green
+        cross = xa * yb - xb * ya
+        total = lambda values: np.add.reduceat(values, starts)
+        m00 = total(cross) / 2.0
+        m10 = total((xa + xb) * cross) / 6.0
+        m01 = total((ya + yb) * cross) / 6.0
+        m20 = total((xa * xa + xa * xb + xb * xb) * cross) / 12.0
+        m02 = total((ya * ya + ya * yb + yb * yb) * cross) / 12.0
+        m11 = total((xa * yb + 2.0 * xa * ya + 2.0 * xb * yb + xb * ya) * cross) / 24.0
+        moments = np.stack([m00, m10, m01, m20, m11, m02], axis=1)
+        # Orientation indifférente, comme cv2.moments
+        moments *= np.where(m00 < 0, -1.0, 1.0)[:, np.newaxis]
+        self.moments = moments
+        self.area = moments[:, 0]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            centroid = moments[:, 1:3] / moments[:, :1]
+        # Contours dégénérés (aire nulle) : centre du rectangle englobant
+        degenerate = moments[:, 0] == 0
+        centroid[degenerate] = self.bbox[degenerate, :2] + (self.bbox[degenerate, 2:] - 1) / 2.0
+        self.centroid = centroid
+
+    def __len__(self):
+        return len(self.contours)
+
+    def __iter__(self):
+        return iter(self.contours)
+
+    def __getitem__(self, selection):
+        """Contour seul (indice entier) ou sous-ensemble (masque booléen, indices)."""
+        if isinstance(selection, (int, np.integer)):
+            return self.contours[selection]
+        indices = np.arange(len(self))[selection]
+        subset = ContourSet.__new__(ContourSet)
+        subset.contours = [self.contours[i] for i in indices]
+        # La hiérarchie fait référence aux indices d'origine : elle n'est pas reportée
+        subset.hierarchy = None
+        for name in ('area', 'bbox', 'moments', 'centroid', 'perimeter'):
+            setattr(subset, name, getattr(self, name)[indices])
+        return subset
+
+    @property
+    def circularity(self):
+        """Circularité 4 pi A / P² (1 pour un disque)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            value = 4.0 * np.pi * self.area / (self.perimeter ** 2)
+        return np.nan_to_num(value)
+
+    @property
+    def aspect_ratio(self):
+        """Rapport largeur / hauteur du rectangle englobant."""
+        return self.bbox[:, 2] / self.bbox[:, 3].astype(np.float64)
+
+    @property
+    def extent(self):
+        """Part du rectangle englobant occupée par le contour."""
+        return self.area / (self.bbox[:, 2] * self.bbox[:, 3]).astype(np.float64)
+
+    def filter(self, min_area=None, max_area=None, min_circularity=None,
+               min_aspect=None, max_aspect=None, min_extent=None):
+        """
+        Sélectionne les contours vérifiant tous les critères donnés.
+
+        Args:
+            min_area (float, optional): Aire minimale
+            max_area (float, optional): Aire maximale
+            min_circularity (float, optional): Circularité minimale (0 à 1)
+            min_aspect (float, optional): Rapport largeur / hauteur minimal
+            max_aspect (float, optional): Rapport largeur / hauteur maximal
+            min_extent (float, optional): Remplissage minimal du rectangle englobant
+
+        Returns:
+            ContourSet: Contours retenus
+        """
+        keep = np.ones(len(self), bool)
+        if min_area is not None:
+            keep &= self.area >= min_area
+        if max_area is not None:
+            keep &= self.area <= max_area
+        if min_circularity is not None:
+            keep &= self.circularity >= min_circularity
+        if min_aspect is not None:
+            keep &= self.aspect_ratio >= min_aspect
+        if max_aspect is not None:
+            keep &= self.aspect_ratio <= max_aspect
+        if min_extent is not None:
+            keep &= self.extent >= min_extent
+        return self[keep]
+
+class ContourOverlay:
+    """
+    Calque de dessin réutilisable (BGRA) de la taille d'une image.
+
+    Les tracés s'accumulent sur le calque sans toucher à l'image de base ;
+    compose() les applique sur l'image au moment de l'affichage.
+    """
+
+    def __init__(self, shape):
+        """
+        Args:
+            shape (tuple): Forme de l'image de base (hauteur, largeur[, canaux])
+        """
+        self.layer = np.zeros(tuple(shape[:2]) + (4,), np.uint8)
+
+    @property
+    def shape(self):
+        return self.layer.shape[:2]
+
+    def clear(self):
+        """Efface le calque pour le réutiliser."""
+        self.layer.fill(0)
+
+    @staticmethod
+    def _opaque(color):
+        return tuple(int(c) for c in color[:3]) + (255,)
+
+    def draw(self, contours, color=(0, 255, 0), thickness=2):
+        """
+        Trace des contours sur le calque, en un seul appel à cv2.drawContours.
+
+        Args:
+            contours (ContourSet ou list): Contours à tracer
+            color (tuple): Couleur dans l'ordre des canaux de l'image de base
+            thickness (int): Épaisseur (-1 pour remplir)
+        """
+        contours = contours.contours if isinstance(contours, ContourSet) else list(contours)
+        if contours:
+            cv2.drawContours(self.layer, contours, -1, self._opaque(color), thickness)
+
+    def label(self, text, positions, color=(0, 0, 255), scale=0.9, thickness=2):
+        """
+        Écrit un texte sur le calque à chaque position (x, y) donnée.
+
+        Args:
+            text (str): Texte à écrire
+            positions (numpy.ndarray): Positions (n, 2) de la ligne de base
+            color (tuple): Couleur du texte
+            scale (float): Échelle de la police
+            thickness (int): Épaisseur du trait
+        """
+        color = self._opaque(color)
+        for x, y in np.asarray(positions, dtype=np.int64).reshape(-1, 2):
+            cv2.putText(self.layer, text, (int(x), int(y)), cv2.FONT_HERSHEY_SIMPLEX,
+                        scale, color, thickness)
+
+    def compose(self, base, dst=None):
+        """
+        Applique le calque sur une image.
+
+        Args:
+            base (numpy.ndarray): Image de base (3 canaux, ou niveaux de gris)
+            dst (numpy.ndarray, optional): Tableau de sortie réutilisable,
+                éventuellement base elle-même pour composer sur place
+
+        Returns:
+            numpy.ndarray: Image composée
+        """
+        if base.shape[:2] != self.shape:
+            raise ValueError(f"Taille incompatible avec le calque: {base.shape[:2]} != {self.shape}")
+        if base.ndim == 2:
+            base = cv2.cvtColor(base, cv2.COLOR_GRAY2BGR)
+        if dst is None:
+            dst = base.copy()
+        elif dst is not base:
+            np.copyto(dst, base)
+        # Copie masquée par le canal alpha du calque
+        if dst.shape[2] == 3 and dst.dtype == np.uint8:
+            cv2.copyTo(cv2.cvtColor(self.layer, cv2.COLOR_BGRA2BGR), cv2.extractChannel(self.layer, 3), dst)
+        else:
+            drawn = self.layer[:, :, 3] > 0
+            np.copyto(dst[:, :, :3], self.layer[:, :, :3], where=drawn[:, :, np.newaxis])
+        return dst
@@ -0,0 +1,333 @@
+"""
+Module contenant l'amélioration du contraste (égalisation d'histogramme et CLAHE).
+
+Les images couleur sont traitées sur leur seul canal de luminance (L de
+Lab ou Y de YCrCb), les images 8 et 16 bits sont acceptées. Les objets
+CLAHE d'OpenCV sont réutilisés d'un appel à l'autre, par thread et par
+paramètres (seuil, grille).
+
+Pour les grandes images, clahe_tiled calcule le même résultat que
+cv2.CLAHE par bandes de lignes (images en mémoire ou np.memmap) : les
+tables de chaque tuile sont calculées en une première passe, puis chaque
+pixel est interpolé entre les tables des quatre tuiles voisines, sans
+raccord visible aux bords des tuiles.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+CONTRAST_METHODS = ('clahe', 'equalize')
+
+LUMINANCE_SPACES = ('lab', 'ycrcb')
+
+# (espace, ordre des canaux) -> (conversion aller, conversion retour)
+_CONVERSIONS = {
+    ('lab', 'bgr'): (cv2.COLOR_BGR2LAB, cv2.COLOR_LAB2BGR),
+    ('lab', 'rgb'): (cv2.COLOR_RGB2LAB, cv2.COLOR_LAB2RGB),
+    ('ycrcb', 'bgr'): (cv2.COLOR_BGR2YCrCb, cv2.COLOR_YCrCb2BGR),
+    ('ycrcb', 'rgb'): (cv2.COLOR_RGB2YCrCb, cv2.COLOR_YCrCb2RGB),
+}
+
+# Objets CLAHE par thread : ils conservent des tampons internes entre deux
+# appels et ne doivent pas être partagés entre threads
+_local = threading.local()
+_MAX_CLAHE = 8
+
+def get_clahe(clip_limit=2.0, tile_grid_size=(8, 8)):
+    """
+    Objet CLAHE réutilisable pour ces paramètres, propre au thread appelant.
+
+    Args:
+        clip_limit (float): Seuil de contraste
+        tile_grid_size (tuple): Nombre de tuiles (colonnes, lignes)
+
+    Returns:
+        cv2.CLAHE: Objet partagé (ne pas modifier ses paramètres)
+    """
+    cache = getattr(_local, 'clahe', None)
+    if cache is None:
+        cache = _local.clahe = OrderedDict()
+    key = (float(clip_limit), (int(tile_grid_size[0]), int(tile_grid_size[1])))
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    cache[key] = cv2.createCLAHE(clipLimit=key[0], tileGridSize=key[1])
+    while len(cache) > _MAX_CLAHE:
+        cache.popitem(last=False)
+    return cache[key]
+
+def _histogram_size(image):
+    """Nombre de niveaux d'une image 8 ou 16 bits."""
+    if image.dtype == np.uint8:
+        return 256
+    if image.dtype == np.uint16:
+        return 65536
+    raise ValueError(f"Image 8 ou 16 bits attendue: {image.dtype}")
+
+def _to_luminance(image, space, order, converted=None):
+    """
+    Canal de luminance d'une image.
+
+    Args:
+        converted (numpy.ndarray, optional): Image 8 bits déjà convertie
+            dans space (copiée avant modification)
+
+    Returns:
+        tuple: (luminance, image convertie à repasser à _from_luminance ;
+            None pour une image en niveaux de gris)
+    """
+    _histogram_size(image)
+    if image.ndim == 2:
+        return image, None
+    if (space, order) not in _CONVERSIONS:
+        raise ValueError(f"Espace de luminance ou ordre des canaux inconnu: {space}, {order}")
+    if image.shape[2] not in (3, 4):
+        raise ValueError(f"Image à 1, 3 ou 4 canaux attendue: {image.shape[2]}")
+    if converted is not None:
+        converted = converted.copy()
+        return cv2.extractChannel(converted, 0), converted
+    color = np.ascontiguousarray(image[:, :, :3])
+    forward = _CONVERSIONS[(space, order)][0]
+    if space == 'lab' and image.dtype == np.uint16:
+        # Lab n'existe qu'en 8 bits et en flottant : L (0 à 100) ramené sur 16 bits
+        converted = cv2.cvtColor(color.astype(np.float32) * np.float32(1 / 65535), forward)
+        luminance = np.clip(np.rint(converted[:, :, 0] * (65535 / 100)), 0, 65535).astype(np.uint16)
+        return luminance, converted
+    converted = cv2.cvtColor(color, forward)
+    return cv2.extractChannel(converted, 0), converted
+
+def _from_luminance(image, converted, luminance, space, order):
+    """Recompose l'image à partir de sa luminance modifiée (alpha conservé)."""
+    if converted is None:
+        return luminance
+    backward = _CONVERSIONS[(space, order)][1]
+    if converted.dtype == np.float32:
+        converted[:, :, 0] = luminance * np.float32(100 / 65535)
+        result = cv2.cvtColor(converted, backward) * np.float32(65535)
+        result = np.clip(np.rint(result), 0, 65535).astype(np.uint16)
+    else:
+        cv2.insertChannel(luminance, converted, 0)
+        result = cv2.cvtColor(converted, backward)
+    if image.shape[2] == 4:
+        result = np.dstack([result, image[:, :, 3]])
+    return result
+
+def _equalize_channel(channel):
+    """Égalisation d'un canal 8 ou 16 bits (même formule que cv2.equalizeHist)."""
+    if channel.dtype == np.uint8:
+        return cv2.equalizeHist(channel)
+    hist = np.bincount(channel.ravel(), minlength=65536)
+    first = int(np.argmax(hist > 0))
+    remaining = channel.size - hist[first]
+    if remaining == 0:
+        return channel.copy()
+    cdf = np.cumsum(hist) - hist[first]
+    lut = np.rint(cdf * (65535.0 / remaining))
+    lut[:first] = 0
+    return np.take(lut.astype(np.uint16), channel)
+
+def equalize(image, space='ycrcb', order='bgr'):
+    """
+    Égalise l'histogramme de la luminance d'une image.
+
+    Args:
+        image (numpy.ndarray): Image 8 ou 16 bits, en niveaux de gris ou
+            couleur (un canal alpha est conservé)
+        space (str): Espace de luminance des images couleur ('lab' ou 'ycrcb')
+        order (str): Ordre des canaux couleur ('bgr' ou 'rgb')
+
+    Returns:
+        numpy.ndarray: Image égalisée, de même type
+    """
+    luminance, converted = _to_luminance(image, space, order)
+    return _from_luminance(image, converted, _equalize_channel(luminance), space, order)
+
+def clahe(image, clip_limit=2.0, tile_grid_size=(8, 8), space='lab', order='bgr',
+          converted=None):
+    """
+    Applique CLAHE à la luminance d'une image.
+
+    Args:
+        image (numpy.ndarray): Image 8 ou 16 bits, en niveaux de gris ou
+            couleur (un canal alpha est conservé)
+        clip_limit (float): Seuil de contraste
+        tile_grid_size (tuple): Nombre de tuiles (colonnes, lignes)
+        space (str): Espace de luminance des images couleur ('lab' ou 'ycrcb' ;
+            la conversion YCrCb est une dizaine de fois moins coûteuse)
+        order (str): Ordre des canaux couleur ('bgr' ou 'rgb')
+        converted (numpy.ndarray, optional): Image couleur 8 bits déjà
+            convertie dans space (par exemple ImageData.lab), pour éviter
+            de refaire la conversion
+
+    Returns:
+        numpy.ndarray: Image traitée, de même type
+    """
+    luminance, converted = _to_luminance(image, space, order, converted)
+    result = get_clahe(clip_limit, tile_grid_size).apply(luminance)
+    return _from_luminance(image, converted, result, space, order)
+
+def _clahe_luts(histograms, clip_limit, tile_pixels):
+    """
+    Tables de correspondance des tuiles à partir de leurs histogrammes.
+
+    Écrêtage et redistribution de l'excédent identiques à cv2.CLAHE.
+
+    Args:
+        histograms (numpy.ndarray): Effectifs (tuiles, niveaux)
+        clip_limit (float): Seuil de contraste (0 : pas d'écrêtage)
+        tile_pixels (int): Nombre de pixels d'une tuile
+
+    Returns:
+        numpy.ndarray: Tables float32 (tuiles, niveaux)
+    """
+    hist = histograms.astype(np.int64)
+    levels = hist.shape[1]
+    if clip_limit > 0:
+        limit = max(int(clip_limit * tile_pixels / levels), 1)
+        clipped = np.maximum(hist - limit, 0).sum(axis=1)
+        np.minimum(hist, limit, out=hist)
+        batch = clipped // levels
+        residual = clipped - batch * levels
+        hist += batch[:, np.newaxis]
+        # Reste réparti un niveau sur step, à partir de 0
+        step = np.maximum(levels // np.maximum(residual, 1), 1)[:, np.newaxis]
+        index = np.arange(levels)[np.newaxis, :]
+        hist += (index % step == 0) & (index // step < residual[:, np.newaxis])
+    scale = np.float32((levels - 1) / tile_pixels)
+    luts = np.rint(np.cumsum(hist, axis=1).astype(np.float32) * scale)
+    return np.minimum(luts, levels - 1, out=luts)
+
+def _reflect(index, size):
+    """Indices hors de [0, size) réfléchis comme cv2.BORDER_REFLECT_101."""
+    return np.where(index < size, index, 2 * (size - 1) - index)
+
+def _cell_ranges(size, tile, tiles, step):
+    """
+    Plages [début, fin) de taille au plus step sur lesquelles les deux
+    tuiles d'interpolation (tuile précédente, tuile suivante) sont constantes.
+
+    Returns:
+        list: (début, fin, tuile précédente, tuile suivante)
+    """
+    position = np.arange(size, dtype=np.float32) * np.float32(1.0 / tile) - np.float32(0.5)
+    first = np.floor(position).astype(np.intp)
+    changes = np.flatnonzero(np.diff(first)) + 1
+    ranges = []
+    for start, stop in zip(np.r_[0, changes], np.r_[changes, size]):
+        before = max(int(first[start]), 0)
+        after = min(int(first[start]) + 1, tiles - 1)
+        for begin in range(int(start), int(stop), step):
+            ranges.append((begin, min(begin + step, int(stop)), before, after))
+    return ranges, (position - first).astype(np.float32)
+
+def clahe_tiled(image, clip_limit=2.0, tile_grid_size=(8, 8), space='lab', order='bgr',
+                dst=None, strip_rows=256):
+    """
+    CLAHE par bandes de lignes, identique à cv2.CLAHE sur l'image entière.
+
+    Première passe : histogramme de chaque tuile, une rangée de tuiles à la
+    fois, puis tables écrêtées. Seconde passe : chaque bande d'au plus
+    strip_rows lignes est interpolée entre les tables des tuiles voisines
+    et écrite dans dst. Seules une rangée de tuiles et une bande sont en
+    mémoire à la fois ; image et dst peuvent être des np.memmap.
+
+    Args:
+        image (numpy.ndarray): Image 8 ou 16 bits, en niveaux de gris ou couleur
+        clip_limit (float): Seuil de contraste
+        tile_grid_size (tuple): Nombre de tuiles (colonnes, lignes)
+        space (str): Espace de luminance des images couleur ('lab' ou 'ycrcb')
+        order (str): Ordre des canaux couleur ('bgr' ou 'rgb')
+        dst (numpy.ndarray, optional): Sortie de même forme et même type
+        strip_rows (int): Hauteur maximale d'une bande
+
+    Returns:
+        numpy.ndarray: Image traitée (dst s'il est fourni)
+    """
+    levels = _histogram_size(image)
+    h, w = image.shape[:2]
+    tiles_x, tiles_y = int(tile_grid_size[0]), int(tile_grid_size[1])
+    if tiles_x < 1 or tiles_y < 1:
+        raise ValueError(f"Grille de tuiles invalide: {tile_grid_size}")
+    if dst is None:
+        dst = np.empty_like(image)
+    elif dst.shape != image.shape or dst.dtype != image.dtype:
+        raise ValueError("La sortie doit avoir la forme et le type de l'image")
+
+    # Comme cv2.CLAHE : si une dimension n'est pas un multiple de la grille,
+    # les deux sont complétées par réflexion de tiles - (taille % tiles)
+    if h % tiles_y or w % tiles_x:
+        tile_h, tile_w = h // tiles_y + 1, w // tiles_x + 1
+    else:
+        tile_h, tile_w = h // tiles_y, w // tiles_x
+    pad_w = tile_w * tiles_x - w
+    histograms = np.empty((tiles_y, tiles_x, levels), np.float32)
+    for ty in range(tiles_y):
+        start, stop = ty * tile_h, (ty + 1) * tile_h
+        if stop <= h:
+            band = image[start:stop]
+        else:
+            band = image[_reflect(np.arange(start, stop), h)]
+        luminance = _to_luminance(np.asarray(band), space, order)[0]
+        if pad_w:
+            luminance = cv2.copyMakeBorder(luminance, 0, 0, 0, pad_w, cv2.BORDER_REFLECT_101)
+        for tx in range(tiles_x):
+            tile = luminance[:, tx * tile_w:(tx + 1) * tile_w]
+            histograms[ty, tx] = cv2.calcHist([tile], [0], None, [levels], [0, levels]).ravel()
+    luts = _clahe_luts(histograms.reshape(tiles_y * tiles_x, levels), clip_limit,
+                       tile_h * tile_w).reshape(tiles_y, tiles_x, levels)
+
+    rows, row_weight = _cell_ranges(h, tile_h, tiles_y, max(int(strip_rows), 1))
+    columns, column_weight = _cell_ranges(w, tile_w, tiles_x, w)
+    for start, stop, top, bottom in rows:
+        block = np.asarray(image[start:stop])
+        luminance, converted = _to_luminance(block, space, order)
+        ya = row_weight[start:stop, np.newaxis]
+        result = np.empty(luminance.shape, luminance.dtype)
+        for left, right, x1, x2 in columns:
+            values = luminance[:, left:right]
+            xa = column_weight[np.newaxis, left:right]
+            # Même ordre des opérations flottantes que cv2.CLAHE
+            upper = np.take(luts[top, x1], values) * (1 - xa) + np.take(luts[top, x2], values) * xa
+            lower = np.take(luts[bottom, x1], values) * (1 - xa) + np.take(luts[bottom, x2], values) * xa
+            result[:, left:right] = np.rint(upper * (1 - ya) + lower * ya)
+        dst[start:stop] = _from_luminance(block, converted, result, space, order)
+    return dst
+
+def enhance_batch(images, method='clahe', clip_limit=2.0, tile_grid_size=(8, 8), space=None,
+                  order='bgr', max_workers=None):
+    """
+    Améliore le contraste de plusieurs images.
+
+    Les images sont réparties sur un pool de threads ; chaque thread
+    réutilise ses objets CLAHE (voir get_clahe).
+
+    Args:
+        images (iterable): Images 8 ou 16 bits
+        method (str): 'clahe' ou 'equalize'
+        clip_limit (float): Seuil de contraste (clahe)
+        tile_grid_size (tuple): Nombre de tuiles (clahe)
+        space (str, optional): Espace de luminance des images couleur (par
+            défaut, celui de clahe ou de equalize)
+        order (str): Ordre des canaux couleur ('bgr' ou 'rgb')
+        max_workers (int, optional): Nombre de threads (par défaut, le
+            nombre de processeurs)
+
+    Returns:
+        list: Images traitées, dans l'ordre
+    """
+    if method not in CONTRAST_METHODS:
+        raise ValueError(f"Méthode d'amélioration du contraste inconnue: {method}")
+
+    def process(image):
+        if method == 'equalize':
+            return equalize(image, space or 'ycrcb', order)
+        return clahe(image, clip_limit, tile_grid_size, space or 'lab', order)
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1,
+                            thread_name_prefix='contrast') as executor:
+        return list(executor.map(process, images))
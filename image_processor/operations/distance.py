@@ -0,0 +1,306 @@
+"""
+Module contenant une transformée de distance euclidienne exacte.
+
+Les distances sont mesurées depuis chaque pixel non nul du masque jusqu'au
+pixel nul (fond) le plus proche, comme cv2.distanceTransform.
+"""
+
+import cv2
+import numpy as np
+
+# Distance en deçà de laquelle le carré de la distance float32 d'OpenCV
+# redonne exactement l'entier d² (erreur de quelques ulp)
+_EXACT_LIMIT = 1024
+
+def _nearest_rows(features):
+    """Ligne du fond le plus proche dans chaque colonne (int32, -1 si aucun)."""
+    h = features.shape[0]
+    rows = np.arange(h, dtype=np.int32)[:, np.newaxis]
+
+    previous = np.where(features, rows, np.int32(-1))
+    np.maximum.accumulate(previous, axis=0, out=previous)
+    following = np.where(features, rows, np.int32(h))
+    following = np.minimum.accumulate(following[::-1], axis=0)[::-1]
+
+    use_next = (following < h) & ((previous < 0) | (following - rows < rows - previous))
+    return np.where(use_next, following, previous)
+
+def _column_pass(features, spacing):
+    """
+    Distance 1-D (le long des colonnes) au fond le plus proche.
+
+    Returns:
+        tuple: (distance au carré, ligne du fond le plus proche ou -1)
+    """
+    nearest = _nearest_rows(features)
+    rows = np.arange(features.shape[0])[:, np.newaxis]
+    squared = ((rows - nearest) * spacing) ** 2.0
+    squared[nearest < 0] = np.inf
+    return squared, nearest
+
+def _row_pass(f, spacing):
+    """
+    Enveloppe inférieure des paraboles (Felzenszwalb et Huttenlocher), menée
+    en parallèle sur toutes les lignes.
+
+    Les piles de paraboles de toutes les lignes sont stockées à plat (ligne
+    r, position k -> r * n + k) pour des accès par np.take.
+
+    Args:
+        f (numpy.ndarray): Distances au carré de la passe précédente (lignes x colonnes)
+        spacing (float): Pas des pixels le long des lignes
+
+    Returns:
+        tuple: (distance au carré, colonne de la parabole retenue ou -1)
+    """
+    n_rows, n = f.shape
+    spacing2 = spacing * spacing
+    f_flat = np.ascontiguousarray(f).ravel()
+    # Ordonnée de chaque parabole à l'origine : f(q) + (s q)²
+    height = f + spacing2 * np.arange(n, dtype=np.float64) ** 2
+    height_flat = height.ravel()
+
+    v = np.zeros(n_rows * n, np.intp)
+    z = np.full(n_rows * (n + 1), np.inf)
+    k = np.full(n_rows, -1, np.intp)
+    base_v = np.arange(n_rows) * n
+    base_z = np.arange(n_rows) * (n + 1)
+    finite = np.isfinite(f)
+
+    for q in range(n):
+        rows = np.flatnonzero(finite[:, q])
+        if rows.size == 0:
+            continue
+        hq = height[rows, q]
+
+        # Retirer les paraboles masquées par la parabole q
+        active = np.flatnonzero(k[rows] >= 0)
+        while active.size:
+            r = rows[active]
+            kr = k[r]
+            vk = v.take(base_v[r] + kr)
+            s = (hq[active] - height_flat.take(base_v[r] + vk)) / (2 * spacing2 * (q - vk))
+            pop = s <= z.take(base_z[r] + kr)
+            active = active[pop]
+            k[r[pop]] -= 1
+            active = active[k[rows[active]] >= 0]
+
+        kr = k[rows] + 1
+        k[rows] = kr
+        v[base_v[rows] + kr] = q
+        has_prev = kr > 0
+        vk_prev = v.take(base_v[rows] + np.maximum(kr - 1, 0))
+        s = np.full(rows.size, -np.inf)
+        s[has_prev] = (hq[has_prev] - height_flat.take(base_v[rows[has_prev]] + vk_prev[has_prev])) \
+            / (2 * spacing2 * (q - vk_prev[has_prev]))
+        z[base_z[rows] + kr] = s
+        z[base_z[rows] + kr + 1] = np.inf
+
+    # Évaluation de l'enveloppe
+    distance = np.full((n_rows, n), np.inf)
+    nearest = np.full((n_rows, n), -1, np.intp)
+    valid = np.flatnonzero(k >= 0)
+    position = np.zeros(valid.size, np.intp)
+    vbase, zbase = base_v[valid], base_z[valid] + 1
+    for x in range(n):
+        advance = np.flatnonzero(z.take(zbase + position) < x)
+        while advance.size:
+            position[advance] += 1
+            advance = advance[z.take(zbase[advance] + position[advance]) < x]
+        column = v.take(vbase + position)
+        distance[valid, x] = spacing2 * (x - column) ** 2.0 + f_flat.take(valid * n + column)
+        nearest[valid, x] = column
+
+    return distance, nearest
+
+def _edt(mask, sampling, return_indices):
+    """Transformée exacte séparable sur une image entière."""
+    features = mask == 0
+    squared, nearest_row = _column_pass(features, sampling[0])
+    distance, nearest_col = _row_pass(squared, sampling[1])
+    distance = np.sqrt(distance).astype(np.float32)
+
+    if not return_indices:
+        return distance, None
+
+    rows = np.arange(mask.shape[0])[:, np.newaxis]
+    indices = np.full((2,) + mask.shape, -1, np.int32)
+    found = nearest_col >= 0
+    row_index = np.broadcast_to(rows, mask.shape)
+    indices[0][found] = nearest_row[row_index[found], nearest_col[found]]
+    indices[1][found] = nearest_col[found]
+    return distance, indices
+
+def _edt_indices(binary, exact):
+    """
+    Carte des plus proches voisins déduite de la distance exacte d'OpenCV.
+
+    Le long d'une ligne, E = d² est l'enveloppe inférieure des paraboles
+    (x - c)² + g(c) de la passe verticale. La colonne c du fond le plus
+    proche de x vérifie donc E(x - 1) <= E(x) - 2 (x - c) + 1 et
+    E(x + 1) <= E(x) + 2 (x - c) + 1, ce qui l'encadre ; la borne basse est
+    atteinte dès que le voisin de gauche partage cette colonne. Les colonnes
+    de l'encadrement sont essayées dans l'ordre jusqu'à retrouver E : le
+    premier essai suffit pour presque tous les pixels.
+
+    Args:
+        binary (numpy.ndarray): Masque uint8 (0 : fond), avec au moins un pixel de fond
+        exact (numpy.ndarray): Distances exactes, inférieures à _EXACT_LIMIT
+
+    Returns:
+        numpy.ndarray: Indices (2, H, W) en int32, ou None si E n'a pas pu
+            être retrouvé partout
+    """
+    h, w = binary.shape
+    squared = exact.astype(np.float64)
+    np.square(squared, out=squared)
+    squared = np.rint(squared, out=squared).astype(np.int32)
+    nearest_row = _nearest_rows(binary == 0)
+    # Écart vertical plafonné : au-delà de la limite, une colonne ne peut pas gagner
+    vertical = np.arange(h, dtype=np.int32)[:, np.newaxis] - nearest_row
+    np.abs(vertical, out=vertical)
+    vertical[nearest_row < 0] = _EXACT_LIMIT
+    np.minimum(vertical, _EXACT_LIMIT, out=vertical)
+    np.multiply(vertical, vertical, out=vertical)
+
+    x = np.arange(w, dtype=np.int32)
+    reach = exact.astype(np.int32)
+    step = np.diff(squared, axis=1)
+    first = np.zeros((h, w), np.int32)
+    first[:, 1:] = x[1:] - ((step + 1) >> 1)
+    np.maximum(first, x - reach, out=first)
+    np.maximum(first, 0, out=first)
+    last = np.full((h, w), w - 1, np.int32)
+    last[:, :-1] = x[:-1] + ((1 - step) >> 1)
+    np.minimum(last, x + reach, out=last)
+    np.minimum(last, w - 1, out=last)
+
+    column = first
+    # Indices à plat de (ligne, colonne) : np.take, plus rapide que take_along_axis
+    row_start = np.arange(0, h * w, w)[:, np.newaxis]
+    trial = x - column
+    np.square(trial, out=trial)
+    trial += vertical.ravel().take(column + row_start)
+    found = trial == squared
+    pending = np.flatnonzero(~found)
+    if pending.size:
+        # Colonnes suivantes de l'encadrement, toutes à la fois
+        start = column.ravel()[pending] + 1
+        count = np.maximum(last.ravel()[pending] - start + 1, 0)
+        owner = np.repeat(np.arange(pending.size), count)
+        candidate = start[owner] + np.arange(owner.size) - np.repeat(np.cumsum(count) - count, count)
+        py, px = np.divmod(pending[owner], w)
+        hit = np.flatnonzero(np.square(px - candidate) + vertical[py, candidate]
+                             == squared.ravel()[pending[owner]])
+        hit_owner = owner[hit]
+        first_hit = hit[np.diff(hit_owner, prepend=-1) != 0]
+        if first_hit.size != pending.size:
+            return None
+        column.ravel()[pending] = candidate[first_hit]
+
+    return np.stack([nearest_row.ravel().take(column + row_start), column])
+
+def _edt_tile(mask, sampling, return_indices):
+    """Transformée sur une tuile, par OpenCV quand le pas est isotrope."""
+    if sampling[0] != sampling[1]:
+        return _edt(mask, sampling, return_indices)
+
+    binary = (mask != 0).astype(np.uint8)
+    if binary.all():
+        indices = np.full((2,) + mask.shape, -1, np.int32) if return_indices else None
+        return np.full(mask.shape, np.inf, np.float32), indices
+    distance = cv2.distanceTransform(binary, cv2.DIST_L2, cv2.DIST_MASK_PRECISE)
+
+    indices = None
+    if return_indices:
+        if distance.max() >= _EXACT_LIMIT:
+            return _edt(mask, sampling, return_indices)
+        indices = _edt_indices(binary, distance)
+        if indices is None:
+            return _edt(mask, sampling, return_indices)
+    if sampling[0] != 1.0:
+        distance *= np.float32(sampling[0])
+    return distance, indices
+
+def distance_transform_edt(mask, sampling=None, return_indices=False, max_distance=None, tile_size=None):
+    """
+    Calcule la transformée de distance euclidienne exacte d'un masque.
+
+    Avec un pas isotrope, le calcul passe par cv2.distanceTransform
+    (DIST_MASK_PRECISE, exact), dont se déduit la carte des plus proches
+    voisins ; avec un pas anisotrope, ou des distances d'au moins
+    _EXACT_LIMIT pixels avec la carte, par l'algorithme séparable de
+    Felzenszwalb et Huttenlocher.
+
+    Args:
+        mask (numpy.ndarray): Masque 2D ; la distance est calculée pour les
+            pixels non nuls, jusqu'au pixel nul le plus proche
+        sampling (tuple, optional): Pas des pixels (vertical, horizontal)
+        return_indices (bool): Si True, renvoie aussi les coordonnées du
+            pixel de fond le plus proche
+        max_distance (float, optional): Distance au-delà de laquelle les
+            valeurs sont plafonnées (indices à -1)
+        tile_size (int, optional): Côté des tuiles pour les très grands
+            masques ; nécessite max_distance, qui fixe la marge des tuiles
+
+    Returns:
+        numpy.ndarray ou tuple: Distances (float32, inf sans aucun pixel de
+            fond) et, si demandé, indices (2, H, W) en int32 (-1 si aucun)
+    """
+    sampling = (1.0, 1.0) if sampling is None else (float(sampling[0]), float(sampling[1]))
+
+    if tile_size is None:
+        distance, indices = _edt_tile(mask, sampling, return_indices)
+    else:
+        if max_distance is None:
+            raise ValueError("Le traitement par tuiles nécessite max_distance")
+        h, w = mask.shape
+        halo_y = int(np.ceil(max_distance / sampling[0]))
+        halo_x = int(np.ceil(max_distance / sampling[1]))
+        distance = np.empty(mask.shape, np.float32)
+        indices = np.empty((2, h, w), np.int32) if return_indices else None
+
+        for y in range(0, h, tile_size):
+            for x in range(0, w, tile_size):
+                y0, x0 = max(y - halo_y, 0), max(x - halo_x, 0)
+                y1, x1 = min(y + tile_size + halo_y, h), min(x + tile_size + halo_x, w)
+                ty, tx = min(y + tile_size, h), min(x + tile_size, w)
+                tile_dist, tile_idx = _edt_tile(mask[y0:y1, x0:x1], sampling, return_indices)
+                inner = (slice(y - y0, ty - y0), slice(x - x0, tx - x0))
+                distance[y:ty, x:tx] = tile_dist[inner]
+                if return_indices:
+                    found = tile_idx[0][inner] >= 0
+                    indices[0, y:ty, x:tx] = np.where(found, tile_idx[0][inner] + y0, -1)
+                    indices[1, y:ty, x:tx] = np.where(found, tile_idx[1][inner] + x0, -1)
+
+    if max_distance is not None:
+        capped = distance > max_distance
+        distance[capped] = max_distance
+        if return_indices:
+            indices[:, capped] = -1
+
+    if return_indices:
+        return distance, indices
+    return distance
+
+def nearest_labels(labels, sampling=None, max_distance=None, tile_size=None):
+    """
+    Associe à chaque pixel l'étiquette du germe le plus proche (Voronoï).
+
+    Args:
+        labels (numpy.ndarray): Image d'étiquettes (0 = pas de germe)
+        sampling (tuple, optional): Pas des pixels (vertical, horizontal)
+        max_distance (float, optional): Distance maximale (étiquette 0 au-delà)
+        tile_size (int, optional): Côté des tuiles (nécessite max_distance)
+
+    Returns:
+        tuple: (distance au germe le plus proche, étiquettes de Voronoï)
+    """
+    distance, indices = distance_transform_edt(
+        labels == 0, sampling, return_indices=True,
+        max_distance=max_distance, tile_size=tile_size
+    )
+    found = indices[0] >= 0
+    voronoi = np.zeros_like(labels)
+    voronoi[found] = labels[indices[0][found], indices[1][found]]
+    return distance, voronoi
@@ -2,9 +2,29 @@
 Module contenant les opérations de filtrage d'images.
 """
 
+import time
+
 import cv2
 import numpy as np
 
+from .edge_preserving import EDGE_PRESERVING_METHODS
+from .gradients import Gradients
+from .median import median_filter, opencv_supports
+
+# Noyaux fixes, construits une seule fois au chargement du module
+SHARPEN_KERNEL = np.array([[-1, -1, -1],
+                           [-1,  9, -1],
+                           [-1, -1, -1]], dtype=np.float32)
+EMBOSS_KERNEL = np.array([[-2, -1, 0],
+                          [-1,  1, 1],
+                          [ 0,  1, 2]], dtype=np.float32)
+SHARPEN_KERNEL.setflags(write=False)
+EMBOSS_KERNEL.setflags(write=False)
+
+# Tolérance relative sur la deuxième valeur singulière pour considérer
+# un noyau comme séparable (rang 1)
+_SEPARABLE_RTOL = 1e-6
+
 def apply_gaussian_blur(image, kernel_size=(5, 5), sigma=0):
     """
     Applique un flou gaussien à l'image.
@@ -19,58 +39,74 @@ def apply_gaussian_blur(image, kernel_size=(5, 5), sigma=0):
     """
     return cv2.GaussianBlur(image, kernel_size, sigma)
 
-def apply_median_blur(image, ksize=5):
+def apply_median_blur(image, ksize=5, method='auto'):
     """
     Applique un filtre médian à l'image.
     
     Args:
         image (numpy.ndarray): Image d'entrée
         ksize (int): Taille du noyau (doit être impair)
+        method (str): 'auto' (cv2.medianBlur si le type et la taille le
+            permettent, sinon median.median_filter), 'opencv' ou 'tiled'
         
     Returns:
         numpy.ndarray: Image filtrée
     """
-    return cv2.medianBlur(image, ksize)
+    if method == 'opencv' or (method == 'auto' and opencv_supports(image, ksize)):
+        return cv2.medianBlur(image, ksize)
+    return median_filter(image, ksize)
 
-def apply_bilateral_filter(image, d=9, sigma_color=75, sigma_space=75):
+def apply_bilateral_filter(image, d=9, sigma_color=75, sigma_space=75, method='exact'):
     """
     Applique un filtre bilatéral à l'image.
     
+    Le coût des méthodes approchées (voir edge_preserving) ne croît pas avec
+    le diamètre : elles ne sont plus rapides que le filtre exact que pour de
+    grands voisinages (benchmark_edge_preserving compare les méthodes).
+    
     Args:
         image (numpy.ndarray): Image d'entrée
         d (int): Diamètre du voisinage
         sigma_color: Filtre sigma dans l'espace des couleurs
         sigma_space: Filtre sigma dans l'espace des coordonnées
+        method (str): 'exact' (cv2.bilateralFilter), 'guided',
+            'domain_transform' ou 'grid'
         
     Returns:
         numpy.ndarray: Image filtrée
     """
-    return cv2.bilateralFilter(image, d, sigma_color, sigma_space)
+    if method == 'exact':
+        return cv2.bilateralFilter(image, d, sigma_color, sigma_space)
+    if method not in EDGE_PRESERVING_METHODS:
+        raise ValueError(f"Méthode de filtrage inconnue: {method}")
+    return EDGE_PRESERVING_METHODS[method](image, d, sigma_color, sigma_space)
 
-def apply_sobel(image, dx=1, dy=1, ksize=3):
+def apply_sobel(image, dx=None, dy=None, ksize=3):
     """
     Applique l'opérateur de Sobel pour détecter les contours.
     
+    Sans ordre de dérivation, renvoie la norme du gradient ; sinon la
+    dérivée demandée (par exemple dx=1, dy=1 pour la dérivée croisée).
+    
     Args:
         image (numpy.ndarray): Image d'entrée (en niveaux de gris)
-        dx (int): Ordre de la dérivée en x
-        dy (int): Ordre de la dérivée en y
+        dx (int, optional): Ordre de la dérivée en x
+        dy (int, optional): Ordre de la dérivée en y
         ksize (int): Taille du noyau de Sobel
         
     Returns:
         numpy.ndarray: Image des contours détectés
     """
-    if len(image.shape) == 3:
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    
-    sobelx = cv2.Sobel(image, cv2.CV_64F, 1, 0, ksize=ksize)
-    sobely = cv2.Sobel(image, cv2.CV_64F, 0, 1, ksize=ksize)
-    
-    # Calcul de la magnitude du gradient
-    magnitude = np.sqrt(sobelx**2 + sobely**2)
+    if dx is None and dy is None:
+        values = Gradients(image, ksize).magnitude
+    else:
+        if len(image.shape) == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        values = cv2.Sobel(image, cv2.CV_32F, dx or 0, dy or 0, ksize=ksize)
+        values = np.abs(values)
     
     # Normalisation pour l'affichage
-    return cv2.normalize(magnitude, None, 0, 255, cv2.NORM_MINMAX, cv2.CV_8U)
+    return cv2.normalize(values, None, 0, 255, cv2.NORM_MINMAX, cv2.CV_8U)
 
 def apply_laplacian(image, ksize=3):
     """
@@ -83,13 +119,10 @@ def apply_laplacian(image, ksize=3):
     Returns:
         numpy.ndarray: Image des contours détectés
     """
-    if len(image.shape) == 3:
-        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    
-    laplacian = cv2.Laplacian(image, cv2.CV_64F, ksize=ksize)
+    laplacian = Gradients(image, ksize).laplacian
     return cv2.normalize(laplacian, None, 0, 255, cv2.NORM_MINMAX, cv2.CV_8U)
 
-def apply_canny(image, threshold1=100, threshold2=200):
+def apply_canny(image, threshold1=100, threshold2=200, auto=None):
     """
     Détecte les contours avec l'algorithme de Canny.
     
@@ -97,27 +130,171 @@ def apply_canny(image, threshold1=100, threshold2=200):
         image (numpy.ndarray): Image d'entrée (en niveaux de gris)
         threshold1 (int): Premier seuil pour la procédure d'hystérésis
         threshold2 (int): Deuxième seuil pour la procédure d'hystérésis
+        auto (str, optional): Seuils déduits de l'image au lieu des seuils
+            fixes : 'median', 'otsu' ou 'percentile' (voir gradients.canny_thresholds)
         
     Returns:
         numpy.ndarray: Image des contours détectés
     """
+    if auto is not None:
+        return Gradients(image).auto_canny(auto)[0]
+    
     if len(image.shape) == 3:
         image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     
     return cv2.Canny(image, threshold1, threshold2)
 
-def apply_custom_kernel(image, kernel):
+def _saturate(result, dtype):
+    """Convertit un résultat flottant vers le type d'origine avec saturation."""
+    if np.issubdtype(dtype, np.integer):
+        info = np.iinfo(dtype)
+        return np.clip(np.rint(result), info.min, info.max).astype(dtype)
+    return result.astype(dtype)
+
+def analyze_kernel(kernel):
+    """
+    Détermine la structure d'un noyau de convolution.
+    
+    Args:
+        kernel (numpy.ndarray): Noyau de convolution 2D
+        
+    Returns:
+        tuple: (type, données) avec type parmi
+            'box' (données : valeur constante),
+            'separable' (données : (noyau_x, noyau_y)),
+            'full' (données : noyau en float32)
+    """
+    k = np.asarray(kernel, dtype=np.float64)
+    if k.ndim == 1:
+        k = k.reshape(1, -1)
+    
+    if np.all(k == k.flat[0]):
+        return 'box', float(k.flat[0])
+    
+    # Un noyau ligne ou colonne est trivialement séparable
+    if k.shape[0] == 1:
+        return 'separable', (k[0].astype(np.float32), np.ones(1, np.float32))
+    if k.shape[1] == 1:
+        return 'separable', (np.ones(1, np.float32), k[:, 0].astype(np.float32))
+    
+    # Test de rang 1 par décomposition en valeurs singulières
+    u, sv, vt = np.linalg.svd(k)
+    if sv[0] > 0 and sv[1] <= sv[0] * _SEPARABLE_RTOL:
+        scale = np.sqrt(sv[0])
+        return 'separable', ((vt[0] * scale).astype(np.float32),
+                             (u[:, 0] * scale).astype(np.float32))
+    
+    return 'full', k.astype(np.float32)
+
+def _filter_fft(image, kernel):
+    """
+    Corrélation par FFT, équivalente à cv2.filter2D (ancre centrée,
+    bord BORDER_REFLECT_101).
+    """
+    kh, kw = kernel.shape
+    ay, ax = kh // 2, kw // 2
+    h, w = image.shape[:2]
+    padded = cv2.copyMakeBorder(image, ay, kh - 1 - ay, ax, kw - 1 - ax, cv2.BORDER_REFLECT_101)
+    
+    fh = cv2.getOptimalDFTSize(padded.shape[0])
+    fw = cv2.getOptimalDFTSize(padded.shape[1])
+    kernel_buf = np.zeros((fh, fw), np.float32)
+    kernel_buf[:kh, :kw] = kernel
+    kernel_spectrum = cv2.dft(kernel_buf, nonzeroRows=kh)
+    
+    channels = padded.reshape(padded.shape[0], padded.shape[1], -1)
+    result = np.empty((h, w, channels.shape[2]), np.float32)
+    buf = np.zeros((fh, fw), np.float32)
+    for c in range(channels.shape[2]):
+        buf[:padded.shape[0], :padded.shape[1]] = channels[:, :, c]
+        spectrum = cv2.dft(buf, nonzeroRows=padded.shape[0])
+        spectrum = cv2.mulSpectrums(spectrum, kernel_spectrum, 0, conjB=True)
+        out = cv2.idft(spectrum, flags=cv2.DFT_SCALE | cv2.DFT_REAL_OUTPUT, nonzeroRows=h)
+        result[:, :, c] = out[:h, :w]
+    
+    return _saturate(result.reshape(image.shape), image.dtype)
+
+def apply_custom_kernel(image, kernel, method='auto', fft_crossover=None):
     """
     Applique un noyau de convolution personnalisé à l'image.
     
+    En mode 'auto', la structure du noyau choisit l'implémentation :
+    noyau constant -> cv2.boxFilter, noyau de rang 1 -> cv2.sepFilter2D
+    (O(kx + ky) par pixel au lieu de O(kx * ky)), sinon cv2.filter2D, ou la
+    FFT si le noyau atteint fft_crossover.
+    
     Args:
         image (numpy.ndarray): Image d'entrée
         kernel (numpy.ndarray): Noyau de convolution
+        method (str): 'auto', 'direct' (filter2D) ou 'fft'
+        fft_crossover (int, optional): Côté de noyau à partir duquel la FFT
+            est utilisée en mode 'auto' (voir benchmark_custom_kernel).
+            Par défaut, jamais : filter2D bascule déjà sur une DFT par blocs
+            pour les grands noyaux et reste plus rapide qu'une FFT globale.
         
     Returns:
         numpy.ndarray: Image filtrée
     """
-    return cv2.filter2D(image, -1, kernel)
+    if method == 'direct':
+        return cv2.filter2D(image, -1, kernel)
+    
+    kind, data = analyze_kernel(kernel)
+    kh, kw = np.atleast_2d(np.asarray(kernel)).shape
+    
+    if method == 'fft':
+        return _filter_fft(image, np.atleast_2d(np.asarray(kernel, dtype=np.float32)))
+    
+    if kind == 'box':
+        if abs(data * kh * kw - 1.0) < 1e-6:
+            # Noyau de moyenne : filtre normalisé directement dans le type d'origine
+            return cv2.boxFilter(image, -1, (kw, kh), normalize=True)
+        summed = cv2.boxFilter(image, cv2.CV_32F, (kw, kh), normalize=False)
+        return _saturate(summed * data, image.dtype)
+    
+    if kind == 'separable':
+        kernel_x, kernel_y = data
+        return cv2.sepFilter2D(image, -1, kernel_x, kernel_y)
+    
+    if fft_crossover is not None and max(kh, kw) >= fft_crossover:
+        return _filter_fft(image, data)
+    return cv2.filter2D(image, -1, data)
+
+def benchmark_custom_kernel(image, sizes=(5, 9, 15, 21, 31, 45, 61), repeats=3):
+    """
+    Mesure filter2D et la FFT sur des noyaux non séparables de tailles croissantes.
+    
+    Args:
+        image (numpy.ndarray): Image de test
+        sizes (tuple): Côtés de noyau à mesurer
+        repeats (int): Nombre de répétitions (le meilleur temps est retenu)
+        
+    Returns:
+        tuple: (temps par taille {taille: (direct, fft)}, plus petit côté où
+            la FFT est plus rapide ou None) ; ce côté peut être passé en
+            fft_crossover à apply_custom_kernel
+    """
+    rng = np.random.default_rng(0)
+    timings = {}
+    crossover = None
+    
+    for size in sizes:
+        kernel = rng.random((size, size)).astype(np.float32)
+        kernel /= kernel.sum()
+        
+        best = []
+        for method in ('direct', 'fft'):
+            elapsed = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                apply_custom_kernel(image, kernel, method=method)
+                elapsed.append(time.perf_counter() - start)
+            best.append(min(elapsed))
+        
+        timings[size] = tuple(best)
+        if crossover is None and best[1] < best[0]:
+            crossover = size
+    
+    return timings, crossover
 
 def apply_sharpening(image):
     """
@@ -129,10 +306,7 @@ def apply_sharpening(image):
     Returns:
         numpy.ndarray: Image avec netteté améliorée
     """
-    kernel = np.array([[-1, -1, -1],
-                       [-1,  9, -1],
-                       [-1, -1, -1]])
-    return cv2.filter2D(image, -1, kernel)
+    return cv2.filter2D(image, -1, SHARPEN_KERNEL)
 
 def apply_emboss(image):
     """
@@ -144,7 +318,4 @@ def apply_emboss(image):
     Returns:
         numpy.ndarray: Image avec effet d'embossage
     """
-    kernel = np.array([[-2, -1, 0],
-                       [-1,  1, 1],
-                       [ 0,  1, 2]])
-    return cv2.filter2D(image, -1, kernel)
+    return cv2.filter2D(image, -1, EMBOSS_KERNEL)
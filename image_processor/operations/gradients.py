@@ -0,0 +1,313 @@
+"""
+Module contenant le calcul partagé des dérivées d'une image.
+
+Les dérivées de Sobel Gx et Gy sont calculées une seule fois (en int16
+pour les images 8 bits, en float32 sinon) ; la norme, l'orientation et
+les contours de Canny en sont dérivés, et le Laplacien réutilise la même
+image en niveaux de gris lissée. Un cache indexé par version d'image
+permet à plusieurs opérations successives sur la même image de partager
+ces calculs.
+
+Les seuils de Canny peuvent être déduits de chaque image (médiane des
+intensités ou histogramme de la norme du gradient), en une seule passe.
+"""
+
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+# Bord de cv2.Canny. Les dérivées partagées gardent le bord par défaut
+# d'OpenCV (celui de cv2.Sobel et cv2.Laplacian) ; seules les bandes de
+# bord sont recalculées avec ce bord pour Canny
+_CANNY_BORDER = cv2.BORDER_REPLICATE
+
+CANNY_THRESHOLD_METHODS = ('median', 'otsu', 'percentile')
+
+# Classes de l'histogramme de la norme L1 |Gx| + |Gy| (celle de cv2.Canny)
+_MAGNITUDE_BINS = 1024
+
+def canny_thresholds(histograms, values, method='median', sigma=0.33, ratio=0.5,
+                     percentile=0.9):
+    """
+    Seuils de Canny déduits d'histogrammes, pour une ou plusieurs images.
+
+    Les calculs sont vectorisés sur la première dimension : une ligne
+    d'histogramme par image.
+
+    Args:
+        histograms (numpy.ndarray): Effectifs (n, classes) ou (classes,)
+        values (numpy.ndarray): Valeur de chaque classe
+        method (str): 'median' (histogramme des intensités : seuils à
+            (1 -/+ sigma) x médiane), 'otsu' (histogramme de la norme : seuil
+            haut d'Otsu) ou 'percentile' (histogramme de la norme : seuil haut
+            au quantile percentile)
+        sigma (float): Écart relatif des seuils autour de la médiane
+        ratio (float): Seuil bas / seuil haut (otsu, percentile)
+        percentile (float): Part des pixels sous le seuil haut (percentile)
+
+    Returns:
+        numpy.ndarray: Seuils (bas, haut), de forme (n, 2) ou (2,)
+    """
+    if method not in CANNY_THRESHOLD_METHODS:
+        raise ValueError(f"Méthode de seuillage de Canny inconnue: {method}")
+    hist = np.atleast_2d(np.asarray(histograms, dtype=np.float64))
+    cumulative = np.cumsum(hist, axis=1)
+    total = np.maximum(cumulative[:, -1:], 1.0)
+
+    if method == 'median':
+        median = values[np.argmax(cumulative >= total / 2.0, axis=1)]
+        low = np.maximum(0.0, (1.0 - sigma) * median)
+        high = np.minimum(255.0, (1.0 + sigma) * median)
+    else:
+        if method == 'otsu':
+            # Variance inter-classes maximale, pour chaque image à la fois
+            weight = cumulative / total
+            mean = np.cumsum(hist * values, axis=1) / total
+            with np.errstate(divide='ignore', invalid='ignore'):
+                between = (mean[:, -1:] * weight - mean) ** 2 / (weight * (1.0 - weight))
+            between[~np.isfinite(between)] = -1.0
+            high = values[np.argmax(between, axis=1)]
+        else:
+            high = values[np.argmax(cumulative >= percentile * total, axis=1)]
+        low = ratio * high
+    thresholds = np.stack([low, high], axis=1)
+    return thresholds if np.ndim(histograms) == 2 else thresholds[0]
+
+class Gradients:
+    """
+    Dérivées de Sobel d'une image et grandeurs qui en découlent.
+
+    Attributs :
+        gray : image en niveaux de gris (lissée si demandé)
+        dx, dy : dérivées premières (int16 pour une image 8 bits et un noyau
+            de taille 5 au plus, float32 sinon)
+    """
+
+    def __init__(self, image, ksize=3, blur_size=0, sigma=0):
+        """
+        Args:
+            image (numpy.ndarray): Image (convertie en niveaux de gris si besoin)
+            ksize (int): Taille du noyau de Sobel (1, 3, 5 ou 7)
+            blur_size (int): Taille du flou gaussien préalable (0 : aucun)
+            sigma (float): Écart-type du flou (0 : déduit de la taille)
+        """
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if blur_size:
+            image = cv2.GaussianBlur(image, (blur_size, blur_size), sigma)
+        self.gray = image
+        self.ksize = ksize
+        # Somme des coefficients positifs du noyau 5x5 : 48, soit 12240 au plus
+        self.depth = cv2.CV_16S if image.dtype == np.uint8 and ksize <= 5 else cv2.CV_32F
+        self.dx, self.dy = self._sobel(image)
+        self._derived = {}
+
+    def _sobel(self, image, border=cv2.BORDER_DEFAULT):
+        """Dérivées premières (dx, dy) d'une image."""
+        return (cv2.Sobel(image, self.depth, 1, 0, ksize=self.ksize, borderType=border),
+                cv2.Sobel(image, self.depth, 0, 1, ksize=self.ksize, borderType=border))
+
+    def _memo(self, key, compute):
+        """Calcule une grandeur dérivée à la première demande seulement."""
+        if key not in self._derived:
+            self._derived[key] = compute()
+        return self._derived[key]
+
+    @staticmethod
+    def _to_int16(derivative):
+        """Dérivée en int16, seul type accepté par cv2.Canny."""
+        if derivative.dtype == np.int16:
+            return derivative
+        return np.clip(np.rint(derivative), -32768, 32767).astype(np.int16)
+
+    def _canny_derivatives(self):
+        """
+        Dérivées int16 avec le bord de cv2.Canny.
+
+        Seules les bandes de bord (ksize // 2 pixels) dépendent du mode de
+        bord : elles sont recalculées sur des bandes de l'image, le reste
+        est copié des dérivées partagées.
+        """
+        def compute():
+            gray = self.gray
+            height, width = gray.shape
+            r = max(self.ksize // 2, 1)
+            if height <= 2 * r or width <= 2 * r:
+                return tuple(self._to_int16(d) for d in self._sobel(gray, _CANNY_BORDER))
+            dx, dy = (np.array(self._to_int16(d)) for d in (self.dx, self.dy))
+            # (bande source, partie de la bande à recopier, destination)
+            strips = (
+                (np.s_[:2 * r, :], np.s_[:r, :], np.s_[:r, :]),
+                (np.s_[-2 * r:, :], np.s_[r:, :], np.s_[-r:, :]),
+                (np.s_[:, :2 * r], np.s_[:, :r], np.s_[:, :r]),
+                (np.s_[:, -2 * r:], np.s_[:, r:], np.s_[:, -r:]),
+            )
+            for source, part, target in strips:
+                strip_dx, strip_dy = self._sobel(gray[source], _CANNY_BORDER)
+                dx[target] = self._to_int16(strip_dx[part])
+                dy[target] = self._to_int16(strip_dy[part])
+            return dx, dy
+        return self._memo('canny_derivatives', compute)
+
+    def _float(self):
+        return self._memo('float', lambda: (self.dx.astype(np.float32, copy=False),
+                                            self.dy.astype(np.float32, copy=False)))
+
+    @property
+    def magnitude(self):
+        """Norme du gradient (float32)."""
+        return self._memo('magnitude', lambda: cv2.magnitude(*self._float()))
+
+    @property
+    def orientation(self):
+        """Orientation du gradient en degrés, de 0 à 360 (float32)."""
+        return self._memo('orientation', lambda: cv2.phase(*self._float(), angleInDegrees=True))
+
+    @property
+    def laplacian(self):
+        """Laplacien de l'image lissée, même taille de noyau (int16 ou float32)."""
+        return self._memo('laplacian', lambda: cv2.Laplacian(self.gray, self.depth, ksize=self.ksize))
+
+    def canny(self, threshold1=100, threshold2=200, l2_gradient=False):
+        """
+        Contours de Canny calculés à partir des dérivées en cache.
+
+        Args:
+            threshold1 (float): Premier seuil de l'hystérésis
+            threshold2 (float): Deuxième seuil de l'hystérésis
+            l2_gradient (bool): Norme L2 (sinon L1, comme cv2.Canny par défaut)
+
+        Returns:
+            numpy.ndarray: Contours (0/255)
+        """
+        def compute():
+            return cv2.Canny(*self._canny_derivatives(), threshold1, threshold2, L2gradient=l2_gradient)
+        return self._memo(('canny', threshold1, threshold2, l2_gradient), compute)
+
+    def threshold_histogram(self, method='median'):
+        """
+        Histogramme servant aux seuils automatiques de Canny.
+
+        Args:
+            method (str): 'median' (intensités) ou 'otsu' / 'percentile'
+                (norme L1 du gradient, celle qu'utilise cv2.Canny)
+
+        Returns:
+            tuple: (effectifs, valeur de chaque classe)
+        """
+        if self.gray.dtype != np.uint8:
+            raise ValueError(f"Seuils automatiques : image 8 bits attendue: {self.gray.dtype}")
+        if method == 'median':
+            def compute():
+                counts = cv2.calcHist([self.gray], [0], None, [256], [0, 256]).ravel()
+                return counts, np.arange(256, dtype=np.float64)
+            return self._memo('intensity_histogram', compute)
+
+        def compute():
+            dx, dy = self._canny_derivatives()
+            norm = cv2.add(cv2.absdiff(dx, 0), cv2.absdiff(dy, 0)).view(np.uint16)
+            # Norme maximale : deux fois 255 fois la somme des coefficients positifs
+            # du noyau, plafonnée par la saturation int16
+            kx, ky = cv2.getDerivKernels(1, 0, self.ksize)
+            limit = min(int(255 * np.abs(kx).sum() * np.abs(ky).sum()), 32767)
+            counts = cv2.calcHist([norm], [0], None, [_MAGNITUDE_BINS], [0, limit + 1]).ravel()
+            return counts, np.arange(_MAGNITUDE_BINS) * ((limit + 1) / _MAGNITUDE_BINS)
+        return self._memo('magnitude_histogram', compute)
+
+    def auto_canny(self, method='median', sigma=0.33, ratio=0.5, percentile=0.9):
+        """
+        Contours de Canny avec des seuils déduits de l'image.
+
+        Args:
+            method (str): 'median', 'otsu' ou 'percentile' (voir canny_thresholds)
+            sigma (float): Écart relatif autour de la médiane (median)
+            ratio (float): Seuil bas / seuil haut (otsu, percentile)
+            percentile (float): Quantile du seuil haut (percentile)
+
+        Returns:
+            tuple: (contours 0/255, (seuil bas, seuil haut))
+        """
+        low, high = canny_thresholds(*self.threshold_histogram(method), method,
+                                     sigma, ratio, percentile)
+        return self.canny(float(low), float(high)), (float(low), float(high))
+
+class GradientCache:
+    """
+    Cache des dérivées par version d'image.
+
+    L'appelant fournit une version (entier ou tout identifiant qui change
+    quand l'image change) ; les dérivées ne sont recalculées que pour une
+    version ou des paramètres nouveaux. Les entrées les plus anciennes
+    sont évincées au-delà de max_entries.
+    """
+
+    def __init__(self, max_entries=4):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, version, load, ksize=3, blur_size=0, sigma=0):
+        """
+        Dérivées de l'image d'une version donnée.
+
+        Args:
+            version: Identifiant de la version de l'image
+            load (callable): Fonction sans argument renvoyant l'image ;
+                appelée seulement si les dérivées ne sont pas en cache
+            ksize (int): Taille du noyau de Sobel
+            blur_size (int): Taille du flou gaussien préalable
+            sigma (float): Écart-type du flou
+
+        Returns:
+            Gradients: Dérivées partagées (ne pas modifier les tableaux)
+        """
+        key = (version, ksize, blur_size, sigma)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        gradients = Gradients(load(), ksize, blur_size, sigma)
+        self._entries[key] = gradients
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return gradients
+
+    def clear(self):
+        """Vide le cache."""
+        self._entries.clear()
+
+def auto_canny_batch(frames, method='median', blur_size=0, sigma=0.33, ratio=0.5,
+                     percentile=0.9, ksize=3, max_workers=None):
+    """
+    Contours de Canny de plusieurs images, chacune avec ses propres seuils.
+
+    Chaque image est traitée en une passe (dérivées, histogramme, seuils,
+    Canny) sur un pool de threads ; OpenCV libère le GIL pendant les calculs.
+
+    Args:
+        frames (iterable): Images 8 bits (ou tableau (n, hauteur, largeur))
+        method (str): 'median', 'otsu' ou 'percentile' (voir canny_thresholds)
+        blur_size (int): Taille du flou gaussien préalable (0 : aucun)
+        sigma (float): Écart relatif autour de la médiane (median)
+        ratio (float): Seuil bas / seuil haut (otsu, percentile)
+        percentile (float): Quantile du seuil haut (percentile)
+        ksize (int): Taille du noyau de Sobel
+        max_workers (int, optional): Nombre de threads (par défaut, le
+            nombre de processeurs)
+
+    Returns:
+        tuple: (liste des contours, seuils (n, 2) bas et haut de chaque image)
+    """
+    if method not in CANNY_THRESHOLD_METHODS:
+        raise ValueError(f"Méthode de seuillage de Canny inconnue: {method}")
+
+    def process(frame):
+        return Gradients(frame, ksize, blur_size).auto_canny(method, sigma, ratio, percentile)
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1,
+                            thread_name_prefix='auto-canny') as executor:
+        results = list(executor.map(process, frames))
+    edges = [result[0] for result in results]
+    thresholds = np.array([result[1] for result in results], dtype=np.float64).reshape(-1, 2)
+    return edges, thresholds
@@ -0,0 +1,249 @@
+"""
+Module contenant la détection de segments de droites.
+
+La transformée de Hough probabiliste vote pour tous les angles en chaque
+pixel de contour : sur les grands plans scannés, l'accumulateur pleine
+résolution domine le temps de calcul. Ici, la recherche se fait sur une
+carte de contours réduite (pyramide), puis chaque segment candidat est
+affiné à pleine résolution par un vote restreint à une fenêtre d'angles et
+à une bande autour du segment. Le détecteur LSD est proposé en alternative.
+
+Les segments sont renvoyés sous forme de tableau (N, 4) : x1, y1, x2, y2.
+"""
+
+import cv2
+import numpy as np
+
+from .gradients import Gradients
+
+LINE_METHODS = ('hough', 'lsd')
+
+def _as_gray(image):
+    """Image en niveaux de gris 8 bits."""
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return image
+
+def detect_edges(image, low_threshold=50, high_threshold=150, blur_size=5):
+    """
+    Carte de contours (lissage gaussien puis Canny).
+
+    Args:
+        image (numpy.ndarray): Image d'entrée (convertie en niveaux de gris)
+        low_threshold (float): Seuil bas de Canny
+        high_threshold (float): Seuil haut de Canny
+        blur_size (int): Taille du noyau gaussien (0 pour ne pas lisser)
+
+    Returns:
+        numpy.ndarray: Contours (0/255)
+    """
+    return Gradients(_as_gray(image), blur_size=blur_size, sigma=1.0).canny(low_threshold, high_threshold)
+
+def _downsample_edges(edges, factor):
+    """
+    Réduit une carte de contours sans perdre les contours fins (max par bloc).
+
+    Un pixel réduit vaut 255 dès qu'un pixel du bloc factor x factor est un
+    contour ; les lignes et colonnes restantes rejoignent le dernier bloc.
+    """
+    h, w = edges.shape
+    # Max sur [i * factor, (i + 1) * factor) : dilatation ancrée en haut à gauche
+    blocks = cv2.dilate(edges, np.ones((factor, factor), np.uint8), anchor=(0, 0))[::factor, ::factor]
+    small = np.maximum.reduceat(blocks, np.arange(max(h // factor, 1)), axis=0)
+    small = np.maximum.reduceat(small, np.arange(max(w // factor, 1)), axis=1)
+    return (small > 0).astype(np.uint8) * 255
+
+def _sample_edges(edges, xs, ys):
+    """Pixels de contour aux positions données (arrondies, hors image : faux)."""
+    h, w = edges.shape
+    # Arrondi au plus proche par excès : les centres de blocs tombent sur des
+    # demi-pixels, que np.rint regrouperait deux à deux
+    xs = np.floor(xs + 0.5).astype(np.intp)
+    ys = np.floor(ys + 0.5).astype(np.intp)
+    inside = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+    hit = np.zeros(xs.shape, bool)
+    hit[inside] = edges[ys[inside], xs[inside]] > 0
+    return hit, xs, ys
+
+def _refine_segments(edges, segments, band, angles, rho, min_length, stations=64):
+    """
+    Affine des segments approchés par un vote de Hough local à pleine résolution.
+
+    Pour chaque segment, les pixels de contour d'une bande de demi-largeur
+    band, relevés en un nombre fixe de stations, votent pour les angles du
+    segment décalés de angles ; la droite retenue est celle qui reçoit le
+    plus de votes. Les extrémités sont ensuite cherchées sur cette droite,
+    autour des extrémités approchées. Le coût ne dépend que du nombre de
+    segments, pas de leur longueur.
+
+    Returns:
+        numpy.ndarray: Segments affinés (M, 4) int32
+    """
+    n = len(segments)
+    centre = (segments[:, :2] + segments[:, 2:]) / 2.0
+    delta = segments[:, 2:] - segments[:, :2]
+    length = np.hypot(delta[:, 0], delta[:, 1])
+    base = np.arctan2(delta[:, 1], delta[:, 0])
+
+    # Stations le long du segment, décalages en travers de la bande
+    along = np.linspace(-0.5, 0.5, stations)[np.newaxis, :, np.newaxis] * length[:, np.newaxis, np.newaxis]
+    across = np.arange(-band, band + 1)[np.newaxis, np.newaxis, :]
+    ux = np.cos(base)[:, np.newaxis, np.newaxis]
+    uy = np.sin(base)[:, np.newaxis, np.newaxis]
+    hit, xs, ys = _sample_edges(edges, centre[:, 0, np.newaxis, np.newaxis] + along * ux - across * uy,
+                                centre[:, 1, np.newaxis, np.newaxis] + along * uy + across * ux)
+    seg = np.broadcast_to(np.arange(n)[:, np.newaxis, np.newaxis], hit.shape)[hit]
+    dx = xs[hit] - centre[seg, 0]
+    dy = ys[hit] - centre[seg, 1]
+
+    # Vote (segment, angle, distance signée au milieu) ; chaque cellule compte
+    # aussi ses deux voisines, comme le soutien retenu ensuite (+/- rho)
+    bins = int(np.ceil((band + 1) / rho)) * 2 + 1
+    votes = np.zeros((n, angles.size, bins))
+    distances = []
+    for j, shift in enumerate(angles):
+        phi = base[seg] + shift
+        dist = dy * np.cos(phi) - dx * np.sin(phi)
+        distances.append(dist)
+        cell = np.clip(np.rint(dist / rho).astype(np.intp) + bins // 2, 0, bins - 1)
+        votes[:, j] = np.bincount(seg * bins + cell, minlength=n * bins).reshape(n, bins)
+    votes[:, :, 1:-1] += votes[:, :, :-2] + votes[:, :, 2:]
+    best = np.argmax(votes.reshape(n, -1), axis=1)
+    best_angle, best_cell = best // bins, best % bins
+    phi = base + angles[best_angle]
+
+    # Position de la droite : distance moyenne des pixels qui la soutiennent
+    dist = np.stack(distances)[best_angle[seg], np.arange(seg.size)]
+    support = np.abs(dist - (best_cell[seg] - bins // 2) * rho) <= rho
+    count = np.bincount(seg[support], minlength=n)
+    offset = np.bincount(seg[support], weights=dist[support], minlength=n) / np.maximum(count, 1)
+    c, s = np.cos(phi), np.sin(phi)
+    origin = centre + offset[:, np.newaxis] * np.stack([-s, c], axis=1)
+
+    # Extrémités : pixel de contour le plus éloigné du milieu sur la droite
+    # affinée (+/- rho en travers), à moins de 2 band de l'extrémité approchée
+    reach = length[:, np.newaxis] / 2.0 + np.arange(-2 * band, 2 * band + 1)
+    sides = np.arange(-1, 2)[np.newaxis, np.newaxis, :] * rho
+    ux, uy = c[:, np.newaxis, np.newaxis], s[:, np.newaxis, np.newaxis]
+    ox, oy = origin[:, 0, np.newaxis, np.newaxis], origin[:, 1, np.newaxis, np.newaxis]
+    extremities = []
+    for sign in (-1.0, 1.0):
+        t = sign * reach[:, :, np.newaxis]
+        hit, _, _ = _sample_edges(edges, ox + t * ux - sides * uy, oy + t * uy + sides * ux)
+        farthest = np.where(hit.any(axis=2), reach, -np.inf).max(axis=1)
+        extremities.append(sign * np.where(np.isfinite(farthest), farthest, length / 2.0))
+    lo, hi = extremities
+
+    keep = (count > 0) & (hi - lo >= min_length)
+    result = np.stack([origin[:, 0] + lo * c, origin[:, 1] + lo * s,
+                       origin[:, 0] + hi * c, origin[:, 1] + hi * s], axis=1)[keep]
+    return np.rint(result).astype(np.int32)
+
+def hough_segments(edges, rho=1.0, theta=np.pi / 180, threshold=80, min_length=30,
+                   max_gap=10, pyramid_levels=1, angle_window=np.deg2rad(2)):
+    """
+    Segments de droites par transformée de Hough probabiliste accélérée par pyramide.
+
+    Args:
+        edges (numpy.ndarray): Carte de contours binaire (8 bits)
+        rho (float): Résolution en distance (pixels)
+        theta (float): Résolution angulaire (radians)
+        threshold (int): Nombre minimal de votes (à pleine résolution)
+        min_length (float): Longueur minimale d'un segment
+        max_gap (float): Écart maximal entre pixels d'un même segment
+        pyramid_levels (int): Nombre de réductions par 2 pour la recherche
+            (0 : cv2.HoughLinesP à pleine résolution)
+        angle_window (float): Demi-largeur de la fenêtre d'angles de
+            l'affinage à pleine résolution (radians)
+
+    Returns:
+        numpy.ndarray: Segments (N, 4) int32
+    """
+    if pyramid_levels <= 0:
+        lines = cv2.HoughLinesP(edges.copy(), rho, theta, threshold,
+                                minLineLength=min_length, maxLineGap=max_gap)
+        return np.zeros((0, 4), np.int32) if lines is None else lines.reshape(-1, 4)
+
+    factor = 1 << pyramid_levels
+    coarse = cv2.HoughLinesP(_downsample_edges(edges, factor), rho, theta,
+                             max(int(threshold) // factor, 1),
+                             minLineLength=min_length / factor,
+                             maxLineGap=max(max_gap / factor, 1.0))
+    if coarse is None:
+        return np.zeros((0, 4), np.int32)
+    # Centre des blocs réduits, en coordonnées pleine résolution
+    segments = coarse.reshape(-1, 4).astype(np.float64) * factor + (factor - 1) / 2.0
+    steps = int(np.floor(angle_window / theta))
+    angles = np.arange(-steps, steps + 1) * theta
+    return _refine_segments(edges, segments, factor, angles, rho, min_length)
+
+def lsd_segments(image, min_length=30, scale=0.8):
+    """
+    Segments de droites par le détecteur LSD (sans carte de contours).
+
+    Args:
+        image (numpy.ndarray): Image d'entrée (convertie en niveaux de gris)
+        min_length (float): Longueur minimale d'un segment
+        scale (float): Échelle de travail du détecteur (0 à 1)
+
+    Returns:
+        numpy.ndarray: Segments (N, 4) float32 (précision sous-pixel)
+    """
+    detector = cv2.createLineSegmentDetector(cv2.LSD_REFINE_STD, scale)
+    lines = detector.detect(_as_gray(image))[0]
+    if lines is None:
+        return np.zeros((0, 4), np.float32)
+    lines = lines.reshape(-1, 4)
+    length = np.hypot(lines[:, 2] - lines[:, 0], lines[:, 3] - lines[:, 1])
+    return lines[length >= min_length]
+
+def detect_lines(image, method='hough', low_threshold=50, high_threshold=150,
+                 threshold=80, min_length=30, max_gap=10, pyramid_levels=1):
+    """
+    Détecte les segments de droites d'une image.
+
+    Args:
+        image (numpy.ndarray): Image d'entrée
+        method (str): 'hough' (contours de Canny puis Hough par pyramide)
+            ou 'lsd'
+        low_threshold (float): Seuil bas de Canny (hough)
+        high_threshold (float): Seuil haut de Canny (hough)
+        threshold (int): Nombre minimal de votes (hough)
+        min_length (float): Longueur minimale d'un segment
+        max_gap (float): Écart maximal dans un segment (hough)
+        pyramid_levels (int): Réductions par 2 de la recherche (hough)
+
+    Returns:
+        numpy.ndarray: Segments (N, 4) x1, y1, x2, y2
+    """
+    if method not in LINE_METHODS:
+        raise ValueError(f"Méthode de détection de lignes inconnue: {method}")
+    if method == 'lsd':
+        return lsd_segments(image, min_length)
+    edges = detect_edges(image, low_threshold, high_threshold)
+    return hough_segments(edges, threshold=threshold, min_length=min_length,
+                          max_gap=max_gap, pyramid_levels=pyramid_levels)
+
+def draw_lines(image, lines, color=(255, 0, 0), thickness=2, dst=None):
+    """
+    Dessine des segments en un seul appel à cv2.polylines.
+
+    Args:
+        image (numpy.ndarray): Image d'entrée
+        lines (numpy.ndarray): Segments (N, 4)
+        color (tuple): Couleur des segments
+        thickness (int): Épaisseur
+        dst (numpy.ndarray, optional): Image de sortie ; image elle-même
+            pour dessiner sur place sans copie
+
+    Returns:
+        numpy.ndarray: Image avec les segments dessinés
+    """
+    if dst is None:
+        dst = image.copy()
+    elif dst is not image:
+        np.copyto(dst, image)
+    lines = np.rint(np.asarray(lines)).astype(np.int32).reshape(-1, 2, 2)
+    if len(lines):
+        cv2.polylines(dst, lines, False, color, thickness)
+    return dst
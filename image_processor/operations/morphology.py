@@ -2,9 +2,27 @@
 Module contenant les opérations morphologiques pour le traitement d'images.
 """
 
+from functools import lru_cache
+
 import cv2
 import numpy as np
 
+# Formes d'éléments structurants disponibles
+SHAPES = ('rect', 'ellipse', 'cross', 'line', 'disk')
+
+_OPENCV_SHAPES = {
+    'rect': cv2.MORPH_RECT,
+    'ellipse': cv2.MORPH_ELLIPSE,
+    'cross': cv2.MORPH_CROSS,
+}
+
+# Taille à partir de laquelle un disque est traité par segments successifs
+_DECOMPOSE_MIN_SIZE = 9
+
+# Rayon minimal de l'octogone : en dessous, la décomposition donne un damier
+# à trous (rayon 2) ou un carré plein (rayon 1) ; le disque est alors tracé
+_OCTAGON_MIN_RADIUS = 3
+
 def get_kernel(shape=cv2.MORPH_RECT, size=(3, 3)):
     """
     Crée un noyau structurant pour les opérations morphologiques.
@@ -18,7 +36,187 @@ def get_kernel(shape=cv2.MORPH_RECT, size=(3, 3)):
     """
     return cv2.getStructuringElement(shape, size)
 
-def apply_erosion(image, kernel_size=3, iterations=1):
+def _line_kernel(length, angle):
+    """Segment de longueur donnée, centré, orienté de angle degrés."""
+    angle = angle % 180
+    if angle == 0:
+        return np.ones((1, length), np.uint8)
+    if angle == 90:
+        return np.ones((length, 1), np.uint8)
+    
+    kernel = np.zeros((length, length), np.uint8)
+    center = length // 2
+    # Le segment couvre length pixels le long de son axe dominant
+    cos, sin = np.cos(np.radians(angle)), np.sin(np.radians(angle))
+    scale = center / max(abs(cos), abs(sin))
+    dx = int(round(scale * cos))
+    dy = int(round(scale * sin))
+    # Axe y vers le bas : un angle positif monte vers la droite
+    cv2.line(kernel, (center - dx, center + dy), (center + dx, center - dy), 1)
+    return kernel
+
+def _disk_segments(radius):
+    """
+    Décompose un disque de rayon donné en segments (somme de Minkowski).
+    
+    Le disque est approché par un octogone : carré de demi-côté p suivi de
+    deux segments diagonaux de demi-longueur q, avec p + 2q = rayon et
+    p + q = rayon / sqrt(2) (même étendue horizontale et diagonale).
+    Les petits rayons sont un disque discret, en un seul noyau.
+    
+    Returns:
+        list: Noyaux à appliquer successivement
+    """
+    if radius < _OCTAGON_MIN_RADIUS:
+        # Pixels à moins de sqrt(r (r + 1/2)) du centre : croix au rayon 1,
+        # carré 5x5 aux coins coupés au rayon 2
+        y, x = np.ogrid[-radius:radius + 1, -radius:radius + 1]
+        return [(x * x + y * y <= radius * (radius + 0.5)).astype(np.uint8)]
+    q = int(round(radius * (1 - 1 / np.sqrt(2))))
+    p = radius - 2 * q
+    segments = []
+    if p > 0:
+        segments.append(structuring_element('rect', 2 * p + 1))
+    if q > 0:
+        segments.append(structuring_element('line', 2 * q + 1, 45))
+        segments.append(structuring_element('line', 2 * q + 1, 135))
+    return segments
+
+@lru_cache(maxsize=128)
+def structuring_element(shape='rect', size=3, angle=0):
+    """
+    Renvoie un élément structurant, mis en cache par (forme, taille, angle).
+    
+    Le tableau renvoyé est partagé entre les appels et en lecture seule.
+    
+    Args:
+        shape (str): 'rect', 'ellipse', 'cross', 'line' ou 'disk'
+        size (int ou tuple): Côté (ou (largeur, hauteur) pour rect, ellipse
+            et cross ; longueur pour line ; diamètre pour disk)
+        angle (float): Orientation en degrés (forme 'line' uniquement)
+        
+    Returns:
+        numpy.ndarray: Élément structurant (uint8)
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"Forme d'élément structurant inconnue: {shape}")
+    
+    if shape in _OPENCV_SHAPES:
+        ksize = tuple(size) if isinstance(size, tuple) else (size, size)
+        kernel = cv2.getStructuringElement(_OPENCV_SHAPES[shape], ksize)
+    elif shape == 'line':
+        kernel = _line_kernel(size, angle)
+    else:
+        # Disque octogonal : somme de Minkowski de ses segments, pour que
+        # le calcul décomposé soit exactement équivalent au noyau complet
+        radius = size // 2
+        kernel = np.zeros((2 * radius + 1, 2 * radius + 1), np.uint8)
+        kernel[radius, radius] = 1
+        for segment in _disk_segments(radius):
+            kernel = cv2.dilate(kernel, segment)
+    
+    kernel.setflags(write=False)
+    return kernel
+
+def _border_value(dtype, op):
+    """Valeur neutre de bord : maximum du type pour l'érosion, minimum pour la dilatation."""
+    info = np.iinfo(dtype) if np.issubdtype(dtype, np.integer) else np.finfo(dtype)
+    return float(info.max if op is cv2.erode else info.min)
+
+def _morph(op, image, kernel_size, shape, angle=0, iterations=1, dst=None):
+    """
+    Applique cv2.erode ou cv2.dilate avec un élément du cache.
+    
+    Les rectangles sont déjà traités par OpenCV en deux passes 1-D ; les grands
+    disques sont appliqués comme une suite de segments, avec un bord neutre
+    suffisant pour que le résultat soit identique au noyau complet.
+    """
+    if shape != 'disk' or kernel_size < _DECOMPOSE_MIN_SIZE:
+        return op(image, structuring_element(shape, kernel_size, angle), dst=dst, iterations=iterations)
+    
+    pad = (kernel_size // 2) * iterations
+    value = _border_value(image.dtype, op)
+    result = cv2.copyMakeBorder(image, pad, pad, pad, pad, cv2.BORDER_CONSTANT, value=(value,) * 4)
+    for _ in range(iterations):
+        for segment in _disk_segments(kernel_size // 2):
+            result = op(result, segment)
+    result = result[pad:pad + image.shape[0], pad:pad + image.shape[1]]
+    if dst is None:
+        return result
+    np.copyto(dst, result)
+    return dst
+
+# Sorties disponibles pour morphology_program
+MORPHOLOGY_OUTPUTS = ('erosion', 'dilation', 'gradient', 'opening', 'closing', 'tophat', 'blackhat')
+
+def _workspace_buffer(workspace, name, like):
+    """Renvoie le tampon nommé du workspace, réalloué si la forme ou le type change."""
+    if workspace is None:
+        return None
+    buffer = workspace.get(name)
+    if buffer is None or buffer.shape != like.shape or buffer.dtype != like.dtype:
+        buffer = np.empty_like(like)
+        workspace[name] = buffer
+    return buffer
+
+def morphology_program(image, outputs, kernel_size=3, shape='rect', angle=0, workspace=None):
+    """
+    Calcule plusieurs opérations morphologiques d'une même image en partageant
+    les étapes communes.
+    
+    L'érosion et la dilatation ne sont calculées qu'une fois, puis réutilisées :
+    gradient = dilatation - érosion, ouverture = dilatation(érosion),
+    fermeture = érosion(dilatation), top-hat = image - ouverture,
+    black-hat = fermeture - image. Seules les étapes nécessaires aux sorties
+    demandées sont calculées.
+    
+    Args:
+        image (numpy.ndarray): Image d'entrée
+        outputs (iterable): Sorties demandées parmi MORPHOLOGY_OUTPUTS
+        kernel_size (int): Taille du noyau
+        shape (str): Forme de l'élément structurant (voir SHAPES)
+        angle (float): Orientation en degrés (forme 'line' uniquement)
+        workspace (dict, optional): Tampons réutilisés d'un appel à l'autre.
+            Les tableaux renvoyés sont alors ces tampons et sont écrasés par
+            l'appel suivant avec le même workspace.
+        
+    Returns:
+        dict: {nom de la sortie: image}
+    """
+    outputs = tuple(outputs)
+    unknown = set(outputs) - set(MORPHOLOGY_OUTPUTS)
+    if unknown:
+        raise ValueError(f"Sorties morphologiques inconnues: {sorted(unknown)}")
+    
+    wanted = set(outputs)
+    need_opening = bool(wanted & {'opening', 'tophat'})
+    need_closing = bool(wanted & {'closing', 'blackhat'})
+    need_erosion = need_opening or bool(wanted & {'erosion', 'gradient'})
+    need_dilation = need_closing or bool(wanted & {'dilation', 'gradient'})
+    
+    buffer = lambda name: _workspace_buffer(workspace, name, image)
+    erode = lambda src, name: _morph(cv2.erode, src, kernel_size, shape, angle, dst=buffer(name))
+    dilate = lambda src, name: _morph(cv2.dilate, src, kernel_size, shape, angle, dst=buffer(name))
+    
+    steps = {}
+    if need_erosion:
+        steps['erosion'] = erode(image, 'erosion')
+    if need_dilation:
+        steps['dilation'] = dilate(image, 'dilation')
+    if need_opening:
+        steps['opening'] = dilate(steps['erosion'], 'opening')
+    if need_closing:
+        steps['closing'] = erode(steps['dilation'], 'closing')
+    if 'gradient' in wanted:
+        steps['gradient'] = cv2.subtract(steps['dilation'], steps['erosion'], dst=buffer('gradient'))
+    if 'tophat' in wanted:
+        steps['tophat'] = cv2.subtract(image, steps['opening'], dst=buffer('tophat'))
+    if 'blackhat' in wanted:
+        steps['blackhat'] = cv2.subtract(steps['closing'], image, dst=buffer('blackhat'))
+    
+    return {name: steps[name] for name in outputs}
+
+def apply_erosion(image, kernel_size=3, iterations=1, shape='rect', angle=0):
     """
     Applique une opération d'érosion à l'image binaire.
     
@@ -26,14 +224,15 @@ def apply_erosion(image, kernel_size=3, iterations=1):
         image (numpy.ndarray): Image binaire d'entrée
         kernel_size (int): Taille du noyau d'érosion
         iterations (int): Nombre d'itérations
+        shape (str): Forme de l'élément structurant (voir SHAPES)
+        angle (float): Orientation en degrés (forme 'line' uniquement)
         
     Returns:
         numpy.ndarray: Image érodée
     """
-    kernel = np.ones((kernel_size, kernel_size), np.uint8)
-    return cv2.erode(image, kernel, iterations=iterations)
+    return _morph(cv2.erode, image, kernel_size, shape, angle, iterations)
 
-def apply_dilation(image, kernel_size=3, iterations=1):
+def apply_dilation(image, kernel_size=3, iterations=1, shape='rect', angle=0):
     """
     Applique une opération de dilatation à l'image binaire.
     
@@ -41,82 +240,472 @@ def apply_dilation(image, kernel_size=3, iterations=1):
         image (numpy.ndarray): Image binaire d'entrée
         kernel_size (int): Taille du noyau de dilatation
         iterations (int): Nombre d'itérations
+        shape (str): Forme de l'élément structurant (voir SHAPES)
+        angle (float): Orientation en degrés (forme 'line' uniquement)
         
     Returns:
         numpy.ndarray: Image dilatée
     """
-    kernel = np.ones((kernel_size, kernel_size), np.uint8)
-    return cv2.dilate(image, kernel, iterations=iterations)
+    return _morph(cv2.dilate, image, kernel_size, shape, angle, iterations)
 
-def apply_opening(image, kernel_size=3):
+def apply_opening(image, kernel_size=3, shape='rect', angle=0):
     """
     Applique une opération d'ouverture (érosion suivie de dilatation).
     
     Args:
         image (numpy.ndarray): Image binaire d'entrée
         kernel_size (int): Taille du noyau
+        shape (str): Forme de l'élément structurant (voir SHAPES)
+        angle (float): Orientation en degrés (forme 'line' uniquement)
         
     Returns:
         numpy.ndarray: Image après ouverture
     """
-    kernel = np.ones((kernel_size, kernel_size), np.uint8)
-    return cv2.morphologyEx(image, cv2.MORPH_OPEN, kernel)
+    return morphology_program(image, ('opening',), kernel_size, shape, angle)['opening']
 
-def apply_closing(image, kernel_size=3):
+def apply_closing(image, kernel_size=3, shape='rect', angle=0):
     """
     Applique une opération de fermeture (dilatation suivie d'érosion).
     
     Args:
         image (numpy.ndarray): Image binaire d'entrée
         kernel_size (int): Taille du noyau
+        shape (str): Forme de l'élément structurant (voir SHAPES)
+        angle (float): Orientation en degrés (forme 'line' uniquement)
         
     Returns:
         numpy.ndarray: Image après fermeture
     """
-    kernel = np.ones((kernel_size, kernel_size), np.uint8)
-    return cv2.morphologyEx(image, cv2.MORPH_CLOSE, kernel)
+    return morphology_program(image, ('closing',), kernel_size, shape, angle)['closing']
 
-def apply_gradient(image, kernel_size=3):
+def apply_gradient(image, kernel_size=3, shape='rect', angle=0):
     """
     Applique un gradient morphologique (différence entre dilatation et érosion).
     
     Args:
         image (numpy.ndarray): Image binaire d'entrée
         kernel_size (int): Taille du noyau
+        shape (str): Forme de l'élément structurant (voir SHAPES)
+        angle (float): Orientation en degrés (forme 'line' uniquement)
         
     Returns:
         numpy.ndarray: Gradient morphologique
     """
-    kernel = np.ones((kernel_size, kernel_size), np.uint8)
-    return cv2.morphologyEx(image, cv2.MORPH_GRADIENT, kernel)
+    return morphology_program(image, ('gradient',), kernel_size, shape, angle)['gradient']
 
-def apply_tophat(image, kernel_size=3):
+def apply_tophat(image, kernel_size=3, shape='rect', angle=0):
     """
     Applique un Top-Hat (différence entre l'image et son ouverture).
     
     Args:
         image (numpy.ndarray): Image binaire d'entrée
         kernel_size (int): Taille du noyau
+        shape (str): Forme de l'élément structurant (voir SHAPES)
+        angle (float): Orientation en degrés (forme 'line' uniquement)
         
     Returns:
         numpy.ndarray: Résultat du Top-Hat
     """
-    kernel = np.ones((kernel_size, kernel_size), np.uint8)
-    return cv2.morphologyEx(image, cv2.MORPH_TOPHAT, kernel)
+    return morphology_program(image, ('tophat',), kernel_size, shape, angle)['tophat']
 
-def apply_blackhat(image, kernel_size=3):
+def apply_blackhat(image, kernel_size=3, shape='rect', angle=0):
     """
     Applique un Black-Hat (différence entre la fermeture et l'image).
     
     Args:
         image (numpy.ndarray): Image binaire d'entrée
         kernel_size (int): Taille du noyau
+        shape (str): Forme de l'élément structurant (voir SHAPES)
+        angle (float): Orientation en degrés (forme 'line' uniquement)
         
     Returns:
         numpy.ndarray: Résultat du Black-Hat
     """
-    kernel = np.ones((kernel_size, kernel_size), np.uint8)
-    return cv2.morphologyEx(image, cv2.MORPH_BLACKHAT, kernel)
+    return morphology_program(image, ('blackhat',), kernel_size, shape, angle)['blackhat']
+
+# Familles d'éléments structurants de la granulométrie : B_n = B_(n-1) + C_n
+# (somme de Minkowski), avec C_n un carré 3x3 ou une croix 3x3
+GRANULOMETRY_SHAPES = ('rect', 'diamond', 'octagon')
+
+def _family_counts(shape, size):
+    """Nombre de carrés 3x3 et de croix 3x3 composant l'élément de taille size."""
+    if shape == 'rect':
+        return size, 0
+    if shape == 'diamond':
+        return 0, size
+    if shape == 'octagon':
+        # Alternance carré / croix : octogone de rayon size
+        return (size + 1) // 2, size // 2
+    raise ValueError(f"Forme de granulométrie inconnue: {shape}")
+
+def _apply_family(op, image, squares, crosses):
+    """
+    Applique op avec l'élément carré(2 squares + 1) + losange(crosses).
+    
+    Le losange de rayon 2k + 1 est la somme des deux diagonales de longueur
+    2k + 1 et d'une croix ; un rayon pair ajoute une croix.
+    """
+    result = image
+    if squares:
+        result = op(result, structuring_element('rect', 2 * squares + 1))
+    if crosses:
+        half, extra = divmod(crosses - 1, 2)
+        if half:
+            result = op(result, structuring_element('line', 2 * half + 1, 45))
+            result = op(result, structuring_element('line', 2 * half + 1, 135))
+        cross = structuring_element('cross', 3)
+        for _ in range(1 + extra):
+            result = op(result, cross)
+    return result
+
+def _morphology_series(image, max_size, shape, closing):
+    """Ouvertures (ou fermetures) successives de taille 1 à max_size."""
+    first, second = (cv2.dilate, cv2.erode) if closing else (cv2.erode, cv2.dilate)
+    first_border = _border_value(image.dtype, first)
+    second_border = _border_value(image.dtype, second)
+    h, w = image.shape[:2]
+    
+    # Bord neutre de la largeur du plus grand élément : chaque taille est
+    # identique à cv2.morphologyEx avec l'élément complet
+    pad = max_size
+    current = cv2.copyMakeBorder(image, pad, pad, pad, pad, cv2.BORDER_CONSTANT,
+                                 value=(first_border,) * 4)
+    work = np.empty_like(current)
+    inner = (slice(pad, pad + h), slice(pad, pad + w))
+    
+    squares, crosses = 0, 0
+    for size in range(1, max_size + 1):
+        next_squares, next_crosses = _family_counts(shape, size)
+        # Érosion (dilatation) incrémentale : un seul petit élément par taille
+        current = _apply_family(first, current, next_squares - squares, next_crosses - crosses)
+        squares, crosses = next_squares, next_crosses
+        
+        work.fill(second_border)
+        work[inner] = current[inner]
+        yield size, _apply_family(second, work, squares, crosses)[inner]
+
+def opening_series(image, max_size=10, shape='octagon'):
+    """
+    Calcule les ouvertures de taille 1 à max_size de façon incrémentale.
+    
+    L'élément de taille n est B_n = B_(n-1) + C_n : l'érosion de taille n est
+    obtenue par une seule petite érosion de l'érosion précédente.
+    
+    Args:
+        image (numpy.ndarray): Image d'entrée
+        max_size (int): Taille (rayon) maximale
+        shape (str): 'rect' (carrés), 'diamond' (losanges) ou 'octagon'
+        
+    Yields:
+        tuple: (taille, image ouverte)
+    """
+    return _morphology_series(image, max_size, shape, closing=False)
+
+def closing_series(image, max_size=10, shape='octagon'):
+    """
+    Calcule les fermetures de taille 1 à max_size de façon incrémentale.
+    
+    Args:
+        image (numpy.ndarray): Image d'entrée
+        max_size (int): Taille (rayon) maximale
+        shape (str): 'rect' (carrés), 'diamond' (losanges) ou 'octagon'
+        
+    Yields:
+        tuple: (taille, image fermée)
+    """
+    return _morphology_series(image, max_size, shape, closing=True)
+
+def _series_volumes(image, max_size, shape, closing, interior=None):
+    """Volumes (sommes des niveaux de gris) de l'image puis de chaque taille."""
+    crop = (lambda a: a) if interior is None else (lambda a: a[interior])
+    volumes = [float(np.sum(crop(image), dtype=np.float64))]
+    for _, result in _morphology_series(image, max_size, shape, closing):
+        volumes.append(float(np.sum(crop(result), dtype=np.float64)))
+    return np.array(volumes)
+
+def granulometry(image, max_size=10, shape='octagon', closings=False, tile_size=None):
+    """
+    Calcule une granulométrie (spectre de forme et distribution de tailles).
+    
+    Args:
+        image (numpy.ndarray): Image d'entrée (binaire ou niveaux de gris)
+        max_size (int): Taille (rayon) maximale
+        shape (str): 'rect', 'diamond' ou 'octagon'
+        closings (bool): Si True, anti-granulométrie par fermetures
+            (tailles des structures sombres)
+        tile_size (int, optional): Côté des tuiles pour les grandes images ;
+            chaque tuile est traitée avec une marge de 2 * max_size pixels
+        
+    Returns:
+        dict: 'sizes' (1..max_size), 'volumes' (volume de l'image puis de
+            chaque taille), 'pattern_spectrum' (volume retiré ou ajouté par
+            chaque taille) et 'size_distribution' (fraction cumulée)
+    """
+    if tile_size is None:
+        volumes = _series_volumes(image, max_size, shape, closings)
+    else:
+        h, w = image.shape[:2]
+        halo = 2 * max_size
+        volumes = np.zeros(max_size + 1)
+        for y in range(0, h, tile_size):
+            for x in range(0, w, tile_size):
+                y0, x0 = max(y - halo, 0), max(x - halo, 0)
+                y1, x1 = min(y + tile_size + halo, h), min(x + tile_size + halo, w)
+                interior = (slice(y - y0, min(y + tile_size, h) - y0),
+                            slice(x - x0, min(x + tile_size, w) - x0))
+                volumes += _series_volumes(image[y0:y1, x0:x1], max_size, shape, closings, interior)
+    
+    spectrum = np.abs(np.diff(volumes))
+    if closings:
+        total = volumes[-1] - volumes[0]
+        distribution = (volumes[1:] - volumes[0]) / total if total > 0 else np.zeros(max_size)
+    else:
+        distribution = (volumes[0] - volumes[1:]) / volumes[0] if volumes[0] > 0 else np.zeros(max_size)
+    
+    return {
+        'sizes': np.arange(1, max_size + 1),
+        'volumes': volumes,
+        'pattern_spectrum': spectrum,
+        'size_distribution': distribution,
+    }
+
+def _sweep_rows(marker, mask, reverse, connectivity):
+    """
+    Propagation d'une ligne à la suivante (phase raster), vectorisée par ligne.
+    
+    Chaque ligne reçoit le maximum de ses voisines de la ligne précédente
+    (déjà mise à jour), borné par le masque.
+    """
+    rows = range(marker.shape[0] - 2, -1, -1) if reverse else range(1, marker.shape[0])
+    step = 1 if reverse else -1
+    neighbours = np.empty_like(marker[0])
+    for i in rows:
+        prev = marker[i + step]
+        np.copyto(neighbours, prev)
+        if connectivity == 8:
+            np.maximum(neighbours[1:], prev[:-1], out=neighbours[1:])
+            np.maximum(neighbours[:-1], prev[1:], out=neighbours[:-1])
+        np.minimum(neighbours, mask[i], out=neighbours)
+        np.maximum(marker[i], neighbours, out=marker[i])
+
+def _neighbour_max(image, connectivity):
+    """Maximum sur le voisinage (4 ou 8) de chaque pixel, sans le pixel lui-même."""
+    shape = 'cross' if connectivity == 4 else 'rect'
+    kernel = np.array(structuring_element(shape, 3))
+    kernel[1, 1] = 0
+    if image.dtype in (np.uint8, np.uint16, np.int16, np.float32, np.float64):
+        return cv2.dilate(image, kernel, borderType=cv2.BORDER_CONSTANT,
+                          borderValue=_border_value(image.dtype, cv2.dilate))
+    
+    padded = np.pad(image, 1, mode='constant', constant_values=np.iinfo(image.dtype).min)
+    h, w = image.shape
+    result = np.full_like(image, np.iinfo(image.dtype).min)
+    for dy, dx in zip(*np.nonzero(kernel)):
+        np.maximum(result, padded[dy:dy + h, dx:dx + w], out=result)
+    return result
+
+def _reconstruct(marker, mask, connectivity):
+    """
+    Reconstruction par dilatation (algorithme hybride de Vincent).
+    
+    Phase raster : balayages descendant, montant puis par colonnes, chacun
+    vectorisé le long des lignes. Phase file : les pixels encore modifiables
+    sont propagés par fronts successifs, chaque front étant traité d'un bloc
+    sur des indices à plat.
+    """
+    marker = np.minimum(marker, mask)
+    
+    _sweep_rows(marker, mask, False, connectivity)
+    _sweep_rows(marker, mask, True, connectivity)
+    marker_t = np.ascontiguousarray(marker.T)
+    mask_t = np.ascontiguousarray(mask.T)
+    _sweep_rows(marker_t, mask_t, False, connectivity)
+    _sweep_rows(marker_t, mask_t, True, connectivity)
+    marker = np.ascontiguousarray(marker_t.T)
+    
+    # Pixels pouvant encore progresser depuis un voisin
+    candidate = np.minimum(_neighbour_max(marker, connectivity), mask)
+    changed = candidate > marker
+    if not changed.any():
+        return marker
+    np.copyto(marker, candidate, where=changed)
+    
+    # File de fronts sur des tableaux bordés (le bord ne propage rien)
+    h, w = marker.shape
+    low = np.iinfo(marker.dtype).min if np.issubdtype(marker.dtype, np.integer) else -np.inf
+    flat_marker = np.pad(marker, 1, mode='constant', constant_values=low).ravel()
+    flat_mask = np.pad(mask, 1, mode='constant', constant_values=low).ravel()
+    stride = w + 2
+    offsets = [-1, 1, -stride, stride]
+    if connectivity == 8:
+        offsets += [-stride - 1, -stride + 1, stride - 1, stride + 1]
+    
+    ys, xs = np.nonzero(changed)
+    front = (ys + 1) * stride + xs + 1
+    # Dédoublonnage linéaire des fronts : chaque pixel garde sa dernière position
+    stamp = np.empty(flat_marker.size, np.intp)
+    while front.size:
+        values = flat_marker[front]
+        updated = []
+        for offset in offsets:
+            target = front + offset
+            proposal = np.minimum(values, flat_mask[target])
+            better = proposal > flat_marker[target]
+            if better.any():
+                np.maximum.at(flat_marker, target[better], proposal[better])
+                updated.append(target[better])
+        if not updated:
+            break
+        front = np.concatenate(updated)
+        positions = np.arange(front.size)
+        stamp[front] = positions
+        front = front[stamp[front] == positions]
+    
+    return flat_marker.reshape(h + 2, w + 2)[1:-1, 1:-1].copy()
+
+def _complement(image):
+    """Complément d'une image (inverse l'ordre des niveaux)."""
+    if np.issubdtype(image.dtype, np.unsignedinteger):
+        return np.iinfo(image.dtype).max - image
+    return -image
+
+def reconstruction_by_dilation(marker, mask, connectivity=8):
+    """
+    Reconstruction morphologique par dilatation du marqueur sous le masque.
+    
+    Équivaut à itérer min(dilatation(marqueur), masque) jusqu'à stabilité,
+    en temps quasi linéaire.
+    
+    Args:
+        marker (numpy.ndarray): Image marqueur (ramenée sous le masque)
+        mask (numpy.ndarray): Image masque, de même forme et même type
+        connectivity (int): Connexité (4 ou 8)
+        
+    Returns:
+        numpy.ndarray: Image reconstruite
+    """
+    return _reconstruct(marker.astype(mask.dtype), mask, connectivity)
+
+def reconstruction_by_erosion(marker, mask, connectivity=8):
+    """
+    Reconstruction morphologique par érosion du marqueur au-dessus du masque.
+    
+    Args:
+        marker (numpy.ndarray): Image marqueur (ramenée au-dessus du masque)
+        mask (numpy.ndarray): Image masque, de même forme et même type
+        connectivity (int): Connexité (4 ou 8)
+        
+    Returns:
+        numpy.ndarray: Image reconstruite
+    """
+    result = _reconstruct(_complement(marker.astype(mask.dtype)), _complement(mask), connectivity)
+    return _complement(result)
+
+def fill_holes(image, connectivity=8):
+    """
+    Remplit les trous (minima non reliés au bord) d'une image binaire ou en
+    niveaux de gris.
+    
+    Args:
+        image (numpy.ndarray): Image d'entrée (2D)
+        connectivity (int): Connexité (4 ou 8) du fond
+        
+    Returns:
+        numpy.ndarray: Image aux trous bouchés
+    """
+    high = np.iinfo(image.dtype).max if np.issubdtype(image.dtype, np.integer) else image.max()
+    marker = np.full_like(image, high)
+    marker[0, :], marker[-1, :] = image[0, :], image[-1, :]
+    marker[:, 0], marker[:, -1] = image[:, 0], image[:, -1]
+    return reconstruction_by_erosion(marker, image, connectivity)
+
+def clear_border(image, connectivity=8):
+    """
+    Supprime les objets touchant le bord de l'image.
+    
+    Args:
+        image (numpy.ndarray): Image binaire ou en niveaux de gris (2D)
+        connectivity (int): Connexité (4 ou 8)
+        
+    Returns:
+        numpy.ndarray: Image sans les objets reliés au bord
+    """
+    marker = np.zeros_like(image)
+    marker[0, :], marker[-1, :] = image[0, :], image[-1, :]
+    marker[:, 0], marker[:, -1] = image[:, 0], image[:, -1]
+    return image - reconstruction_by_dilation(marker, image, connectivity)
+
+def _signed(image):
+    """Copie dans un type signé assez large pour soustraire sans saturation."""
+    if image.dtype in (np.uint8, np.int8):
+        return image.astype(np.int16)
+    if np.issubdtype(image.dtype, np.integer):
+        return image.astype(np.int64)
+    return image.astype(np.float64)
+
+def h_maxima(image, h, connectivity=8):
+    """
+    Extrait les maxima régionaux de dynamique supérieure ou égale à h.
+    
+    Args:
+        image (numpy.ndarray): Image en niveaux de gris (2D)
+        h (float): Hauteur minimale des maxima
+        connectivity (int): Connexité (4 ou 8)
+        
+    Returns:
+        numpy.ndarray: Masque binaire (0/255, uint8) des maxima
+    """
+    work = _signed(image)
+    reconstructed = _reconstruct(work - h, work, connectivity)
+    return regional_maxima(reconstructed, connectivity)
+
+def h_minima(image, h, connectivity=8):
+    """
+    Extrait les minima régionaux de profondeur supérieure ou égale à h.
+    
+    Args:
+        image (numpy.ndarray): Image en niveaux de gris (2D)
+        h (float): Profondeur minimale des minima
+        connectivity (int): Connexité (4 ou 8)
+        
+    Returns:
+        numpy.ndarray: Masque binaire (0/255, uint8) des minima
+    """
+    return h_maxima(-_signed(image), h, connectivity)
+
+def regional_maxima(image, connectivity=8):
+    """
+    Détecte les maxima régionaux (plateaux sans voisin plus élevé).
+    
+    Args:
+        image (numpy.ndarray): Image en niveaux de gris (2D)
+        connectivity (int): Connexité (4 ou 8)
+        
+    Returns:
+        numpy.ndarray: Masque binaire (0/255, uint8) des maxima
+    """
+    work = _signed(image)
+    if np.issubdtype(work.dtype, np.integer):
+        delta = 1
+    else:
+        levels = np.unique(work)
+        delta = np.diff(levels).min() if levels.size > 1 else 1.0
+    # Un pixel est un maximum régional s'il n'est pas atteint depuis plus bas
+    reconstructed = _reconstruct(work - delta, work, connectivity)
+    return ((work - reconstructed) > 0).astype(np.uint8) * 255
+
+def regional_minima(image, connectivity=8):
+    """
+    Détecte les minima régionaux (plateaux sans voisin plus bas).
+    
+    Args:
+        image (numpy.ndarray): Image en niveaux de gris (2D)
+        connectivity (int): Connexité (4 ou 8)
+        
+    Returns:
+        numpy.ndarray: Masque binaire (0/255, uint8) des minima
+    """
+    return regional_maxima(-_signed(image), connectivity)
 
 def skeletonize(image):
     """
@@ -175,8 +764,9 @@ def distance_transform(image):
     
     _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
     
-    # Calculer la transformée de distance
-    dist = cv2.distanceTransform(binary, cv2.DIST_L2, 5)
+    # Calculer la transformée de distance (exacte ; voir distance.distance_transform_edt
+    # pour les distances brutes, un pas anisotrope ou la carte des plus proches voisins)
+    dist = cv2.distanceTransform(binary, cv2.DIST_L2, cv2.DIST_MASK_PRECISE)
     
     # Normalisation pour l'affichage
     return cv2.normalize(dist, None, 0, 1.0, cv2.NORM_MINMAX)
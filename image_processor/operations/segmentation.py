@@ -4,7 +4,10 @@ Module contenant les opérations de segmentation d'images.
 
 import cv2
 import numpy as np
-from sklearn.cluster import KMeans
+
+from .distance import distance_transform_edt
+from .morphology import h_maxima, morphology_program, structuring_element
+from .regions import label_regions, region_properties
 
 def threshold_otsu(image):
     """
@@ -24,27 +27,137 @@ def threshold_otsu(image):
     _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
     return binary, _
 
-def adaptive_threshold(image, block_size=11, c=2):
+ADAPTIVE_METHODS = ('gaussian', 'mean', 'bradley', 'niblack', 'sauvola')
+
+# Valeur de k par défaut de chaque méthode
+_ADAPTIVE_K = {'bradley': 0.15, 'niblack': -0.2, 'sauvola': 0.5}
+
+def _local_statistics(strip, radius, rows, with_std):
+    """
+    Moyenne (et écart-type) sur des fenêtres carrées par image intégrale.
+
+    Les fenêtres sont tronquées aux bords de la bande, ce qui rend le coût
+    indépendant de la taille de bloc.
+
+    Args:
+        strip (numpy.ndarray): Bande de l'image, marges comprises
+        radius (int): Demi-côté de la fenêtre
+        rows (slice): Lignes de la bande pour lesquelles calculer les statistiques
+        with_std (bool): Calculer aussi l'écart-type
+
+    Returns:
+        tuple: (moyenne, écart-type ou None), en float32
+    """
+    h, w = strip.shape
+    if with_std:
+        total, squares = cv2.integral2(strip, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+    else:
+        total, squares = cv2.integral(strip, sdepth=cv2.CV_64F), None
+
+    # Table bordée par répétition : les coins des fenêtres tronquées
+    # deviennent de simples tranches
+    n = rows.stop - rows.start
+    top, bottom = max(radius - rows.start, 0), max(rows.stop + radius + 1 - (h + 1), 0)
+    span = slice(rows.start - radius + top, rows.stop + radius + 1)
+    corners = (slice(0, n), slice(2 * radius + 1, 2 * radius + 1 + n))
+
+    def box(table):
+        padded = np.pad(table[span], ((top, bottom), (radius, radius)), mode='edge')
+        upper, lower = padded[corners[0]], padded[corners[1]]
+        columns = lower - upper
+        return columns[:, 2 * radius + 1:2 * radius + 1 + w] - columns[:, :w]
+
+    ys = np.arange(rows.start, rows.stop)
+    xs = np.arange(w)
+    height = np.minimum(ys + radius + 1, h) - np.maximum(ys - radius, 0)
+    width = np.minimum(xs + radius + 1, w) - np.maximum(xs - radius, 0)
+    inv_area = 1.0 / (height[:, np.newaxis] * width).astype(np.float64)
+
+    mean = box(total) * inv_area
+    if not with_std:
+        return mean.astype(np.float32), None
+    variance = box(squares) * inv_area
+    variance -= mean * mean
+    np.maximum(variance, 0.0, out=variance)
+    return mean.astype(np.float32), np.sqrt(variance, dtype=np.float32)
+
+def _threshold_strip(gray, method, block_size, c, k, r, rows):
+    """Seuil local des lignes rows d'une bande (marges comprises)."""
+    if method == 'gaussian':
+        # Même construction que cv2.adaptiveThreshold (ADAPTIVE_THRESH_GAUSSIAN_C) :
+        # flou flottant arrondi au type entier
+        blurred = cv2.GaussianBlur(gray.astype(np.float32), (block_size, block_size), 0,
+                                   borderType=cv2.BORDER_REPLICATE | cv2.BORDER_ISOLATED)[rows]
+        if np.issubdtype(gray.dtype, np.integer):
+            blurred = np.rint(blurred)
+        return blurred - c
+
+    mean, std = _local_statistics(gray, block_size // 2, rows, method in ('niblack', 'sauvola'))
+    if method == 'mean':
+        return mean - c
+    if method == 'bradley':
+        return mean * (1.0 - k)
+    if method == 'niblack':
+        return mean + k * std
+    return mean * (1.0 + k * (std / r - 1.0))
+
+def adaptive_threshold(image, block_size=11, c=2, method='gaussian', k=None, r=None, tile_rows=None):
     """
     Applique un seuillage adaptatif à l'image.
     
+    Hors 'gaussian', les statistiques locales viennent d'images intégrales :
+    le coût par pixel ne dépend pas de block_size. Les très grandes images
+    peuvent être traitées par bandes de tile_rows lignes (avec une marge de
+    block_size // 2 lignes), pour limiter la mémoire des images intégrales.
+    
     Args:
-        image (numpy.ndarray): Image en niveaux de gris
+        image (numpy.ndarray): Image en niveaux de gris (8 ou 16 bits)
         block_size (int): Taille du voisinage pour le calcul du seuil (doit être impair)
-        c (int): Constante soustraite de la moyenne
+        c (int): Constante soustraite du seuil ('gaussian' et 'mean')
+        method (str): 'gaussian' (moyenne pondérée, comme cv2), 'mean',
+            'bradley' (seuil m (1 - k)), 'niblack' (m + k s) ou 'sauvola'
+            (m (1 + k (s / r - 1)))
+        k (float, optional): Paramètre de la méthode (0.15 pour 'bradley',
+            -0.2 pour 'niblack', 0.5 pour 'sauvola' par défaut)
+        r (float, optional): Dynamique de l'écart-type pour 'sauvola'
+            (moitié de la valeur maximale du type par défaut)
+        tile_rows (int, optional): Hauteur des bandes de traitement
         
     Returns:
-        numpy.ndarray: Image binaire
+        numpy.ndarray: Image binaire (255 où le pixel dépasse le seuil local)
     """
     if len(image.shape) == 3:
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
     else:
-        gray = image.copy()
-    
-    return cv2.adaptiveThreshold(
-        gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-        cv2.THRESH_BINARY, block_size, c
-    )
+        gray = image
+    if method not in ADAPTIVE_METHODS:
+        raise ValueError(f"Méthode de seuillage adaptatif inconnue: {method}")
+    if block_size < 3 or block_size % 2 == 0:
+        raise ValueError(f"La taille de bloc doit être impaire et >= 3: {block_size}")
+    
+    if method == 'gaussian' and gray.dtype == np.uint8 and tile_rows is None:
+        return cv2.adaptiveThreshold(
+            gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+            cv2.THRESH_BINARY, block_size, c
+        )
+    
+    if k is None:
+        k = _ADAPTIVE_K.get(method, 0.0)
+    if r is None:
+        r = (np.iinfo(gray.dtype).max + 1) / 2.0 if np.issubdtype(gray.dtype, np.integer) else 0.5
+    
+    h = gray.shape[0]
+    radius = block_size // 2
+    tile_rows = h if tile_rows is None else max(int(tile_rows), 1)
+    binary = np.empty(gray.shape, np.uint8)
+    for y in range(0, h, tile_rows):
+        y0, y1 = max(y - radius, 0), min(y + tile_rows + radius, h)
+        ty = min(y + tile_rows, h)
+        rows = slice(y - y0, ty - y0)
+        threshold = _threshold_strip(gray[y0:y1], method, block_size, c, k, r, rows)
+        np.greater(gray[y:ty], threshold, out=binary[y:ty].view(bool))
+        binary[y:ty] *= 255
+    return binary
 
 def kmeans_segmentation(image, k=3, attempts=10):
     """
@@ -98,12 +211,12 @@ def watershed_segmentation(image):
     # Seuillage d'Otsu
     _, thresh = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
     
-    # Suppression du bruit
-    kernel = np.ones((3, 3), np.uint8)
-    opening = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel, iterations=2)
+    # Suppression du bruit : ouverture 3x3 itérée deux fois, soit une
+    # ouverture 5x5 (OpenCV fusionne de même les itérations d'un rectangle)
+    opening = morphology_program(thresh, ('opening',), 5)['opening']
     
-    # Zone de fond sûre
-    sure_bg = cv2.dilate(opening, kernel, iterations=3)
+    # Zone de fond sûre : dilatation 3x3 itérée trois fois, soit 7x7
+    sure_bg = cv2.dilate(opening, structuring_element('rect', 7))
     
     # Trouver la zone de premier plan sûr
     dist_transform = cv2.distanceTransform(opening, cv2.DIST_L2, 5)
@@ -125,40 +238,581 @@ def watershed_segmentation(image):
     # Appliquer la transformation de la ligne de partage des eaux
     markers = cv2.watershed(image, markers)
     
-    # Colorer les régions
-    image[markers == -1] = [255, 0, 0]  # Bordures en bleu
+    # Colorer les régions sur une copie (l'image d'entrée n'est pas modifiée)
+    result = image.copy()
+    result[markers == -1] = [255, 0, 0]  # Bordures en bleu
     
+    return result
+
+def _to_bgr(image):
+    """Image 8 bits 3 canaux attendue par cv2.watershed (sans copie si déjà conforme)."""
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
     return image
 
-def grabcut_segmentation(image, rect=None):
+def _default_foreground(bgr):
+    """Premier plan par seuillage d'Otsu inversé (objets sombres), comme watershed_segmentation."""
+    gray = cv2.GaussianBlur(cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY), (5, 5), 0)
+    _, foreground = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    return foreground
+
+def _watershed_window(bgr, markers, foreground, h):
     """
-    Effectue une segmentation par GrabCut.
+    Ligne de partage des eaux sur une fenêtre.
+    
+    Sans marqueurs, ceux-ci sont les h-maxima de la distance au fond ; le fond
+    sûr (hors du premier plan dilaté) reçoit un marqueur ramené à 0 ensuite.
+    
+    Returns:
+        numpy.ndarray: Étiquettes int32 (-1 : lignes de partage, 0 : fond)
+    """
+    if markers is not None:
+        labels = markers.astype(np.int32)
+        cv2.watershed(bgr, labels)
+        return labels
+    
+    if foreground is None:
+        foreground = _default_foreground(bgr)
+    foreground = (foreground > 0).astype(np.uint8)
+    
+    peaks = h_maxima(distance_transform_edt(foreground), h)
+    count, labels = cv2.connectedComponents(peaks, connectivity=8, ltype=cv2.CV_32S)
+    background = cv2.dilate(foreground, structuring_element('rect', 3)) == 0
+    labels[background] = count
+    
+    cv2.watershed(bgr, labels)
+    labels[labels == count] = 0
+    return labels
+
+def _find_root(parent, label):
+    """Racine d'une étiquette dans l'union-find (avec compression de chemin)."""
+    root = label
+    while parent[root] != root:
+        root = parent[root]
+    while parent[label] != root:
+        parent[label], label = root, parent[label]
+    return root
+
+def watershed_labels(image, markers=None, foreground=None, h=2.0, tile_size=None, halo=64):
+    """
+    Segmentation par ligne de partage des eaux contrôlée par marqueurs.
+    
+    Ni l'image ni les marqueurs fournis ne sont modifiés. Sans marqueurs,
+    ceux-ci sont les h-maxima de la distance euclidienne au fond, ce qui
+    sépare les objets accolés sans seuil relatif au maximum global.
+    
+    Par tuiles, chaque tuile est traitée avec une marge de halo pixels. Avec
+    des marqueurs calculés, les régions coupées par une couture sont réunies
+    (union-find) quand les deux tuiles voisines s'accordent sur la continuité
+    de part et d'autre de la couture ; des marqueurs fournis portent déjà des
+    identifiants globaux. La marge doit couvrir la taille des objets.
     
     Args:
-        image (numpy.ndarray): Image d'entrée (BGR)
-        rect (tuple): Région d'intérêt (x, y, largeur, hauteur)
+        image (numpy.ndarray): Image d'entrée (BGR ou niveaux de gris, 8 bits)
+        markers (numpy.ndarray, optional): Marqueurs int32 (0 : inconnu)
+        foreground (numpy.ndarray, optional): Masque du premier plan utilisé
+            pour calculer les marqueurs (Otsu inversé par défaut)
+        h (float): Hauteur minimale (en pixels de distance) d'un h-maximum
+        tile_size (int, optional): Côté des tuiles pour les grandes images
+        halo (int): Marge des tuiles en pixels ; au moins 1 avec des
+            marqueurs calculés, pour que chaque tuile voie l'autre côté
+            de ses coutures
         
     Returns:
-        numpy.ndarray: Masque binaire du premier plan
+        tuple: (étiquettes int32 où -1 marque les lignes de partage et 0 le
+            fond, table des propriétés des régions (voir regions.region_properties))
     """
-    if rect is None:
-        rect = (50, 50, image.shape[1]-100, image.shape[0]-100)
-    
-    # Créer les masques nécessaires
-    mask = np.zeros(image.shape[:2], np.uint8)
+    bgr = _to_bgr(image)
+    if tile_size is None:
+        labels = _watershed_window(bgr, markers, foreground, h)
+        return labels, region_properties(labels)
+    if tile_size < 1:
+        raise ValueError(f"Taille de tuile invalide: {tile_size}")
+    if halo < (1 if markers is None else 0):
+        raise ValueError(f"Marge des tuiles invalide: {halo}")
+    
+    height, width = bgr.shape[:2]
+    labels = np.empty((height, width), np.int32)
+    # Bandes de part et d'autre de chaque couture, vues par chaque tuile
+    seams = {}
+    offset = 0
+    
+    for y in range(0, height, tile_size):
+        for x in range(0, width, tile_size):
+            y0, x0 = max(y - halo, 0), max(x - halo, 0)
+            y1, x1 = min(y + tile_size + halo, height), min(x + tile_size + halo, width)
+            ty, tx = min(y + tile_size, height), min(x + tile_size, width)
+            window = (slice(y0, y1), slice(x0, x1))
+            
+            tile = _watershed_window(
+                bgr[window],
+                None if markers is None else markers[window],
+                None if foreground is None else foreground[window],
+                h,
+            )
+            if markers is None:
+                # Étiquettes uniques d'une tuile à l'autre
+                tile[tile > 0] += offset
+                offset = max(offset, int(tile.max()))
+            
+            rows, cols = slice(y - y0, ty - y0), slice(x - x0, tx - x0)
+            labels[y:ty, x:tx] = tile[rows, cols]
+            if markers is not None:
+                continue
+            
+            # Colonnes (lignes) de part et d'autre de chaque couture, vues par la tuile
+            if x > 0:
+                seams[('v', x, y, 'after')] = tile[rows, x - 1 - x0], tile[rows, x - x0]
+            if tx < width:
+                seams[('v', tx, y, 'before')] = tile[rows, tx - 1 - x0], tile[rows, tx - x0]
+            if y > 0:
+                seams[('h', y, x, 'after')] = tile[y - 1 - y0, cols], tile[y - y0, cols]
+            if ty < height:
+                seams[('h', ty, x, 'before')] = tile[ty - 1 - y0, cols], tile[ty - y0, cols]
+    
+    if markers is not None:
+        return labels, region_properties(labels)
+    
+    # Réconciliation des coutures
+    parent = np.arange(max(int(labels.max()), 0) + 1)
+    for key, (inner_before, halo_before) in seams.items():
+        if key[3] != 'before':
+            continue
+        halo_after, inner_after = seams[key[:3] + ('after',)]
+        # Chaque tuile voit les deux côtés de la couture : on réunit les
+        # étiquettes quand les deux tuiles y voient une même région continue
+        agree = ((inner_before == halo_before) & (halo_after == inner_after)
+                 & (inner_before > 0) & (inner_after > 0))
+        for a, b in set(zip(inner_before[agree].tolist(), inner_after[agree].tolist())):
+            root_a, root_b = _find_root(parent, a), _find_root(parent, b)
+            if root_a != root_b:
+                parent[max(root_a, root_b)] = min(root_a, root_b)
+    
+    roots = parent.copy()
+    while True:
+        next_roots = roots[roots]
+        if np.array_equal(next_roots, roots):
+            break
+        roots = next_roots
+    
+    positive = labels > 0
+    labels[positive] = roots[labels[positive]]
+    return labels, region_properties(labels)
+
+_NEIGHBOUR_OFFSETS = {
+    4: ((-1, 0), (1, 0), (0, -1), (0, 1)),
+    8: ((-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)),
+}
+
+def _seed_labels(seeds, shape):
+    """Carte d'étiquettes des germes, donnés en points (x, y) ou en carte d'étiquettes."""
+    seeds = np.asarray(seeds)
+    if seeds.shape == shape:
+        return seeds.astype(np.int32)
+    points = seeds.reshape(-1, 2).astype(np.intp)
+    labels = np.zeros(shape, np.int32)
+    labels[points[:, 1], points[:, 0]] = np.arange(1, len(points) + 1)
+    return labels
+
+def region_growing(image, seeds, tolerance=None, connectivity=4, bucket_width=1.0):
+    """
+    Croissance de régions à partir de germes (Adams et Bischof).
+
+    Le front de chaque région est rangé dans une file de priorité par paquets
+    (un paquet par tranche de bucket_width d'écart à la moyenne de la
+    région) ; chaque paquet est traité d'un bloc, par opérations vectorisées.
+    Les moyennes des régions sont mises à jour à chaque ajout et l'écart d'un
+    pixel est réévalué au moment de son ajout.
+
+    Args:
+        image (numpy.ndarray): Image d'entrée (niveaux de gris ou couleur)
+        seeds (numpy.ndarray ou list): Germes, soit une liste de points
+            (x, y) qui deviennent les régions 1..n, soit une carte
+            d'étiquettes de la taille de l'image (0 : pas de germe)
+        tolerance (float, optional): Écart maximal (distance euclidienne sur
+            les canaux) entre un pixel et la moyenne de la région ; sans
+            tolérance, tous les pixels accessibles sont attribués
+        connectivity (int): 4 ou 8
+        bucket_width (float): Largeur des paquets de la file de priorité
+
+    Returns:
+        numpy.ndarray: Étiquettes int32 (0 : pixel non attribué)
+    """
+    h, w = image.shape[:2]
+    stride = w + 2
+    # Travail à plat sur des tableaux bordés d'un pixel : la bordure porte
+    # l'étiquette -1 et n'est jamais libre, ce qui évite tout test de limites
+    labels = np.pad(_seed_labels(seeds, (h, w)), 1, constant_values=-1).ravel()
+    data = image.reshape(h, w, -1)
+    channels = [np.pad(data[:, :, c].astype(np.float32), 1).ravel() for c in range(data.shape[2])]
+    offsets = np.array([dy * stride + dx for dy, dx in _NEIGHBOUR_OFFSETS[connectivity]])
+    n_regions = int(labels.max()) + 1
+
+    seeded = np.flatnonzero(labels > 0)
+    counts = np.bincount(labels[seeded], minlength=n_regions).astype(np.float64)
+    sums = np.stack([np.bincount(labels[seeded], weights=channel[seeded], minlength=n_regions)
+                     for channel in channels])
+    means = (sums / np.maximum(counts, 1)).astype(np.float32)
+
+    if tolerance is None:
+        limit = max(float(channel.max() - channel.min()) for channel in channels) * np.sqrt(len(channels))
+    else:
+        limit = float(tolerance)
+    n_buckets = int(limit // bucket_width) + 1
+    buckets = [[] for _ in range(n_buckets)]
+    stamp = np.full(labels.size, -1, np.intp)
+
+    def distance(pixels, regions):
+        if len(channels) == 1:
+            return np.abs(channels[0][pixels] - means[0][regions])
+        squared = sum((channel[pixels] - mean[regions]) ** 2 for channel, mean in zip(channels, means))
+        return np.sqrt(squared)
+
+    def unique_claims(pixels, regions):
+        """Une entrée par pixel et par région (la dernière), en O(n)."""
+        index = np.arange(pixels.size)
+        stamp[pixels] = index
+        winner = stamp[pixels]
+        keep = (winner == index) | (regions != regions[winner])
+        return pixels[keep], regions[keep], winner[keep] == index[keep]
+
+    def push(pixels, regions, level):
+        free = labels[pixels] == 0
+        pixels, regions, _ = unique_claims(pixels[free], regions[free])
+        delta = distance(pixels, regions)
+        keep = delta <= limit
+        pixels, regions = pixels[keep], regions[keep]
+        # File monotone : un pixel plus proche que le niveau courant est traité au niveau courant
+        bucket = np.maximum((delta[keep] / bucket_width).astype(np.intp), level)
+        if bucket.size == 0:
+            return
+        if bucket.max() == level:
+            buckets[level].append((pixels, regions))
+            return
+        # Tri stable d'entiers courts (tri par base)
+        order = np.argsort(bucket.astype(np.int16 if n_buckets < 32767 else np.int32), kind='stable')
+        values, starts = np.unique(bucket[order], return_index=True)
+        ends = np.append(starts[1:], order.size)
+        for value, start, end in zip(values, starts, ends):
+            chunk = order[start:end]
+            buckets[value].append((pixels[chunk], regions[chunk]))
+
+    def frontier(pixels, regions):
+        front = (pixels[:, np.newaxis] + offsets).ravel()
+        return front, np.repeat(regions, offsets.size)
+
+    push(*frontier(seeded, labels[seeded]), 0)
+
+    level = 0
+    while level < n_buckets:
+        if not buckets[level]:
+            level += 1
+            continue
+        chunks = buckets[level]
+        buckets[level] = []
+        if len(chunks) == 1:
+            pixels, regions = chunks[0]
+        else:
+            pixels = np.concatenate([chunk[0] for chunk in chunks])
+            regions = np.concatenate([chunk[1] for chunk in chunks])
+
+        free = labels[pixels] == 0
+        pixels, regions = pixels[free], regions[free]
+        # Réévaluation avec les moyennes courantes : les pixels devenus trop
+        # éloignés retournent dans leur paquet
+        delta = distance(pixels, regions)
+        late = delta >= (level + 1) * bucket_width
+        if late.any():
+            push(pixels[late], regions[late], level)
+            on_time = ~late
+            pixels, regions, delta = pixels[on_time], regions[on_time], delta[on_time]
+        if pixels.size == 0:
+            continue
+
+        # Un pixel revendiqué par plusieurs régions va à la plus proche :
+        # écriture par ordre d'écart décroissant, la dernière l'emporte.
+        # Un paquet issu d'un seul ajout est déjà sans doublon.
+        single = None
+        if len(chunks) > 1:
+            pixels, regions, single = unique_claims(pixels, regions)
+        if single is not None and not single.all():
+            delta = distance(pixels, regions)
+            order = np.argsort(-delta, kind='stable')
+            pixels, regions = pixels[order], regions[order]
+            index = np.arange(pixels.size)
+            stamp[pixels] = index
+            winner = stamp[pixels] == index
+            pixels, regions = pixels[winner], regions[winner]
+
+        labels[pixels] = regions
+        counts += np.bincount(regions, minlength=n_regions)
+        for c, channel in enumerate(channels):
+            sums[c] += np.bincount(regions, weights=channel[pixels], minlength=n_regions)
+        means = (sums / np.maximum(counts, 1)).astype(np.float32)
+
+        push(*frontier(pixels, regions), level)
+
+    return labels.reshape(h + 2, stride)[1:-1, 1:-1].copy()
+
+def _quadtree_leaves(gray, threshold, min_size):
+    """
+    Découpe l'image en quadtree jusqu'à des blocs homogènes (écart-type <= threshold).
+
+    Les statistiques des blocs viennent des images intégrales ; chaque niveau
+    du quadtree est traité d'un bloc.
+
+    Returns:
+        tuple: (grille des indices de feuille au pas du plus petit bloc,
+            pas de la grille, sommes, sommes des carrés et surfaces des feuilles)
+    """
+    h, w = gray.shape
+    total, squares = cv2.integral2(gray, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+    size = 1 << int(np.ceil(np.log2(max(h, w, 1))))
+    ys = np.zeros(1, np.intp)
+    xs = np.zeros(1, np.intp)
+    grid = np.full((1, 1), -1, np.int32)
+    sums, sq_sums, areas = [], [], []
+    count = 0
+
+    while True:
+        y1, x1 = np.minimum(ys + size, h), np.minimum(xs + size, w)
+        block = lambda s: s[y1, x1] - s[ys, x1] - s[y1, xs] + s[ys, xs]
+        block_sum, block_sq = block(total), block(squares)
+        area = ((y1 - ys) * (x1 - xs)).astype(np.float64)
+        variance = block_sq / area - (block_sum / area) ** 2
+
+        split = (variance > threshold * threshold) & (size // 2 >= min_size)
+        leaf = ~split
+        grid[ys[leaf] // size, xs[leaf] // size] = np.arange(count, count + leaf.sum())
+        count += int(leaf.sum())
+        sums.append(block_sum[leaf]); sq_sums.append(block_sq[leaf]); areas.append(area[leaf])
+
+        if not split.any():
+            break
+        half = size // 2
+        ys = (ys[split][:, np.newaxis] + np.array([0, 0, half, half])).ravel()
+        xs = (xs[split][:, np.newaxis] + np.array([0, half, 0, half])).ravel()
+        inside = (ys < h) & (xs < w)
+        ys, xs = ys[inside], xs[inside]
+        grid = grid.repeat(2, axis=0).repeat(2, axis=1)
+        size = half
+
+    grid = grid[:-(-h // size), :-(-w // size)]
+    return grid, size, np.concatenate(sums), np.concatenate(sq_sums), np.concatenate(areas)
+
+def split_and_merge(image, threshold=10.0, merge_threshold=None, min_size=4):
+    """
+    Segmentation par division-fusion (split-and-merge).
+
+    Division : quadtree sur les images intégrales jusqu'à des blocs
+    d'écart-type inférieur à threshold. Fusion : sur le graphe d'adjacence
+    des feuilles, chaque région se rattache (union-find) à sa voisine de
+    moyenne la plus proche si l'écart des moyennes ne dépasse pas
+    merge_threshold ; les statistiques des régions sont recalculées à chaque
+    tour, jusqu'à ce qu'aucune fusion ne soit possible.
+
+    Args:
+        image (numpy.ndarray): Image d'entrée (convertie en niveaux de gris)
+        threshold (float): Écart-type maximal d'un bloc homogène
+        merge_threshold (float, optional): Écart maximal entre les moyennes
+            de deux régions fusionnées (threshold par défaut)
+        min_size (int): Côté minimal des blocs
+
+    Returns:
+        numpy.ndarray: Étiquettes int32 consécutives à partir de 1
+    """
+    if merge_threshold is None:
+        merge_threshold = threshold
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if image.ndim == 3 else image
+    h, w = gray.shape
+    grid, cell, sums, _, areas = _quadtree_leaves(gray, threshold, max(int(min_size), 1))
+    n = sums.size
+
+    # Graphe d'adjacence des feuilles (arêtes uniques, a < b)
+    pairs = []
+    for a, b in ((grid[:, :-1], grid[:, 1:]), (grid[:-1, :], grid[1:, :])):
+        differ = a != b
+        pairs.append(np.stack([np.minimum(a[differ], b[differ]), np.maximum(a[differ], b[differ])]))
+    pairs = np.concatenate(pairs, axis=1).astype(np.int64)
+    edges = np.unique(pairs[0] * n + pairs[1])
+    first, second = np.divmod(edges, n)
+
+    parent = np.arange(n)
+    while first.size:
+        region_sum = np.bincount(parent, weights=sums, minlength=n)
+        region_area = np.bincount(parent, weights=areas, minlength=n)
+        mean = region_sum / np.maximum(region_area, 1)
+
+        # Les arêtes internes à une région sont abandonnées ; les autres
+        # restent candidates, les moyennes évoluant d'un tour à l'autre
+        ra, rb = parent[first], parent[second]
+        between = ra != rb
+        first, second, ra, rb = first[between], second[between], ra[between], rb[between]
+        diff = np.abs(mean[ra] - mean[rb])
+        candidate = diff <= merge_threshold
+        if not candidate.any():
+            break
+        ra, rb, diff = ra[candidate], rb[candidate], diff[candidate]
+
+        # Rang total et symétrique des arêtes : seuls des cycles de longueur 2
+        # peuvent apparaître quand chaque région suit sa meilleure arête
+        rank = np.empty(ra.size, np.intp)
+        rank[np.lexsort((np.maximum(ra, rb), np.minimum(ra, rb), diff))] = np.arange(ra.size)
+        roots = np.concatenate([ra, rb])
+        others = np.concatenate([rb, ra])
+        order = np.lexsort((np.concatenate([rank, rank]), roots))
+        starts = np.ones(order.size, bool)
+        starts[1:] = roots[order[1:]] != roots[order[:-1]]
+        best = order[starts]
+
+        hook = np.arange(n)
+        hook[roots[best]] = others[best]
+        mutual = (hook[hook] == np.arange(n)) & (np.arange(n) < hook)
+        hook[mutual] = np.flatnonzero(mutual)
+        while True:
+            jumped = hook[hook]
+            if np.array_equal(jumped, hook):
+                break
+            hook = jumped
+        parent = hook[parent]
+
+    _, compact = np.unique(parent, return_inverse=True)
+    labels = (compact.astype(np.int32) + 1)[grid]
+    return labels.repeat(cell, axis=0).repeat(cell, axis=1)[:h, :w]
+
+# Évaluation avec les modèles de couleur figés (OpenCV >= 4.1) ; à défaut,
+# GC_EVAL réestime les modèles sur chaque tuile
+_GC_EVAL_FROZEN = getattr(cv2, 'GC_EVAL_FREEZE_MODEL', cv2.GC_EVAL)
+
+def _default_rect(shape):
+    """Rectangle par défaut : l'image privée d'une marge de 50 pixels."""
+    return (50, 50, shape[1] - 100, shape[0] - 100)
+
+def _grabcut_init(shape, rect, mask):
+    """Masque GrabCut initial (GC_*) à partir d'un rectangle et/ou d'un masque."""
+    if mask is None:
+        init = np.full(shape, cv2.GC_BGD, np.uint8)
+    else:
+        init = mask.astype(np.uint8).copy()
+    if rect is not None:
+        x, y, w, h = rect
+        outside = np.ones(shape, bool)
+        outside[max(y, 0):y + h, max(x, 0):x + w] = False
+        if mask is None:
+            init[~outside] = cv2.GC_PR_FGD
+        init[outside] = cv2.GC_BGD
+    return init
+
+def grabcut_mask(image, rect=None, mask=None, iterations=5, proxy_size=800, band=None,
+                 refine_iterations=2, tile_size=512):
+    """
+    Segmentation GrabCut du premier plan, du grossier au fin.
+
+    GrabCut est d'abord exécuté sur une réduction de l'image (plus grand côté
+    proxy_size). Le masque obtenu est agrandi, puis seule une bande autour de
+    la frontière est réévaluée en pleine résolution, par tuiles, avec les
+    modèles de couleur appris sur la réduction ; hors de la bande, le masque
+    agrandi est conservé.
+
+    Args:
+        image (numpy.ndarray): Image d'entrée (BGR, 8 bits)
+        rect (tuple, optional): Rectangle (x, y, largeur, hauteur) contenant
+            le premier plan ; l'extérieur est du fond certain
+        mask (numpy.ndarray, optional): Masque initial en valeurs GC_BGD,
+            GC_FGD, GC_PR_BGD, GC_PR_FGD (traits de l'utilisateur) ; sans
+            rect ni mask, rectangle de l'image privée de 50 pixels
+        iterations (int): Itérations de GrabCut sur la réduction
+        proxy_size (int, optional): Plus grand côté de la réduction ; None
+            pour travailler directement en pleine résolution
+        band (int, optional): Demi-largeur de la bande affinée en pixels
+            (deux pixels de la réduction par défaut)
+        refine_iterations (int): Itérations de l'affinage
+        tile_size (int): Côté des tuiles de l'affinage
+
+    Returns:
+        numpy.ndarray: Masque du premier plan (uint8, 0 ou 255)
+    """
+    h, w = image.shape[:2]
+    if rect is None and mask is None:
+        rect = _default_rect(image.shape)
+    init = _grabcut_init((h, w), rect, mask)
+
+    scale = 1.0 if proxy_size is None else min(1.0, proxy_size / float(max(h, w)))
     bgd_model = np.zeros((1, 65), np.float64)
     fgd_model = np.zeros((1, 65), np.float64)
+
+    if scale == 1.0:
+        cv2.grabCut(image, init, None, bgd_model, fgd_model, iterations, cv2.GC_INIT_WITH_MASK)
+        return np.where((init == cv2.GC_FGD) | (init == cv2.GC_PR_FGD), 255, 0).astype(np.uint8)
+
+    small_size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    small = cv2.resize(image, small_size, interpolation=cv2.INTER_AREA)
+    small_mask = cv2.resize(init, small_size, interpolation=cv2.INTER_NEAREST)
+    cv2.grabCut(small, small_mask, None, bgd_model, fgd_model, iterations, cv2.GC_INIT_WITH_MASK)
+
+    # Agrandissement du masque grossier (seuil à mi-hauteur d'une interpolation linéaire)
+    coarse = ((small_mask == cv2.GC_FGD) | (small_mask == cv2.GC_PR_FGD)).astype(np.float32)
+    foreground = cv2.resize(coarse, (w, h), interpolation=cv2.INTER_LINEAR) > 0.5
+
+    # Bande d'incertitude autour de la frontière
+    if band is None:
+        band = int(np.ceil(2.0 / scale))
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (2 * band + 1, 2 * band + 1))
+    fg_u8 = foreground.astype(np.uint8)
+    uncertain = cv2.dilate(fg_u8, kernel) != cv2.erode(fg_u8, kernel)
+
+    refined = np.where(foreground, cv2.GC_FGD, cv2.GC_BGD).astype(np.uint8)
+    refined[uncertain] = np.where(foreground[uncertain], cv2.GC_PR_FGD, cv2.GC_PR_BGD)
+    # Les contraintes certaines de l'utilisateur priment
+    definite = (init == cv2.GC_BGD) | (init == cv2.GC_FGD)
+    refined[definite] = init[definite]
+    uncertain &= ~definite
+
+    # Affinage par tuiles (avec une marge) limitées aux pixels incertains
+    margin = band
+    for y in range(0, h, tile_size):
+        for x in range(0, w, tile_size):
+            ty, tx = min(y + tile_size, h), min(x + tile_size, w)
+            inside = uncertain[y:ty, x:tx]
+            if not inside.any():
+                continue
+            rows = np.flatnonzero(inside.any(axis=1))
+            cols = np.flatnonzero(inside.any(axis=0))
+            y0, y1 = max(y + rows[0] - margin, 0), min(y + rows[-1] + 1 + margin, h)
+            x0, x1 = max(x + cols[0] - margin, 0), min(x + cols[-1] + 1 + margin, w)
+
+            tile_mask = refined[y0:y1, x0:x1].copy()
+            tile = np.ascontiguousarray(image[y0:y1, x0:x1])
+            cv2.grabCut(tile, tile_mask, None, bgd_model.copy(), fgd_model.copy(),
+                        refine_iterations, _GC_EVAL_FROZEN)
+
+            # Seule la partie intérieure à la tuile est retenue
+            inner = (slice(y - y0 + rows[0], y - y0 + rows[-1] + 1),
+                     slice(x - x0 + cols[0], x - x0 + cols[-1] + 1))
+            target = refined[y + rows[0]:y + rows[-1] + 1, x + cols[0]:x + cols[-1] + 1]
+            update = uncertain[y + rows[0]:y + rows[-1] + 1, x + cols[0]:x + cols[-1] + 1]
+            target[update] = tile_mask[inner][update]
+
+    return np.where((refined == cv2.GC_FGD) | (refined == cv2.GC_PR_FGD), 255, 0).astype(np.uint8)
+
+def grabcut_segmentation(image, rect=None, mask=None, proxy_size=None):
+    """
+    Effectue une segmentation par GrabCut.
     
-    # Appliquer GrabCut
-    cv2.grabCut(image, mask, rect, bgd_model, fgd_model, 5, cv2.GC_INIT_WITH_RECT)
-    
-    # Créer un masque où 0 et 2 sont le fond, 1 et 3 sont le premier plan
-    mask2 = np.where((mask == 2) | (mask == 0), 0, 1).astype('uint8')
-    
-    # Appliquer le masque à l'image
-    result = image * mask2[:, :, np.newaxis]
-    
-    return result
+    Args:
+        image (numpy.ndarray): Image d'entrée (BGR)
+        rect (tuple): Région d'intérêt (x, y, largeur, hauteur)
+        mask (numpy.ndarray, optional): Masque initial (valeurs GC_*)
+        proxy_size (int, optional): Plus grand côté de la réduction pour le
+            mode du grossier au fin (voir grabcut_mask) ; None pour la
+            pleine résolution
+        
+    Returns:
+        numpy.ndarray: Masque binaire du premier plan (0 ou 255)
+    """
+    return grabcut_mask(image, rect, mask, iterations=5, proxy_size=proxy_size)
 
 def find_contours(binary_image):
     """
@@ -176,49 +830,45 @@ def find_contours(binary_image):
     )
     return contours
 
-def draw_contours(image, contours, color=(0, 255, 0), thickness=2):
+def draw_contours(image, contours, color=(0, 255, 0), thickness=2, dst=None):
     """
     Dessine les contours sur une image.
     
+    Pour des tracés répétés sur une même image, voir contours.ContourOverlay.
+    
     Args:
         image (numpy.ndarray): Image d'entrée
-        contours (list): Liste des contours à dessiner
+        contours (list ou ContourSet): Contours à dessiner
         color (tuple): Couleur des contours (B, G, R)
         thickness (int): Épaisseur des contours
+        dst (numpy.ndarray, optional): Image de sortie ; image elle-même
+            pour dessiner sur place sans copie
         
     Returns:
         numpy.ndarray: Image avec les contours dessinés
     """
-    result = image.copy()
-    cv2.drawContours(result, contours, -1, color, thickness)
-    return result
+    if dst is None:
+        dst = image.copy()
+    elif dst is not image:
+        np.copyto(dst, image)
+    cv2.drawContours(dst, list(contours), -1, color, thickness)
+    return dst
 
-def connected_components(image):
+def connected_components(image, intensity=None, connectivity=8):
     """
-    Étiquette les composantes connexes dans une image binaire.
+    Étiquette les composantes connexes d'une image binaire et mesure chaque région.
+    
+    La coloration des étiquettes, pour l'affichage, est laissée à l'appelant.
     
     Args:
-        image (numpy.ndarray): Image binaire
+        image (numpy.ndarray): Image binaire (pixels non nuls = objets) ;
+            une image couleur est convertie en niveaux de gris
+        intensity (numpy.ndarray, optional): Image d'intensité pour
+            'mean_intensity'
+        connectivity (int): 4 ou 8
         
     Returns:
-        tuple: (nombre de labels, image des labels, statistiques, centroïdes)
+        tuple: (étiquettes int32, 0 pour le fond ; table des propriétés des
+            régions (voir regions.region_properties))
     """
-    if len(image.shape) == 3:
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY)
-    else:
-        binary = image
-    
-    # Appliquer l'étiquetage des composantes connexes
-    num_labels, labels, stats, centroids = cv2.connectedComponentsWithStats(
-        binary, connectivity=8
-    )
-    
-    # Créer une image colorée pour les étiquettes
-    colors = np.random.randint(0, 255, size=(num_labels, 3), dtype=np.uint8)
-    colors[0] = [0, 0, 0]  # Fond noir
-    
-    # Colorier les composantes
-    colored = colors[labels]
-    
-    return num_labels, colored, stats, centroids
+    return label_regions(image, intensity, connectivity)
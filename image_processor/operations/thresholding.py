@@ -0,0 +1,294 @@
+"""
+Module contenant des seuillages automatiques calculés sur l'histogramme.
+
+L'image n'est parcourue qu'une fois pour construire un histogramme de 256
+classes ; toutes les méthodes travaillent ensuite sur cet histogramme, et
+l'affectation des classes se fait en une passe par table de correspondance.
+
+Convention : un seuil t est la dernière valeur de sa classe, un pixel x est
+au-dessus du seuil si x > t (comme cv2.threshold en THRESH_BINARY).
+"""
+
+import cv2
+import numpy as np
+
+HISTOGRAM_BINS = 256
+
+def histogram(image):
+    """
+    Histogramme de 256 classes d'une image en niveaux de gris.
+
+    Les images entières sont regroupées par puissances de deux (une valeur
+    par classe en 8 bits) ; les images flottantes sur leur dynamique.
+
+    Args:
+        image (numpy.ndarray): Image en niveaux de gris
+
+    Returns:
+        tuple: (effectifs float64, valeur centrale de chaque classe,
+            dernière valeur de chaque classe)
+    """
+    if image.dtype == np.uint8:
+        counts = cv2.calcHist([image], [0], None, [HISTOGRAM_BINS], [0, 256]).ravel()
+        values = np.arange(HISTOGRAM_BINS, dtype=np.float64)
+        return counts.astype(np.float64), values, values.copy()
+
+    if np.issubdtype(image.dtype, np.integer):
+        if image.min() < 0:
+            raise ValueError("Les images entières signées ne sont pas supportées")
+        shift = max(int(image.max()).bit_length() - 8, 0)
+        counts = np.bincount((image >> shift).ravel(), minlength=HISTOGRAM_BINS).astype(np.float64)
+        counts = counts[:HISTOGRAM_BINS]
+        first = np.arange(HISTOGRAM_BINS, dtype=np.float64) * (1 << shift)
+        return counts, first + ((1 << shift) - 1) / 2.0, first + (1 << shift) - 1
+
+    low, high = float(image.min()), float(image.max())
+    if high <= low:
+        high = low + 1.0
+    counts, edges = np.histogram(image, bins=HISTOGRAM_BINS, range=(low, high))
+    return counts.astype(np.float64), (edges[:-1] + edges[1:]) / 2.0, edges[1:]
+
+def _as_histogram(image, hist):
+    """Histogramme fourni (effectifs, centres, dernières valeurs) ou calculé."""
+    if hist is not None:
+        return hist
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return histogram(image)
+
+def multi_otsu_thresholds(image=None, classes=3, hist=None):
+    """
+    Seuils d'Otsu multiples par programmation dynamique sur l'histogramme.
+
+    Maximise la variance inter-classes sum(w_k mu_k²) : chaque étape de la
+    programmation dynamique est vectorisée sur les 256 classes de
+    l'histogramme, soit O(classes x 256²) quelle que soit la taille de l'image.
+
+    Args:
+        image (numpy.ndarray, optional): Image en niveaux de gris
+        classes (int): Nombre de classes (2 à 5)
+        hist (tuple, optional): Résultat de histogram(), pour ne pas relire l'image
+
+    Returns:
+        numpy.ndarray: classes - 1 seuils croissants
+    """
+    if not 2 <= classes <= 5:
+        raise ValueError(f"Le nombre de classes doit être compris entre 2 et 5: {classes}")
+    counts, centres, last = _as_histogram(image, hist)
+    n = counts.size
+
+    # Sommes cumulées : classe [i, j] -> poids W[j+1] - W[i], somme S[j+1] - S[i]
+    weight = np.concatenate([[0.0], np.cumsum(counts)])
+    total = np.concatenate([[0.0], np.cumsum(counts * centres)])
+    start = np.arange(n)[:, np.newaxis]
+    end = np.arange(n)[np.newaxis, :]
+    w = weight[end + 1] - weight[start]
+    s = total[end + 1] - total[start]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        score = np.where((end >= start) & (w > 0), s * s / w, 0.0)
+    score[end < start] = -np.inf
+
+    # best[j] : meilleur score des classes 0..j découpées en k classes
+    best = score[0].copy()
+    choices = []
+    for _ in range(classes - 1):
+        # candidat[i, j] : dernière classe [i, j] après un découpage optimal de 0..i-1
+        candidate = np.full((n, n), -np.inf)
+        candidate[1:] = best[:-1, np.newaxis] + score[1:]
+        choice = np.argmax(candidate, axis=0)
+        best = candidate[choice, np.arange(n)]
+        choices.append(choice)
+
+    # Remontée des débuts de classes depuis la dernière valeur
+    thresholds = []
+    j = n - 1
+    for choice in reversed(choices):
+        i = int(choice[j])
+        thresholds.append(last[i - 1])
+        j = i - 1
+    return np.array(thresholds[::-1])
+
+def threshold_otsu_hist(image=None, hist=None):
+    """
+    Seuil d'Otsu (deux classes) calculé sur l'histogramme.
+
+    Returns:
+        float: Seuil
+    """
+    return float(multi_otsu_thresholds(image, 2, hist)[0])
+
+def threshold_triangle(image=None, hist=None):
+    """
+    Seuil du triangle (Zack et al.) : point de l'histogramme le plus éloigné
+    de la droite joignant le pic au bord le plus éloigné.
+
+    Returns:
+        float: Seuil
+    """
+    counts, _, last = _as_histogram(image, hist)
+    nonzero = np.flatnonzero(counts)
+    if nonzero.size < 2:
+        return float(last[nonzero[0]]) if nonzero.size else 0.0
+    # Bornes étendues à la première classe vide, comme cv2 (THRESH_TRIANGLE)
+    n = counts.size
+    first, final = max(nonzero[0] - 1, 0), min(nonzero[-1] + 1, n - 1)
+    peak = int(np.argmax(counts))
+
+    # Orienter l'histogramme pour que la queue la plus longue soit à gauche
+    flip = peak - first < final - peak
+    data = counts[::-1] if flip else counts
+    if flip:
+        first, peak = n - 1 - final, n - 1 - peak
+
+    # Distance (à un facteur près) à la droite (first, 0) -> (peak, pic)
+    span = np.arange(first + 1, peak + 1)
+    level = first
+    if span.size:
+        distance = data[peak] * span + (first - peak) * data[span]
+        best = int(np.argmax(distance))
+        if distance[best] > 0:
+            level = int(span[best])
+    level = max(level - 1, 0)
+    if flip:
+        level = n - 1 - level
+    return float(last[level])
+
+def threshold_li(image=None, hist=None, tolerance=None):
+    """
+    Seuil d'entropie croisée minimale (Li et Tam), par itération de point fixe
+    sur l'histogramme.
+
+    Args:
+        tolerance (float, optional): Arrêt des itérations (moitié du pas des
+            classes par défaut)
+
+    Returns:
+        float: Seuil
+    """
+    counts, centres, last = _as_histogram(image, hist)
+    weight = np.cumsum(counts)
+    moment = np.cumsum(counts * centres)
+    total_w, total_m = weight[-1], moment[-1]
+    if total_w == 0:
+        return 0.0
+    step = centres[1] - centres[0] if centres.size > 1 else 1.0
+    if tolerance is None:
+        tolerance = step / 2.0
+
+    # Les logarithmes imposent des intensités strictement positives
+    offset = centres[0] - step / 2.0 if centres[0] - step / 2.0 < 0 else 0.0
+    threshold = total_m / total_w
+    for _ in range(1000):
+        index = int(np.clip(np.searchsorted(centres, threshold, side='right') - 1, 0, counts.size - 2))
+        w_b, w_f = weight[index], total_w - weight[index]
+        if w_b == 0 or w_f == 0:
+            break
+        mean_b = moment[index] / w_b - offset
+        mean_f = (total_m - moment[index]) / w_f - offset
+        if mean_b <= 0 or mean_f <= 0:
+            break
+        new = (mean_f - mean_b) / (np.log(mean_f) - np.log(mean_b)) + offset
+        if abs(new - threshold) < tolerance:
+            threshold = new
+            break
+        threshold = new
+
+    index = int(np.clip(np.searchsorted(centres, threshold, side='right') - 1, 0, counts.size - 1))
+    return float(last[index])
+
+def threshold_yen(image=None, hist=None):
+    """
+    Seuil de Yen : maximise la corrélation entropique des deux classes.
+
+    Returns:
+        float: Seuil
+    """
+    counts, _, last = _as_histogram(image, hist)
+    p = counts / max(counts.sum(), 1.0)
+    p_cum = np.cumsum(p)
+    p_sq = np.cumsum(p * p)
+    p_sq_rev = np.cumsum((p * p)[::-1])[::-1]
+    # Corrélation du fond (0..t) et du premier plan (t+1..)
+    background = p_sq[:-1]
+    foreground = p_sq_rev[1:]
+    ratio = p_cum[:-1] * (1.0 - p_cum[:-1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        criterion = np.log(np.where(background * foreground > 0, background * foreground, np.nan)) \
+            - 2.0 * np.log(np.where(ratio > 0, ratio, np.nan))
+    if np.all(np.isnan(criterion)):
+        return float(last[0])
+    return float(last[int(np.nanargmax(-criterion))])
+
+def threshold_kapur(image=None, hist=None):
+    """
+    Seuil d'entropie maximale (Kapur, Sahoo et Wong).
+
+    Returns:
+        float: Seuil
+    """
+    counts, _, last = _as_histogram(image, hist)
+    p = counts / max(counts.sum(), 1.0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plogp = np.where(p > 0, p * np.log(np.where(p > 0, p, 1.0)), 0.0)
+    p_cum = np.cumsum(p)[:-1]
+    h_cum = np.cumsum(plogp)
+    h_total = h_cum[-1]
+    h_cum = h_cum[:-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Entropies du fond et du premier plan, chacune normalisée par sa masse
+        h_b = np.log(p_cum) - h_cum / p_cum
+        h_f = np.log(1.0 - p_cum) - (h_total - h_cum) / (1.0 - p_cum)
+        entropy = np.where((p_cum > 0) & (p_cum < 1), h_b + h_f, -np.inf)
+    return float(last[int(np.argmax(entropy))])
+
+THRESHOLD_METHODS = {
+    'otsu': threshold_otsu_hist,
+    'triangle': threshold_triangle,
+    'li': threshold_li,
+    'yen': threshold_yen,
+    'kapur': threshold_kapur,
+}
+
+def auto_threshold(image, method='otsu'):
+    """
+    Calcule un seuil automatique sur l'histogramme de l'image.
+
+    Args:
+        image (numpy.ndarray): Image (convertie en niveaux de gris si besoin)
+        method (str): 'otsu', 'triangle', 'li', 'yen' ou 'kapur'
+
+    Returns:
+        float: Seuil (les pixels x > seuil sont au premier plan)
+    """
+    if method not in THRESHOLD_METHODS:
+        raise ValueError(f"Méthode de seuillage inconnue: {method}")
+    return THRESHOLD_METHODS[method](image)
+
+def apply_thresholds(image, thresholds, values=None):
+    """
+    Affecte chaque pixel à sa classe en une passe par table de correspondance.
+
+    Args:
+        image (numpy.ndarray): Image en niveaux de gris (8 ou 16 bits, ou flottante)
+        thresholds (sequence): Seuils croissants (x > t passe à la classe suivante)
+        values (sequence, optional): Valeur de sortie de chaque classe
+            (niveaux régulièrement espacés entre 0 et 255 par défaut)
+
+    Returns:
+        numpy.ndarray: Image des classes (uint8)
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    n_classes = thresholds.size + 1
+    if values is None:
+        values = np.linspace(0, 255, n_classes)
+    values = np.asarray(values).astype(np.uint8)
+    if values.size != n_classes:
+        raise ValueError(f"{n_classes} valeurs de sortie attendues: {values.size}")
+
+    if image.dtype == np.uint8:
+        lut = values[np.digitize(np.arange(256), thresholds, right=True)]
+        return cv2.LUT(image, lut)
+    if image.dtype == np.uint16:
+        lut = values[np.digitize(np.arange(65536), thresholds, right=True)]
+        return lut[image]
+    return values[np.digitize(image, thresholds, right=True)]
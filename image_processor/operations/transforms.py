@@ -5,6 +5,8 @@ Module contenant les opérations de transformation d'images.
 import cv2
 import numpy as np
 
+from . import contrast
+
 def adjust_gamma(image, gamma=1.0):
     """
     Ajuste la correction gamma d'une image.
@@ -98,51 +100,29 @@ def equalize_histogram(image):
     Applique l'égalisation d'histogramme à une image.
     
     Args:
-        image (numpy.ndarray): Image d'entrée (niveaux de gris ou couleur)
+        image (numpy.ndarray): Image d'entrée (niveaux de gris ou couleur BGR,
+            8 ou 16 bits) ; la couleur est égalisée sur le canal Y de YCrCb
         
     Returns:
         numpy.ndarray: Image avec histogramme égalisé
     """
-    if len(image.shape) == 2:  # Image en niveaux de gris
-        return cv2.equalizeHist(image)
-    else:  # Image couleur
-        # Convertir en espace de couleur YCrCb (Y = luminance)
-        ycrcb = cv2.cvtColor(image, cv2.COLOR_BGR2YCrCb)
-        
-        # Égaliser le canal Y (luminance)
-        ycrcb[:, :, 0] = cv2.equalizeHist(ycrcb[:, :, 0])
-        
-        # Reconvertir en BGR
-        return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR)
+    return contrast.equalize(image, space='ycrcb')
 
 def clahe(image, clip_limit=2.0, tile_grid_size=(8, 8)):
     """
     Applique l'égalisation adaptative de l'histogramme (CLAHE) à une image.
     
     Args:
-        image (numpy.ndarray): Image d'entrée (niveaux de gris ou couleur)
+        image (numpy.ndarray): Image d'entrée (niveaux de gris ou couleur BGR,
+            8 ou 16 bits) ; la couleur est traitée sur le canal L de Lab
         clip_limit (float): Seuil de contraste
         tile_grid_size (tuple): Taille des tuiles pour l'égalisation locale
         
     Returns:
         numpy.ndarray: Image avec CLAHE appliqué
     """
-    clahe = cv2.createCLAHE(
-        clipLimit=clip_limit, 
-        tileGridSize=tile_grid_size
-    )
-    
-    if len(image.shape) == 2:  # Image en niveaux de gris
-        return clahe.apply(image)
-    else:  # Image couleur
-        # Convertir en espace de couleur LAB (L = luminance)
-        lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-        
-        # Appliquer CLAHE sur le canal L
-        lab[..., 0] = clahe.apply(lab[..., 0])
-        
-        # Reconvertir en BGR
-        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+    # Objet CLAHE réutilisé d'un appel à l'autre (voir contrast.get_clahe)
+    return contrast.clahe(image, clip_limit, tile_grid_size, space='lab')
 
 def apply_affine_transform(image, angle=0, scale=1.0, tx=0, ty=0):
     """
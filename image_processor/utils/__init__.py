@@ -1,8 +1,10 @@
-""
+"""
 Package contenant les utilitaires pour l'application Image Processor.
 """
 
 from .image_loader import load_image, save_image, is_image_file
+from .image_saver import SaveService, SaveResult
+from .image_data import ImageData
 from .helpers import *
 
-__all__ = ['load_image', 'save_image', 'is_image_file']
+__all__ = ['load_image', 'save_image', 'is_image_file', 'SaveService', 'SaveResult', 'ImageData']
@@ -0,0 +1,159 @@
+"""
+Module contenant un conteneur d'image qui connaît son ordre de canaux.
+
+Les tableaux issus de PIL sont en RGB, ceux d'OpenCV en BGR : ImageData
+enregistre l'ordre des canaux de l'image et fournit à la demande ses
+représentations dérivées (niveaux de gris, BGR, RGB, HSV, Lab, YCrCb).
+Chaque conversion n'est faite qu'une fois par image ; les tableaux
+renvoyés sont partagés et en lecture seule.
+"""
+
+from typing import Any, Callable, Dict
+
+import cv2
+import numpy as np
+
+CHANNEL_ORDERS = ('rgb', 'bgr')
+
+COLOR_SPACES = ('gray', 'rgb', 'bgr', 'hsv', 'lab', 'ycrcb')
+
+# (ordre des canaux, espace) -> code de conversion depuis 3 canaux
+_FROM_COLOR = {
+    ('rgb', 'gray'): cv2.COLOR_RGB2GRAY,
+    ('rgb', 'bgr'): cv2.COLOR_RGB2BGR,
+    ('rgb', 'hsv'): cv2.COLOR_RGB2HSV,
+    ('rgb', 'lab'): cv2.COLOR_RGB2LAB,
+    ('rgb', 'ycrcb'): cv2.COLOR_RGB2YCrCb,
+    ('bgr', 'gray'): cv2.COLOR_BGR2GRAY,
+    ('bgr', 'rgb'): cv2.COLOR_BGR2RGB,
+    ('bgr', 'hsv'): cv2.COLOR_BGR2HSV,
+    ('bgr', 'lab'): cv2.COLOR_BGR2LAB,
+    ('bgr', 'ycrcb'): cv2.COLOR_BGR2YCrCb,
+}
+
+def _read_only(array: np.ndarray) -> np.ndarray:
+    """Interdit l'écriture dans un tableau partagé."""
+    array.flags.writeable = False
+    return array
+
+class ImageData:
+    """
+    Image numpy, son ordre de canaux et ses conversions en cache.
+
+    Attributs :
+        array : tableau d'origine (niveaux de gris, 3 ou 4 canaux)
+        order : ordre des canaux couleur ('rgb' ou 'bgr')
+        version : identifiant de la version de l'image (facultatif)
+    """
+
+    def __init__(self, array: np.ndarray, order: str = 'bgr', version: Any = None):
+        """
+        Args:
+            array (numpy.ndarray): Image (niveaux de gris, 3 ou 4 canaux)
+            order (str): Ordre des canaux couleur ('rgb' ou 'bgr')
+            version: Identifiant de la version de l'image
+        """
+        if order not in CHANNEL_ORDERS:
+            raise ValueError(f"Ordre des canaux inconnu: {order}")
+        if array.ndim == 3 and array.shape[2] not in (3, 4):
+            raise ValueError(f"Image à 1, 3 ou 4 canaux attendue: {array.shape[2]}")
+        if array.ndim == 3 and array.shape[2] == 1:
+            array = array[:, :, 0]
+        self.array = _read_only(array.view())
+        self.order = order
+        self.version = version
+        self._views: Dict[Any, Any] = {}
+
+    @classmethod
+    def from_pil(cls, image, version: Any = None) -> 'ImageData':
+        """
+        Conteneur d'une image PIL (canaux en RGB, alpha conservé).
+
+        Args:
+            image (PIL.Image.Image): Image PIL
+            version: Identifiant de la version de l'image
+
+        Returns:
+            ImageData: Conteneur de l'image
+        """
+        return cls(np.array(image), 'rgb', version)
+
+    @property
+    def is_color(self) -> bool:
+        """Vrai pour une image à 3 ou 4 canaux."""
+        return self.array.ndim == 3
+
+    @property
+    def has_alpha(self) -> bool:
+        """Vrai pour une image à 4 canaux."""
+        return self.array.ndim == 3 and self.array.shape[2] == 4
+
+    def cached(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """
+        Représentation dérivée calculée une seule fois pour cette image.
+
+        Args:
+            key: Clé de la représentation
+            compute (callable): Fonction sans argument qui la calcule
+
+        Returns:
+            Représentation partagée (ne pas la modifier)
+        """
+        if key not in self._views:
+            value = compute()
+            if isinstance(value, np.ndarray):
+                value = _read_only(value)
+            self._views[key] = value
+        return self._views[key]
+
+    def _color(self) -> np.ndarray:
+        """Image à 3 canaux, dans l'ordre d'origine (alpha retiré)."""
+        if not self.is_color:
+            return self.cached('color', lambda: cv2.cvtColor(self.array, cv2.COLOR_GRAY2BGR))
+        if self.has_alpha:
+            return self.cached('color', lambda: np.ascontiguousarray(self.array[:, :, :3]))
+        return self.array
+
+    def to(self, space: str) -> np.ndarray:
+        """
+        Image convertie dans un espace de couleur (calculée à la première demande).
+
+        Args:
+            space (str): 'gray', 'rgb', 'bgr', 'hsv', 'lab' ou 'ycrcb'
+
+        Returns:
+            numpy.ndarray: Image convertie, en lecture seule (3 canaux, ou
+                niveaux de gris pour 'gray')
+        """
+        if space not in COLOR_SPACES:
+            raise ValueError(f"Espace de couleur inconnu: {space}")
+        if space == 'gray' and not self.is_color:
+            return self.array
+        if space == self.order or (space in CHANNEL_ORDERS and not self.is_color):
+            return self._color()
+        return self.cached(space, lambda: cv2.cvtColor(self._color(), _FROM_COLOR[(self.order, space)]))
+
+    @property
+    def gray(self) -> np.ndarray:
+        """Niveaux de gris."""
+        return self.to('gray')
+
+    @property
+    def rgb(self) -> np.ndarray:
+        """Image en RGB (3 canaux)."""
+        return self.to('rgb')
+
+    @property
+    def bgr(self) -> np.ndarray:
+        """Image en BGR (3 canaux), ordre attendu par les opérations."""
+        return self.to('bgr')
+
+    @property
+    def hsv(self) -> np.ndarray:
+        """Image en HSV (teinte OpenCV de 0 à 179 en 8 bits)."""
+        return self.to('hsv')
+
+    @property
+    def lab(self) -> np.ndarray:
+        """Image en Lab."""
+        return self.to('lab')
@@ -7,6 +7,8 @@ import cv2
 import numpy as np
 from typing import Tuple, Optional
 
+from .image_saver import save_image_file
+
 def is_image_file(filename: str) -> bool:
     """
     Vérifie si le fichier est une image supportée.
@@ -81,16 +83,26 @@ def save_image(
     image: np.ndarray, 
     filepath: str, 
     quality: int = 95,
-    convert_to_bgr: bool = True
+    convert_to_bgr: bool = True,
+    time_budget: Optional[float] = None,
+    size_budget: Optional[int] = None
 ) -> str:
     """
     Enregistre une image dans un fichier.
     
+    Sans objectif, quality est converti linéairement en paramètres d'encodage.
+    Avec time_budget ou size_budget, les paramètres du format (niveau et
+    stratégie PNG, options JPEG, WebP avec ou sans perte) sont choisis par un
+    essai d'encodage sur des tuiles de l'image (voir image_saver.tune_encoding) ;
+    avec size_budget, la taille du fichier encodé est vérifiée.
+    
     Args:
         image (numpy.ndarray): Image à enregistrer
         filepath (str): Chemin de destination
         quality (int): Qualité de l'image (0-100)
         convert_to_bgr (bool): Si True, convertit de RGB à BGR avant l'enregistrement
+        time_budget (float, optional): Durée d'encodage maximale (secondes)
+        size_budget (int, optional): Taille de fichier maximale (octets)
         
     Returns:
         str: Message d'erreur ou None si succès
@@ -98,37 +110,12 @@ def save_image(
     if image is None:
         return "Aucune image à enregistrer"
     
-    try:
-        # Créer le répertoire parent si nécessaire
-        os.makedirs(os.path.dirname(os.path.abspath(filepath)), exist_ok=True)
-        
-        # Convertir en BGR si nécessaire (pour la compatibilité avec OpenCV)
-        save_image = image.copy()
-        if convert_to_bgr and len(save_image.shape) == 3 and save_image.shape[2] == 3:
-            save_image = cv2.cvtColor(save_image, cv2.COLOR_RGB2BGR)
-        
-        # Déterminer l'extension du fichier
-        _, ext = os.path.splitext(filepath.lower())
-        
-        # Paramètres de compression en fonction du format
-        params = []
-        if ext in ['.jpg', '.jpeg']:
-            params = [cv2.IMWRITE_JPEG_QUALITY, quality]
-        elif ext == '.png':
-            # Pour PNG, la qualité est un nombre entre 0 et 9 (compression sans perte)
-            png_quality = min(9, max(0, int((100 - quality) / 10)))
-            params = [cv2.IMWRITE_PNG_COMPRESSION, png_quality]
-        
-        # Enregistrer l'image
-        success = cv2.imwrite(filepath, save_image, params)
-        
-        if not success:
-            return "Échec de l'enregistrement de l'image"
-            
-        return None
-        
-    except Exception as e:
-        return f"Erreur lors de l'enregistrement de l'image: {str(e)}"
+    # Encodage sans copie défensive et écriture atomique (fichier temporaire + renommage)
+    result = save_image_file(
+        image, filepath, quality, convert_to_bgr,
+        time_budget=time_budget, size_budget=size_budget
+    )
+    return result.error
 
 def load_image_for_display(
     filepath: str, 
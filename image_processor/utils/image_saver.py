@@ -0,0 +1,555 @@
+"""
+Module utilitaire pour l'enregistrement d'images : encodage, écriture atomique
+et service d'enregistrement asynchrone sur un pool de threads.
+"""
+
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+
+class SaveResult(NamedTuple):
+    """Résultat d'un enregistrement d'image."""
+
+    filepath: str
+    size: int
+    encode_time: float
+    error: Optional[str]
+
+
+def encoding_params(ext: str, quality: int = 95) -> List[int]:
+    """
+    Construit les paramètres d'encodage OpenCV pour une extension donnée.
+
+    Args:
+        ext (str): Extension du fichier (ex: '.png')
+        quality (int): Qualité de l'image (0-100)
+
+    Returns:
+        list: Paramètres à transmettre à cv2.imencode / cv2.imwrite
+    """
+    ext = ext.lower()
+    if ext in ['.jpg', '.jpeg']:
+        return [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+    if ext == '.png':
+        # Pour PNG, la qualité est un nombre entre 0 et 9 (compression sans perte)
+        png_quality = min(9, max(0, int((100 - quality) / 10)))
+        return [cv2.IMWRITE_PNG_COMPRESSION, png_quality]
+    if ext == '.webp':
+        return [cv2.IMWRITE_WEBP_QUALITY, max(1, int(quality))]
+    return []
+
+
+def prepare_for_encoding(image: np.ndarray, ext: str, convert_to_bgr: bool = True) -> np.ndarray:
+    """
+    Prépare une image pour l'encodeur OpenCV sans copie défensive.
+
+    L'image n'est réallouée que si une conversion est réellement nécessaire
+    (ordre des canaux, suppression du canal alpha ou passage en 8 bits pour
+    JPEG) ; sinon le tampon de l'appelant est transmis tel quel à l'encodeur.
+
+    Args:
+        image (numpy.ndarray): Image à encoder (niveaux de gris, RGB ou RGBA)
+        ext (str): Extension du fichier de destination
+        convert_to_bgr (bool): Si True, l'image est supposée en RGB/RGBA
+
+    Returns:
+        numpy.ndarray: Image prête pour cv2.imencode
+    """
+    if ext.lower() in ['.jpg', '.jpeg']:
+        if image.ndim == 3 and image.shape[2] == 4:
+            # JPEG ne gère pas la transparence : composer sur un fond blanc,
+            # à l'échelle du type de l'image (255 en 8 bits, 65535 en 16 bits,
+            # 1.0 pour une image flottante)
+            integer = np.issubdtype(image.dtype, np.integer)
+            white = float(np.iinfo(image.dtype).max) if integer else 1.0
+            work = np.float32 if image.dtype == np.uint8 else np.float64
+            alpha = image[:, :, 3:4].astype(work) / white
+            flat = image[:, :, :3] * alpha + white * (1.0 - alpha)
+            image = (np.rint(flat) if integer else flat).astype(image.dtype)
+            if convert_to_bgr:
+                image = cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+                convert_to_bgr = False
+        if image.dtype == np.uint16:
+            # L'encodeur JPEG d'OpenCV sature le 16 bits au lieu de le réduire
+            image = cv2.convertScaleAbs(image, alpha=1.0 / 257.0)
+
+    if image.ndim != 3:
+        return image
+
+    if convert_to_bgr:
+        channels = image.shape[2]
+        if channels == 3:
+            return cv2.cvtColor(image, cv2.COLOR_RGB2BGR)
+        if channels == 4:
+            return cv2.cvtColor(image, cv2.COLOR_RGBA2BGRA)
+    return image
+
+
+def encode_image(
+    image: np.ndarray,
+    ext: str,
+    quality: int = 95,
+    convert_to_bgr: bool = True,
+    params: Optional[Sequence[int]] = None
+) -> Tuple[np.ndarray, float]:
+    """
+    Encode une image en mémoire.
+
+    Args:
+        image (numpy.ndarray): Image à encoder
+        ext (str): Extension déterminant le format (ex: '.png')
+        quality (int): Qualité de l'image (0-100), ignorée si params est fourni
+        convert_to_bgr (bool): Si True, convertit de RGB à BGR avant l'encodage
+        params (list, optional): Paramètres OpenCV explicites
+
+    Returns:
+        tuple: (tampon encodé, durée d'encodage en secondes)
+    """
+    if params is None:
+        params = encoding_params(ext, quality)
+
+    start = time.perf_counter()
+    prepared = prepare_for_encoding(image, ext, convert_to_bgr)
+    success, buffer = cv2.imencode(ext, prepared, list(params))
+    elapsed = time.perf_counter() - start
+
+    if not success:
+        raise ValueError(f"Échec de l'encodage au format {ext}")
+    return buffer, elapsed
+
+
+def write_atomic(filepath: str, data) -> None:
+    """
+    Écrit des données dans un fichier de manière atomique.
+
+    Les données sont d'abord écrites dans un fichier temporaire du même
+    répertoire, puis renommées : un lecteur ne voit jamais de fichier partiel.
+
+    Args:
+        filepath (str): Chemin de destination
+        data: Objet supportant le protocole buffer (bytes, numpy.ndarray...)
+    """
+    dirname, basename = os.path.split(os.path.abspath(filepath))
+    os.makedirs(dirname, exist_ok=True)
+
+    tmp_path = os.path.join(dirname, f".{basename}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, 'xb') as f:
+            f.write(data)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class EncodingChoice(NamedTuple):
+    """Paramètres d'encodage retenus par l'autoréglage et leurs estimations."""
+
+    ext: str
+    params: List[int]
+    estimated_time: float
+    estimated_size: int
+
+
+# Niveaux et stratégies zlib essayés pour PNG (le niveau 0 ne compresse pas :
+# la stratégie y est sans effet)
+_PNG_LEVELS = (1, 3, 6, 9)
+_PNG_STRATEGIES = (
+    cv2.IMWRITE_PNG_STRATEGY_DEFAULT,
+    cv2.IMWRITE_PNG_STRATEGY_FILTERED,
+    cv2.IMWRITE_PNG_STRATEGY_RLE,
+    cv2.IMWRITE_PNG_STRATEGY_HUFFMAN_ONLY,
+)
+
+
+def candidate_encodings(ext: str, quality: int = 95) -> List[List[int]]:
+    """
+    Énumère les jeux de paramètres d'encodage essayés pour un format.
+
+    Les candidats ne changent pas la fidélité demandée : seuls les réglages
+    sans perte (PNG, options JPEG) ou le choix WebP avec/sans perte varient.
+
+    Args:
+        ext (str): Extension du format (ex: '.png')
+        quality (int): Qualité pour les formats avec perte (0-100)
+
+    Returns:
+        list: Listes de paramètres OpenCV
+    """
+    ext = ext.lower()
+    if ext == '.png':
+        candidates = [[cv2.IMWRITE_PNG_COMPRESSION, 0]]
+        for level in _PNG_LEVELS:
+            for strategy in _PNG_STRATEGIES:
+                candidates.append([
+                    cv2.IMWRITE_PNG_COMPRESSION, level,
+                    cv2.IMWRITE_PNG_STRATEGY, strategy
+                ])
+        return candidates
+    if ext in ['.jpg', '.jpeg']:
+        return [
+            [cv2.IMWRITE_JPEG_QUALITY, int(quality),
+             cv2.IMWRITE_JPEG_OPTIMIZE, optimize,
+             cv2.IMWRITE_JPEG_PROGRESSIVE, progressive]
+            for optimize in (0, 1)
+            for progressive in (0, 1)
+        ]
+    if ext == '.webp':
+        # Une qualité supérieure à 100 sélectionne le mode sans perte
+        return [
+            [cv2.IMWRITE_WEBP_QUALITY, max(1, int(quality))],
+            [cv2.IMWRITE_WEBP_QUALITY, 101],
+        ]
+    return [encoding_params(ext, quality)]
+
+
+def _probe_tiles(image: np.ndarray, probe_side: int, grid: int = 4) -> np.ndarray:
+    """
+    Échantillon pleine résolution de l'image pour les essais d'encodage.
+
+    Une mosaïque de grid x grid tuiles réparties sur toute l'image garde la
+    texture réelle (une copie réduite est plus dense en détails et se
+    compresse différemment). Les tuiles font un multiple de 16 pixels de
+    côté pour rester alignées sur les blocs JPEG/WebP.
+    """
+    h, w = image.shape[:2]
+    if h * w <= probe_side * probe_side:
+        return image
+    tile = max(16, (probe_side // grid) // 16 * 16)
+    th, tw = min(tile, h), min(tile, w)
+    ys = np.linspace(0, h - th, grid).astype(int)
+    xs = np.linspace(0, w - tw, grid).astype(int)
+    return np.ascontiguousarray(np.concatenate([
+        np.concatenate([image[y:y + th, x:x + tw] for x in xs], axis=1) for y in ys
+    ], axis=0))
+
+
+def measure_encodings(
+    image: np.ndarray,
+    ext: str,
+    quality: int = 95,
+    convert_to_bgr: bool = True,
+    formats: Optional[Sequence[str]] = None,
+    probe_side: int = 512
+) -> List[EncodingChoice]:
+    """
+    Mesure chaque candidat d'encodage sur un échantillon de l'image.
+
+    Chaque candidat est encodé sur une mosaïque de tuiles pleine résolution ;
+    le temps et la taille mesurés sont extrapolés au nombre de pixels de
+    l'image complète.
+
+    Args:
+        image (numpy.ndarray): Image à encoder
+        ext (str): Extension du fichier de destination
+        quality (int): Qualité pour les formats avec perte (0-100)
+        convert_to_bgr (bool): Si True, l'image est supposée en RGB/RGBA
+        formats (list, optional): Extensions essayées (par défaut [ext])
+        probe_side (int): Côté de l'échantillon (pixels)
+
+    Returns:
+        list: Un EncodingChoice par candidat encodable
+    """
+    h, w = image.shape[:2]
+    probe = _probe_tiles(image, probe_side)
+    pixel_ratio = (h * w) / float(probe.shape[0] * probe.shape[1])
+
+    measurements = []
+    for fmt in (formats or [ext]):
+        fmt = fmt.lower()
+        prepared = prepare_for_encoding(probe, fmt, convert_to_bgr)
+        for params in candidate_encodings(fmt, quality):
+            start = time.perf_counter()
+            success, buffer = cv2.imencode(fmt, prepared, params)
+            elapsed = time.perf_counter() - start
+            if success:
+                measurements.append(EncodingChoice(
+                    fmt, params, elapsed * pixel_ratio, int(buffer.nbytes * pixel_ratio)
+                ))
+
+    if not measurements:
+        raise ValueError(f"Aucun encodeur disponible pour {ext}")
+    return measurements
+
+
+def _select_encoding(
+    measurements: Sequence[EncodingChoice],
+    time_budget: Optional[float],
+    size_budget: Optional[int],
+    size_scale: float = 1.0
+) -> Tuple[EncodingChoice, bool]:
+    """
+    Choisit une mesure selon l'objectif (taille estimée multipliée par size_scale).
+
+    Returns:
+        tuple: (mesure retenue, True si elle respecte la contrainte)
+    """
+    if time_budget is not None:
+        feasible = [m for m in measurements if m.estimated_time <= time_budget]
+        if feasible:
+            return min(feasible, key=lambda m: (m.estimated_size, m.estimated_time)), True
+        return min(measurements, key=lambda m: m.estimated_time), False
+
+    feasible = [m for m in measurements if m.estimated_size * size_scale <= size_budget]
+    if feasible:
+        return min(feasible, key=lambda m: (m.estimated_time, m.estimated_size)), True
+    return min(measurements, key=lambda m: m.estimated_size), False
+
+
+def tune_encoding(
+    image: np.ndarray,
+    ext: str,
+    time_budget: Optional[float] = None,
+    size_budget: Optional[int] = None,
+    quality: int = 95,
+    convert_to_bgr: bool = True,
+    formats: Optional[Sequence[str]] = None,
+    probe_side: int = 512
+) -> EncodingChoice:
+    """
+    Choisit les paramètres d'encodage pour atteindre un objectif.
+
+    Les candidats sont mesurés sur un échantillon pleine résolution (voir
+    measure_encodings) ; la taille reste une estimation, que save_image_file
+    vérifie après l'encodage complet.
+    Avec time_budget, le fichier le plus petit encodable dans ce temps est
+    retenu ; avec size_budget, l'encodage le plus rapide sous cette taille.
+    Si aucun candidat ne respecte la contrainte, le plus proche est retenu.
+
+    Args:
+        image (numpy.ndarray): Image à encoder
+        ext (str): Extension du fichier de destination
+        time_budget (float, optional): Durée d'encodage maximale (secondes)
+        size_budget (int, optional): Taille de fichier maximale (octets)
+        quality (int): Qualité pour les formats avec perte (0-100)
+        convert_to_bgr (bool): Si True, l'image est supposée en RGB/RGBA
+        formats (list, optional): Extensions autorisées (par défaut [ext])
+        probe_side (int): Côté de l'échantillon (pixels)
+
+    Returns:
+        EncodingChoice: Format, paramètres et estimations retenus
+    """
+    if time_budget is None and size_budget is None:
+        raise ValueError("Un objectif est requis : time_budget ou size_budget")
+
+    measurements = measure_encodings(image, ext, quality, convert_to_bgr, formats, probe_side)
+    return _select_encoding(measurements, time_budget, size_budget)[0]
+
+
+def _encode_within_size(
+    image: np.ndarray,
+    ext: str,
+    size_budget: int,
+    quality: int = 95,
+    convert_to_bgr: bool = True
+) -> Tuple[np.ndarray, float]:
+    """
+    Encodage le plus rapide dont la taille réelle respecte size_budget.
+
+    Si le fichier encodé dépasse le budget, l'écart observé corrige les
+    estimations des candidats restants et le suivant est essayé ; à défaut,
+    le plus petit tampon obtenu est renvoyé.
+
+    Returns:
+        tuple: (tampon encodé, durée totale des encodages en secondes)
+    """
+    remaining = measure_encodings(image, ext, quality, convert_to_bgr)
+    size_scale = 1.0
+    best, total = None, 0.0
+    while remaining:
+        choice, feasible = _select_encoding(remaining, None, size_budget, size_scale)
+        buffer, elapsed = encode_image(image, choice.ext, quality, convert_to_bgr, choice.params)
+        total += elapsed
+        if best is None or buffer.nbytes < best.nbytes:
+            best = buffer
+        if buffer.nbytes <= size_budget or not feasible:
+            break
+        # Estimations trop optimistes : les corriger d'après cet encodage
+        size_scale = buffer.nbytes / float(max(choice.estimated_size, 1))
+        remaining = [m for m in remaining if m is not choice]
+    return best, total
+
+
+def save_image_file(
+    image: np.ndarray,
+    filepath: str,
+    quality: int = 95,
+    convert_to_bgr: bool = True,
+    params: Optional[Sequence[int]] = None,
+    time_budget: Optional[float] = None,
+    size_budget: Optional[int] = None
+) -> SaveResult:
+    """
+    Encode puis écrit atomiquement une image, en mesurant le coût de l'encodage.
+
+    Args:
+        image (numpy.ndarray): Image à enregistrer
+        filepath (str): Chemin de destination
+        quality (int): Qualité de l'image (0-100)
+        convert_to_bgr (bool): Si True, convertit de RGB à BGR avant l'enregistrement
+        params (list, optional): Paramètres OpenCV explicites
+        time_budget (float, optional): Si fourni, paramètres autoréglés pour
+            obtenir le plus petit fichier encodable dans ce temps (secondes)
+        size_budget (int, optional): Si fourni, paramètres autoréglés pour
+            obtenir l'encodage le plus rapide sous cette taille (octets)
+
+    Returns:
+        SaveResult: Chemin, taille écrite, durée d'encodage et erreur éventuelle
+    """
+    if image is None:
+        return SaveResult(filepath, 0, 0.0, "Aucune image à enregistrer")
+
+    try:
+        # L'extension du fichier fixe le format : seuls ses réglages sont autoréglés
+        _, ext = os.path.splitext(filepath.lower())
+        if params is None and time_budget is None and size_budget is not None:
+            buffer, elapsed = _encode_within_size(image, ext, size_budget, quality, convert_to_bgr)
+        else:
+            if params is None and time_budget is not None:
+                params = tune_encoding(
+                    image, ext, time_budget, size_budget, quality, convert_to_bgr, formats=[ext]
+                ).params
+            buffer, elapsed = encode_image(image, ext, quality, convert_to_bgr, params)
+        write_atomic(filepath, buffer)
+        return SaveResult(filepath, int(buffer.nbytes), elapsed, None)
+    except Exception as e:
+        return SaveResult(filepath, 0, 0.0, f"Erreur lors de l'enregistrement de l'image: {str(e)}")
+
+
+class SaveService:
+    """
+    Service d'enregistrement asynchrone d'images.
+
+    L'encodage (qui libère le GIL dans OpenCV) et l'écriture sont exécutés sur
+    un pool de threads. Les images ne sont pas copiées : l'appelant ne doit pas
+    modifier un tableau tant que le Future correspondant n'est pas terminé.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialise le service.
+
+        Args:
+            max_workers (int, optional): Nombre de threads d'encodage
+                (par défaut, le nombre de processeurs)
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or os.cpu_count() or 1,
+            thread_name_prefix='image-save'
+        )
+
+    def submit(
+        self,
+        image: np.ndarray,
+        filepath: str,
+        quality: int = 95,
+        convert_to_bgr: bool = True,
+        params: Optional[Sequence[int]] = None,
+        time_budget: Optional[float] = None,
+        size_budget: Optional[int] = None
+    ) -> Future:
+        """
+        Planifie l'enregistrement d'une image.
+
+        Args:
+            image (numpy.ndarray): Image à enregistrer
+            filepath (str): Chemin de destination
+            quality (int): Qualité de l'image (0-100)
+            convert_to_bgr (bool): Si True, convertit de RGB à BGR
+            params (list, optional): Paramètres OpenCV explicites
+            time_budget (float, optional): Durée d'encodage visée (voir tune_encoding)
+            size_budget (int, optional): Taille de fichier visée (voir tune_encoding)
+
+        Returns:
+            concurrent.futures.Future: Future produisant un SaveResult
+        """
+        return self._executor.submit(
+            save_image_file, image, filepath, quality, convert_to_bgr, params,
+            time_budget, size_budget
+        )
+
+    def save_many(
+        self,
+        items: Iterable[Tuple[np.ndarray, str]],
+        quality: int = 95,
+        convert_to_bgr: bool = True,
+        time_budget: Optional[float] = None,
+        size_budget: Optional[int] = None
+    ) -> List[Future]:
+        """
+        Planifie l'enregistrement de plusieurs images.
+
+        Args:
+            items (iterable): Couples (image, chemin)
+            quality (int): Qualité de l'image (0-100)
+            convert_to_bgr (bool): Si True, convertit de RGB à BGR
+            time_budget (float, optional): Durée d'encodage visée par image
+            size_budget (int, optional): Taille de fichier visée par image
+
+        Returns:
+            list: Futures produisant des SaveResult, dans l'ordre des entrées
+        """
+        return [
+            self.submit(image, filepath, quality, convert_to_bgr,
+                        time_budget=time_budget, size_budget=size_budget)
+            for image, filepath in items
+        ]
+
+    def save_formats(
+        self,
+        image: np.ndarray,
+        base_path: str,
+        extensions: Sequence[str],
+        quality: int = 95,
+        convert_to_bgr: bool = True
+    ) -> List[Future]:
+        """
+        Enregistre une même image dans plusieurs formats en parallèle.
+
+        Args:
+            image (numpy.ndarray): Image à enregistrer
+            base_path (str): Chemin sans extension
+            extensions (list): Extensions voulues (ex: ['.png', '.jpg'])
+            quality (int): Qualité de l'image (0-100)
+            convert_to_bgr (bool): Si True, convertit de RGB à BGR
+
+        Returns:
+            list: Futures produisant des SaveResult, un par format
+        """
+        return [
+            self.submit(image, base_path + ext, quality, convert_to_bgr)
+            for ext in extensions
+        ]
+
+    @staticmethod
+    def wait(futures: Iterable[Future]) -> List[SaveResult]:
+        """
+        Attend la fin d'une série d'enregistrements.
+
+        Args:
+            futures (iterable): Futures renvoyés par submit/save_many
+
+        Returns:
+            list: SaveResult dans l'ordre des Futures
+        """
+        return [future.result() for future in futures]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Arrête le pool de threads après les enregistrements en cours."""
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.shutdown(wait=True)
+        return False